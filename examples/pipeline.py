@@ -0,0 +1,16 @@
+from gradio_tools import (ImageCaptioningTool, ImageToMusicTool, Pipeline,
+                          StableDiffusionPromptGeneratorTool,
+                          StableDiffusionTool)
+
+# A fixed workflow needs no LLM in the loop. Captioning and music generation
+# both only need the image, so they run at the same time.
+pipeline = (
+    Pipeline()
+    .add("prompt", StableDiffusionPromptGeneratorTool(), "{input}")
+    .add("image", StableDiffusionTool(), "{prompt}")
+    .add("caption", ImageCaptioningTool(), "{image}")
+    .add("music", ImageToMusicTool(), "{image}")
+)
+
+for result in pipeline.run_stream("a dog riding a skateboard"):
+    print(result.step, result.output if result.ok else result.error)
@@ -1,12 +1,118 @@
-from gradio_tools.tools import (BarkTextToSpeechTool, ClipInterrogatorTool,
-                                DocQueryDocumentAnsweringTool, GradioTool,
-                                ImageCaptioningTool, ImageToMusicTool,
-                                SAMImageSegmentationTool,
-                                StableDiffusionPromptGeneratorTool,
-                                StableDiffusionTool, TextToVideoTool,
-                                WhisperAudioTranscriptionTool)
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from gradio_tools.artifacts import Artifact, ArtifactStore
+    from gradio_tools.batching import MicroBatcher
+    from gradio_tools.cache import DiskCache, MemoryCache, ResultCache
+    from gradio_tools.client_pool import ClientPool
+    from gradio_tools.duplicates import DuplicateRegistry
+    from gradio_tools.instrumentation import (Instrumentation,
+                                              MetricsCollector,
+                                              PrintInstrumentation)
+    from gradio_tools.jobs import Backoff, BatchResult, StreamEvent
+    from gradio_tools.pipeline import Pipeline, StepResult
+    from gradio_tools.prewarm import Prewarmer
+    from gradio_tools.replicas import ReplicaSet
+    from gradio_tools.retry import (CircuitBreaker, CircuitOpenError,
+                                    QueryError, RetryPolicy, ToolError,
+                                    ToolTimeoutError)
+    from gradio_tools.scheduler import Scheduler, call_context
+    from gradio_tools.schema import SchemaCache
+    from gradio_tools.spaces import SpaceRecord, SpaceResolver
+    from gradio_tools.tools import (BarkTextToSpeechTool, ClipInterrogatorTool,
+                                    DocQueryDocumentAnsweringTool, GradioTool,
+                                    ImageCaptioningTool, ImageToMusicTool,
+                                    SAMImageSegmentationTool,
+                                    StableDiffusionPromptGeneratorTool,
+                                    StableDiffusionTool, TextToVideoTool,
+                                    WhisperAudioTranscriptionTool, warmup_all)
+    from gradio_tools.uploads import UploadManager
+    from gradio_tools.workers import WorkerPool, WorkerPoolFull
+
+# Exports are imported on first use (PEP 562), so `import gradio_tools` stays
+# cheap and a worker that uses one tool never loads the others.
+_LAZY = {
+    "Artifact": "gradio_tools.artifacts",
+    "ArtifactStore": "gradio_tools.artifacts",
+    "MicroBatcher": "gradio_tools.batching",
+    "DiskCache": "gradio_tools.cache",
+    "MemoryCache": "gradio_tools.cache",
+    "ResultCache": "gradio_tools.cache",
+    "ClientPool": "gradio_tools.client_pool",
+    "DuplicateRegistry": "gradio_tools.duplicates",
+    "Instrumentation": "gradio_tools.instrumentation",
+    "MetricsCollector": "gradio_tools.instrumentation",
+    "PrintInstrumentation": "gradio_tools.instrumentation",
+    "Backoff": "gradio_tools.jobs",
+    "BatchResult": "gradio_tools.jobs",
+    "StreamEvent": "gradio_tools.jobs",
+    "Pipeline": "gradio_tools.pipeline",
+    "StepResult": "gradio_tools.pipeline",
+    "Prewarmer": "gradio_tools.prewarm",
+    "ReplicaSet": "gradio_tools.replicas",
+    "CircuitBreaker": "gradio_tools.retry",
+    "CircuitOpenError": "gradio_tools.retry",
+    "QueryError": "gradio_tools.retry",
+    "RetryPolicy": "gradio_tools.retry",
+    "ToolError": "gradio_tools.retry",
+    "ToolTimeoutError": "gradio_tools.retry",
+    "Scheduler": "gradio_tools.scheduler",
+    "call_context": "gradio_tools.scheduler",
+    "SchemaCache": "gradio_tools.schema",
+    "SpaceRecord": "gradio_tools.spaces",
+    "SpaceResolver": "gradio_tools.spaces",
+    "BarkTextToSpeechTool": "gradio_tools.tools",
+    "ClipInterrogatorTool": "gradio_tools.tools",
+    "DocQueryDocumentAnsweringTool": "gradio_tools.tools",
+    "GradioTool": "gradio_tools.tools",
+    "ImageCaptioningTool": "gradio_tools.tools",
+    "ImageToMusicTool": "gradio_tools.tools",
+    "SAMImageSegmentationTool": "gradio_tools.tools",
+    "StableDiffusionPromptGeneratorTool": "gradio_tools.tools",
+    "StableDiffusionTool": "gradio_tools.tools",
+    "TextToVideoTool": "gradio_tools.tools",
+    "WhisperAudioTranscriptionTool": "gradio_tools.tools",
+    "warmup_all": "gradio_tools.tools",
+    "UploadManager": "gradio_tools.uploads",
+    "WorkerPool": "gradio_tools.workers",
+    "WorkerPoolFull": "gradio_tools.workers",
+}
 
 __all__ = [
+    "Artifact",
+    "ArtifactStore",
+    "Backoff",
+    "BatchResult",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "ClientPool",
+    "DiskCache",
+    "DuplicateRegistry",
+    "Instrumentation",
+    "MemoryCache",
+    "MetricsCollector",
+    "MicroBatcher",
+    "Pipeline",
+    "QueryError",
+    "Prewarmer",
+    "PrintInstrumentation",
+    "ReplicaSet",
+    "RetryPolicy",
+    "Scheduler",
+    "SchemaCache",
+    "SpaceRecord",
+    "SpaceResolver",
+    "StepResult",
+    "StreamEvent",
+    "ToolError",
+    "ToolTimeoutError",
+    "UploadManager",
+    "WorkerPool",
+    "WorkerPoolFull",
+    "ResultCache",
     "GradioTool",
     "StableDiffusionTool",
     "ClipInterrogatorTool",
@@ -18,4 +124,19 @@ __all__ = [
     "DocQueryDocumentAnsweringTool",
     "BarkTextToSpeechTool",
     "SAMImageSegmentationTool",
+    "warmup_all",
+    "call_context",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY))
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Tuple
+
+from gradio_tools.retry import QueryError
+
+REQUIRED: Any = object()
+
+
+@dataclass(frozen=True)
+class Arg:
+    """One field of a tool's delimited query.
+
+    `type` converts the stripped text, and `check`, if given, must accept the
+    converted value. An argument with a `default` may be left empty or off
+    the end of the query. The `greedy` argument, at most one per spec, takes any extra
+    separators, so free text like a question can contain them.
+    `requirement` describes what `check` wants, for error messages.
+    """
+
+    name: str
+    type: Callable[[str], Any] = str
+    default: Any = REQUIRED
+    check: Optional[Callable[[Any], bool]] = None
+    requirement: str = ""
+    greedy: bool = False
+
+
+def between(low: float, high: float) -> Callable[[Any], bool]:
+    return lambda x: low <= x <= high
+
+
+class ArgSpec:
+    """Parses a tool's `sep`-separated query into typed arguments.
+
+    The query is split at most once per argument, from the left up to the
+    greedy argument and from the right after it, and every field is
+    converted and checked before anything is submitted to the Space. Bad
+    input raises QueryError, which says what the tool expected.
+    """
+
+    def __init__(self, *args: Arg, sep: str = "|") -> None:
+        greedy = [i for i, arg in enumerate(args) if arg.greedy]
+        if len(greedy) > 1:
+            raise ValueError("only one argument can be greedy")
+        defaults = [arg.default is not REQUIRED for arg in args]
+        if defaults != sorted(defaults):
+            raise ValueError("arguments with defaults must come last")
+        self.args = args
+        self.sep = sep
+        self.greedy = greedy[0] if greedy else None
+        self.names = ", ".join(arg.name for arg in args)
+        self.required = sum(arg.default is REQUIRED for arg in args)
+
+    def _fields(self, query: str) -> list:
+        n = len(self.args)
+        if self.greedy is None:
+            return query.split(self.sep, n)
+        g = self.greedy
+        fields = query.split(self.sep, g) if g else [query]
+        if len(fields) <= g:
+            return fields
+        fields[g:] = fields[g].rsplit(self.sep, n - g - 1)
+        return fields
+
+    def parse(self, query: str, tool: str) -> Tuple[Any, ...]:
+        fields = self._fields(query)
+        if len(fields) > len(self.args):
+            raise QueryError(
+                tool,
+                f"Too many arguments passed to the {tool}! "
+                f"Expected {len(self.args)} ({self.names}) separated by {self.sep}",
+            )
+        if len(fields) < self.required:
+            raise self._not_enough(tool)
+        values = []
+        for arg, field in zip(self.args, fields):
+            text = field.strip()
+            if not text:
+                if arg.default is REQUIRED:
+                    raise self._not_enough(tool, f"{arg.name} is empty")
+                values.append(arg.default)
+                continue
+            try:
+                value = arg.type(text)
+            except (TypeError, ValueError) as e:
+                if arg.type in (int, float):
+                    reason = f"{arg.name} must be a number, not {text!r}"
+                else:
+                    reason = f"{arg.name} {text!r} is invalid: {e}"
+                raise QueryError(tool, reason) from None
+            if arg.check is not None and not arg.check(value):
+                requirement = arg.requirement or "valid"
+                raise QueryError(tool, f"{arg.name} must be {requirement}, not {text}")
+            values.append(value)
+        for arg in self.args[len(fields) :]:
+            values.append(arg.default)
+        return tuple(values)
+
+    def _not_enough(self, tool: str, detail: str = "") -> QueryError:
+        return QueryError(
+            tool,
+            f"Not enough arguments passed to the {tool}! "
+            f"Expected {len(self.args)} ({self.names})"
+            + (f": {detail}" if detail else ""),
+        )
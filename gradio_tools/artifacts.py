@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List
+
+import gradio_client as grc
+import requests
+from gradio_client.serializing import FileSerializable, VideoSerializable
+
+from gradio_tools.client_pool import ClientPool
+
+_CHUNK_SIZE = 1 << 16
+
+
+class Artifact(str):
+    """A file output that is still on the Space that produced it.
+
+    The string value is the file's URL on the Space, so it can be handed to
+    an agent or to another tool as is; a tool talking to the same Space sends
+    it back as a reference without any bytes changing hands. `iter_bytes`
+    streams the file and `materialize` downloads it into the store.
+    """
+
+    name: str
+    store: ArtifactStore
+    hf_token: str | None
+
+    def __new__(
+        cls, url: str, name: str, store: ArtifactStore, hf_token: str | None = None
+    ) -> Artifact:
+        artifact = super().__new__(cls, url)
+        artifact.name = name
+        artifact.store = store
+        artifact.hf_token = hf_token
+        return artifact
+
+    @property
+    def url(self) -> str:
+        return str.__str__(self)
+
+    @property
+    def cached(self) -> bool:
+        return self.store.path_for(self).exists()
+
+    def materialize(self) -> str:
+        """Path to a local copy of the file, downloading it on first use."""
+        return str(self.store.fetch(self))
+
+    def iter_bytes(self, chunk_size: int = _CHUNK_SIZE) -> Iterator[bytes]:
+        return self.store.stream(self, chunk_size)
+
+    def __reduce__(self):
+        # The store holds locks, so a pickled artifact is just its URL.
+        return (str, (self.url,))
+
+
+class ArtifactStore:
+    """Size-bounded on-disk cache for the file outputs of tools.
+
+    Tools given a store return file outputs as lazy `Artifact`s instead of
+    having gradio_client download every one of them. Downloaded files live in
+    `directory`, and once they add up to more than `max_bytes` the least
+    recently used ones are deleted. Downloads that stall for `timeout`
+    seconds fail. The store keeps its own ClientPool, since lazy outputs are
+    a property of the client that fetched them.
+
+    Only outputs the Space serves as files (File, Audio, Video, Model3D)
+    become Artifacts. Image outputs arrive in the response itself, as
+    base64, and Gallery outputs are downloaded into a directory by
+    gradio_client, so both are left as they are.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path | None = None,
+        max_bytes: int = 1 << 30,
+        timeout: float = 60.0,
+    ) -> None:
+        self.directory = Path(
+            directory or Path(tempfile.gettempdir()) / "gradio_tools" / "artifacts"
+        )
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.clients = ClientPool()
+        self.hits = 0
+        self.downloads = 0
+        self.evictions = 0
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, artifact: Artifact) -> Path:
+        digest = hashlib.sha256(artifact.url.encode()).hexdigest()
+        return self.directory / f"{digest}{Path(artifact.name).suffix}"
+
+    def fetch(self, artifact: Artifact) -> Path:
+        path = self.path_for(artifact)
+        with self._key_lock(path):
+            self._ensure(artifact, path)
+        self._evict(keep=path)
+        return path
+
+    def stream(
+        self, artifact: Artifact, chunk_size: int = _CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        """Yield the file in chunks, downloading it into the store first.
+
+        The file is read outside the artifact's lock, so a reader that stops
+        part way doesn't hold up anyone else.
+        """
+        path = self.path_for(artifact)
+        with self._key_lock(path):
+            self._ensure(artifact, path)
+            # Open before letting go, so an eviction can't remove it under us.
+            f = open(path, "rb")
+        self._evict(keep=path)
+        with f:
+            yield from iter(lambda: f.read(chunk_size), b"")
+
+    def _ensure(self, artifact: Artifact, path: Path) -> None:
+        if path.exists():
+            self._touch(path)
+        else:
+            self._download(artifact, path)
+
+    def _download(self, artifact: Artifact, path: Path) -> None:
+        headers = (
+            {"Authorization": "Bearer " + artifact.hf_token}
+            if artifact.hf_token
+            else {}
+        )
+        tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        try:
+            with requests.get(
+                artifact.url, headers=headers, stream=True, timeout=self.timeout
+            ) as r:
+                r.raise_for_status()
+                with open(tmp, "wb") as f:
+                    for chunk in r.iter_content(_CHUNK_SIZE):
+                        f.write(chunk)
+            # Rename once complete so a reader never sees a partial file.
+            os.replace(tmp, path)
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+        with self._lock:
+            self.downloads += 1
+
+    def _key_lock(self, path: Path) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(path.name, threading.Lock())
+
+    def _touch(self, path: Path) -> None:
+        with self._lock:
+            self.hits += 1
+        os.utime(path)
+
+    def _files(self) -> List[Path]:
+        return [p for p in self.directory.iterdir() if not p.name.endswith(".tmp")]
+
+    def _evict(self, keep: Path) -> None:
+        with self._lock:
+            files = sorted(self._files(), key=lambda p: p.stat().st_mtime)
+            total = sum(p.stat().st_size for p in files)
+            for path in files:
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                total -= path.stat().st_size
+                path.unlink()
+                self.evictions += 1
+
+    def size(self) -> int:
+        return sum(p.stat().st_size for p in self._files())
+
+    def clear(self) -> None:
+        with self._lock:
+            for path in self._files():
+                path.unlink()
+
+    def install(self, client: grc.Client) -> None:
+        """Make every endpoint of `client` return file outputs as Artifacts."""
+        for endpoint in getattr(client, "endpoints", []):
+            if not hasattr(endpoint, "_artifact_store"):
+                endpoint.deserialize = _deserializer(endpoint)
+            endpoint._artifact_store = self
+
+
+def _file_name(x: Any) -> str | None:
+    if isinstance(x, dict) and x.get("is_file") and x.get("name"):
+        return x["name"]
+    return None
+
+
+def _deserializer(endpoint: Any) -> Callable[..., tuple]:
+    def _lazy(x: Any, deserializer: Any) -> Any:
+        store: ArtifactStore = endpoint._artifact_store
+        file = x
+        if isinstance(deserializer, VideoSerializable):
+            # Videos come as (video, subtitles); tools only ever use the video.
+            file = x[0] if isinstance(x, (tuple, list)) and x else None
+        name = _file_name(file)
+        if name is None:
+            return deserializer.deserialize(
+                x,
+                save_dir=endpoint.client.output_dir,
+                hf_token=endpoint.client.hf_token,
+                root_url=endpoint.root_url,
+            )
+        url = endpoint.root_url + "file=" + name
+        return Artifact(url, name, store, endpoint.client.hf_token)
+
+    def _deserialize(*data) -> tuple:
+        outputs = []
+        for x, deserializer in zip(data, endpoint.deserializers):
+            if not isinstance(deserializer, FileSerializable):
+                outputs.append(
+                    deserializer.deserialize(
+                        x,
+                        save_dir=endpoint.client.output_dir,
+                        hf_token=endpoint.client.hf_token,
+                        root_url=endpoint.root_url,
+                    )
+                )
+            elif isinstance(x, list) and not isinstance(
+                deserializer, VideoSerializable
+            ):
+                outputs.append([_lazy(f, deserializer) for f in x])
+            else:
+                outputs.append(_lazy(x, deserializer))
+        return tuple(outputs)
+
+    return _deserialize
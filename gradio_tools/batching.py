@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import concurrent.futures
+import threading
+from typing import TYPE_CHECKING, Any, Dict, List
+
+from gradio_tools.jobs import future_of, wait_for_job
+
+if TYPE_CHECKING:
+    from gradio_tools.tools.gradio_tool import GradioTool
+
+
+class BatchItemJob:
+    """One caller's share of a job that ran a whole batch of queries.
+
+    Behaves like a gradio_client Job whose result is the caller's own output.
+    """
+
+    def __init__(self, batch: _Batch, index: int) -> None:
+        self.batch = batch
+        self.index = index
+        self.future: concurrent.futures.Future = concurrent.futures.Future()
+        self.future.set_running_or_notify_cancel()
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def status(self) -> Any:
+        return self.batch.job.status()
+
+    def result(self, timeout: float | None = None) -> Any:
+        return self.future.result(timeout)
+
+    def outputs(self) -> List[Any]:
+        return []
+
+    def cancel(self) -> bool:
+        """Cancel the batch job once every caller in it has given up."""
+        return self.batch.withdraw(self)
+
+
+class _Batch:
+    def __init__(self, job: Any, size: int) -> None:
+        self.job = job
+        self.items = [BatchItemJob(self, i) for i in range(size)]
+        self.withdrawn = 0
+        self._lock = threading.Lock()
+
+    def fan_out(self) -> None:
+        try:
+            wait_for_job(self.job)
+            outputs = self.job.result()
+            if not isinstance(outputs, (list, tuple)):
+                raise ValueError(f"batch job returned a {type(outputs).__name__}")
+            if len(outputs) != len(self.items):
+                # Never hand out misaligned outputs, or leave callers waiting.
+                raise ValueError(
+                    f"batch of {len(self.items)} queries returned "
+                    f"{len(outputs)} outputs"
+                )
+        except BaseException as e:
+            for item in self.items:
+                if not item.future.done():
+                    item.future.set_exception(e)
+            return
+        for item, output in zip(self.items, outputs):
+            if not item.future.done():
+                item.future.set_result(output)
+
+    def withdraw(self, item: BatchItemJob) -> bool:
+        with self._lock:
+            self.withdrawn += 1
+            last = self.withdrawn == len(self.items)
+        if last:
+            return self.job.cancel()
+        return False
+
+
+class _Pending:
+    def __init__(self) -> None:
+        self.queries: List[str] = []
+        self.jobs: List[concurrent.futures.Future] = []
+        self.full = threading.Event()
+
+
+class MicroBatcher:
+    """Groups concurrent calls to the same tool and submits them together.
+
+    The first call to a tool opens a batch and waits up to `max_wait`
+    seconds, or until `max_batch` calls have joined it, before the batch is
+    submitted. The batch's jobs are submitted back to back, so a Space that
+    runs the endpoint with Gradio's `batch=True` finds them waiting together
+    and runs them in one pass. Tools whose endpoint takes a list of inputs
+    implement `create_batch_job` instead, and the batch goes to the Space as
+    one request whose outputs are handed back to each caller. Only tools
+    whose `batches()` is true are batched; calls to other tools are
+    submitted at once, without waiting.
+    """
+
+    def __init__(self, max_batch: int = 8, max_wait: float = 0.01) -> None:
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batches = 0
+        self.batched = 0
+        self._pending: Dict[int, _Pending] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, tool: GradioTool, query: str) -> Any:
+        """A job for `query`, submitted together with concurrent calls to `tool`."""
+        if not tool.batches():
+            return tool.create_job(query)
+        job: concurrent.futures.Future = concurrent.futures.Future()
+        with self._lock:
+            pending = self._pending.get(id(tool))
+            leader = pending is None
+            if leader:
+                pending = self._pending[id(tool)] = _Pending()
+            pending.queries.append(query)  # type: ignore
+            pending.jobs.append(job)  # type: ignore
+            if len(pending.queries) >= self.max_batch:  # type: ignore
+                # Later calls start a new batch.
+                del self._pending[id(tool)]
+                pending.full.set()  # type: ignore
+        if leader:
+            pending.full.wait(self.max_wait)  # type: ignore
+            with self._lock:
+                if self._pending.get(id(tool)) is pending:
+                    del self._pending[id(tool)]
+            self._flush(tool, pending)  # type: ignore
+        return job.result()
+
+    def _flush(self, tool: GradioTool, pending: _Pending) -> None:
+        with self._lock:
+            self.batches += 1
+            self.batched += len(pending.queries)
+        try:
+            batch_job = None
+            if len(pending.queries) > 1:
+                batch_job = tool.create_batch_job(pending.queries)
+        except BaseException as e:
+            for job in pending.jobs:
+                job.set_exception(e)
+            return
+        if batch_job is not None:
+            batch = _Batch(batch_job, len(pending.queries))
+            future = future_of(batch_job)
+            if future is not None:
+                future.add_done_callback(lambda _: batch.fan_out())
+            else:
+                threading.Thread(target=batch.fan_out, daemon=True).start()
+            for job, item in zip(pending.jobs, batch.items):
+                job.set_result(item)
+            return
+        for query, job in zip(pending.queries, pending.jobs):
+            try:
+                job.set_result(tool.create_job(query))
+            except BaseException as e:
+                job.set_exception(e)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            batches, batched = self.batches, self.batched
+        return {
+            "batches": batches,
+            "calls": batched,
+            "mean_batch_size": batched / batches if batches else 0.0,
+        }
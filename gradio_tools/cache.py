@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from abc import abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Tuple
+
+if TYPE_CHECKING:
+    from gradio_tools.tools.gradio_tool import GradioTool
+
+MISSING = object()
+
+_CHUNK_SIZE = 1 << 20
+_digests: Dict[Tuple[str, int, int], str] = {}
+_digests_lock = threading.Lock()
+
+
+def file_digest(path: str | Path) -> str:
+    """sha256 of a file's contents, memoized on (path, size, mtime)."""
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _digests_lock:
+        if memo_key in _digests:
+            return _digests[memo_key]
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    with _digests_lock:
+        _digests[memo_key] = digest.hexdigest()
+    return _digests[memo_key]
+
+
+def cache_key(tool: GradioTool, query: str) -> str:
+    """Key a call on the tool, its Space and the normalized query.
+
+    Arguments of the query that name local files are keyed on the file
+    contents, so an edited file is not served a stale result.
+    """
+    parts = []
+    for part in query.strip().split("|"):
+        part = part.strip().strip("'\"")
+        if part and os.path.isfile(part):
+            parts.append(("file", file_digest(part)))
+        else:
+            parts.append(("text", part))
+    payload = [type(tool).__qualname__, tool.name, tool.origin_src, parts]
+    return hashlib.sha256(json.dumps(payload).encode()).hexdigest()
+
+
+class ResultCache:
+    @abstractmethod
+    def get(self, key: str, default: Any = None) -> Any:
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        pass
+
+
+class MemoryCache(ResultCache):
+    """Thread-safe in-memory LRU cache whose entries expire after `ttl` seconds."""
+
+    def __init__(self, max_size: int = 1024, ttl: float | None = None) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, Tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._expired(entry[0]):
+                self._entries.pop(key, None)
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl is not None and time.time() - stored_at > self.ttl
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskCache(ResultCache):
+    """Cache that persists results, and any files they point to, in `directory`.
+
+    Outputs that are paths to local files (images, audio, video) are copied
+    into the cache so they outlive gradio_client's temporary directories.
+    Values must be JSON serializable; anything else is silently not cached.
+    """
+
+    def __init__(self, directory: str | Path | None = None, ttl: float | None = None):
+        self.directory = Path(
+            directory or Path(tempfile.gettempdir()) / "gradio_tools" / "results"
+        )
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        (self.directory / "files").mkdir(parents=True, exist_ok=True)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            entry = json.loads((self.directory / f"{key}.json").read_text())
+        except (OSError, ValueError):
+            self.misses += 1
+            return default
+        expired = self.ttl is not None and time.time() - entry["time"] > self.ttl
+        if expired or not all(os.path.exists(f) for f in entry["files"]):
+            self.misses += 1
+            return default
+        self.hits += 1
+        return entry["value"]
+
+    def set(self, key: str, value: Any) -> None:
+        files = []
+        if isinstance(value, str) and os.path.isfile(value):
+            cached = self.directory / "files" / f"{key}{Path(value).suffix}"
+            shutil.copyfile(value, cached)
+            value = str(cached)
+            files.append(value)
+        try:
+            data = json.dumps({"time": time.time(), "value": value, "files": files})
+        except TypeError:
+            return
+        # Write then rename so concurrent readers never see a partial entry.
+        tmp = self.directory / f"{key}.{threading.get_ident()}.tmp"
+        tmp.write_text(data)
+        os.replace(tmp, self.directory / f"{key}.json")
+
+    def clear(self) -> None:
+        shutil.rmtree(self.directory, ignore_errors=True)
+        (self.directory / "files").mkdir(parents=True, exist_ok=True)
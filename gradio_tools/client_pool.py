@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+import gradio_client as grc
+
+Key = Tuple[str, Optional[str]]
+
+
+@dataclass
+class _Entry:
+    client: grc.Client
+    last_used: float
+    # Jobs running on the client right now; a client in use is never evicted.
+    in_use: int = 0
+
+
+class ClientPool:
+    """Process-wide registry of gradio_client Clients keyed by (src, hf_token).
+
+    Building a Client downloads the app config and sets up its worker pool, so
+    tools that target the same Space share one instead. Clients unused for
+    `max_idle` seconds are dropped, as are the least recently used ones once
+    the pool holds more than `max_size`. A client counts as used for as long
+    as a job holds it through `in_use`.
+    """
+
+    def __init__(self, max_idle: float = 600.0, max_size: int = 64) -> None:
+        self.max_idle = max_idle
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[Key, _Entry] = OrderedDict()
+        self._key_locks: Dict[Key, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, src: str, hf_token: str | None = None) -> grc.Client:
+        key = (src, hf_token)
+        with self._lock:
+            client = self._lookup(key)
+            if client is not None:
+                return client
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        # Only one thread builds the client for a given key; the others wait
+        # for it rather than each downloading the config themselves.
+        with key_lock:
+            with self._lock:
+                client = self._lookup(key)
+                if client is not None:
+                    return client
+                self.misses += 1
+            client = grc.Client(src, hf_token=hf_token)
+            self.put(src, client, hf_token)
+        return client
+
+    def put(self, src: str, client: grc.Client, hf_token: str | None = None) -> None:
+        with self._lock:
+            self._entries[(src, hf_token)] = _Entry(client, time.monotonic())
+            self._entries.move_to_end((src, hf_token))
+            excess = len(self._entries) - self.max_size
+            for key in [k for k, e in self._entries.items() if not e.in_use][:excess]:
+                self._evict(key)
+
+    def _evict(self, key: Key) -> None:
+        del self._entries[key]
+        lock = self._key_locks.get(key)
+        if lock is not None and not lock.locked():
+            del self._key_locks[key]
+        self.evictions += 1
+
+    def _lookup(self, key: Key) -> grc.Client | None:
+        now = time.monotonic()
+        for stale in [
+            k
+            for k, e in self._entries.items()
+            if not e.in_use and now - e.last_used > self.max_idle
+        ]:
+            self._evict(stale)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self.hits += 1
+        entry.last_used = now
+        self._entries.move_to_end(key)
+        return entry.client
+
+    @contextmanager
+    def in_use(
+        self, srcs: Iterable[str], hf_token: str | None = None
+    ) -> Iterator[None]:
+        """Mark the pool's clients for `srcs` as in use for the block."""
+        with self._lock:
+            held = [
+                self._entries[k]
+                for k in ((s, hf_token) for s in srcs)
+                if k in self._entries
+            ]
+            for entry in held:
+                entry.in_use += 1
+        try:
+            yield
+        finally:
+            now = time.monotonic()
+            with self._lock:
+                for entry in held:
+                    entry.in_use -= 1
+                    entry.last_used = now
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._key_locks.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+default_pool = ClientPool()
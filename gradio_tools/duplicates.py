@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator
+
+import gradio_client as grc
+import huggingface_hub
+from filelock import FileLock
+from huggingface_hub.utils import RepositoryNotFoundError
+
+from gradio_tools.jobs import Backoff
+
+CREATING = "creating"
+READY = "ready"
+
+
+def _token_digest(hf_token: str) -> str:
+    return hashlib.sha256(hf_token.encode()).hexdigest()
+
+
+class DuplicateRegistry:
+    """File-backed map of (src, owner) to the Space duplicated from it.
+
+    `grc.Client.duplicate` makes several Hub calls and may wait for a build
+    every time a process starts. Processes that share a registry file do
+    that once: the first to need a duplicate marks it as being created and
+    creates it, the others wait for it to be marked ready, and from then on
+    everyone attaches to the recorded space_id directly. The file is guarded
+    by a lock file next to it, so any number of worker processes can share
+    it. A creation that has not finished after `stale_after` seconds is
+    assumed to have died and is taken over.
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        stale_after: float = 900.0,
+        backoff: Backoff | None = None,
+    ) -> None:
+        self.path = Path(
+            path or Path(tempfile.gettempdir()) / "gradio_tools" / "duplicates.json"
+        )
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.stale_after = stale_after
+        self.backoff = backoff or Backoff(initial=0.5, factor=1.5, maximum=10.0)
+        self._file_lock = FileLock(str(self.path) + ".lock")
+
+    @contextmanager
+    def _locked(self) -> Iterator[Dict[str, Any]]:
+        """The registry's contents, written back when the block exits."""
+        with self._file_lock:
+            try:
+                data = json.loads(self.path.read_text())
+            except (OSError, ValueError):
+                data = {}
+            data.setdefault("owners", {})
+            data.setdefault("spaces", {})
+            before = json.dumps(data, sort_keys=True)
+            yield data
+            if json.dumps(data, sort_keys=True) != before:
+                tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+                tmp.write_text(json.dumps(data, indent=2, sort_keys=True))
+                os.replace(tmp, self.path)
+
+    def owner(self, hf_token: str) -> str:
+        """The account `hf_token` belongs to, asking the Hub only once."""
+        digest = _token_digest(hf_token)
+        with self._locked() as data:
+            owner = data["owners"].get(digest)
+        if owner is None:
+            owner = huggingface_hub.whoami(token=hf_token)["name"]
+            with self._locked() as data:
+                data["owners"][digest] = owner
+        return owner
+
+    @staticmethod
+    def key(src: str, owner: str, to_id: str | None = None) -> str:
+        return f"{src}|{owner}|{to_id or ''}"
+
+    def get(self, src: str, owner: str, to_id: str | None = None) -> Dict | None:
+        with self._locked() as data:
+            return data["spaces"].get(self.key(src, owner, to_id))
+
+    def attach(
+        self,
+        src: str,
+        hf_token: str,
+        to_id: str | None,
+        duplicate: Callable[[], grc.Client],
+        connect: Callable[[str], grc.Client],
+    ) -> grc.Client:
+        """Connect to the registered duplicate of `src`, creating it if needed.
+
+        `duplicate` creates the Space and returns a client for it; `connect`
+        returns a client for an existing space_id.
+        """
+        key = self.key(src, self.owner(hf_token), to_id)
+        delays = self.backoff.delays()
+        while True:
+            with self._locked() as data:
+                entry = data["spaces"].get(key)
+                now = time.time()
+                waiting = (
+                    entry is not None
+                    and entry["state"] == CREATING
+                    and now - entry["updated_at"] < self.stale_after
+                )
+                if entry is None or (entry["state"] == CREATING and not waiting):
+                    data["spaces"][key] = {
+                        "space_id": None,
+                        "state": CREATING,
+                        "pid": os.getpid(),
+                        "updated_at": now,
+                    }
+            if entry is not None and entry["state"] == READY:
+                try:
+                    return connect(entry["space_id"])
+                except RepositoryNotFoundError:
+                    # The duplicate was deleted or renamed; make a new one.
+                    # Any other failure may be a blip, and duplicating again
+                    # would create another paid Space, so it is raised.
+                    self.forget(src, hf_token, to_id)
+                    continue
+            if waiting:
+                time.sleep(next(delays))
+                continue
+            return self._create(key, duplicate)
+
+    def _create(self, key: str, duplicate: Callable[[], grc.Client]) -> grc.Client:
+        try:
+            client = duplicate()
+        except BaseException:
+            with self._locked() as data:
+                data["spaces"].pop(key, None)
+            raise
+        with self._locked() as data:
+            data["spaces"][key] = {
+                "space_id": client.space_id,
+                "state": READY,
+                "pid": os.getpid(),
+                "updated_at": time.time(),
+            }
+        return client
+
+    def forget(self, src: str, hf_token: str, to_id: str | None = None) -> None:
+        key = self.key(src, self.owner(hf_token), to_id)
+        with self._locked() as data:
+            data["spaces"].pop(key, None)
+
+    def clear(self) -> None:
+        with self._locked() as data:
+            data["owners"].clear()
+            data["spaces"].clear()
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+from collections import deque
+from typing import (TYPE_CHECKING, Any, Callable, Deque, Dict, List, Optional,
+                    Sequence, Tuple)
+
+from gradio_client.utils import Status, StatusUpdate
+
+if TYPE_CHECKING:
+    from gradio_tools.tools.gradio_tool import GradioTool
+
+# Spans a tool reports, in the order they happen during a call.
+SPANS = (
+    "client_init",
+    "admission",
+    "submit",
+    "queue_wait",
+    "processing",
+    "download",
+    "postprocess",
+    "run",
+)
+_RUNNING = (Status.PROCESSING, Status.ITERATING, Status.FINISHED)
+# Where the endpoint running a job adds the time spent deserializing outputs.
+_downloads: contextvars.ContextVar[List[float] | None] = contextvars.ContextVar(
+    "gradio_tools_downloads", default=None
+)
+
+
+class Instrumentation:
+    """Receives timings, counters and status updates from tools.
+
+    Subclass and override the hooks you need; the defaults do nothing. Spans
+    are the names in SPANS. Counters include cache_hits, cache_misses,
+    retries, queue_full, timeouts, cancellations, failures, wakeups,
+    rejected and invalid.
+    """
+
+    def record(self, tool: GradioTool, span: str, seconds: float) -> None:
+        pass
+
+    def count(self, tool: GradioTool, counter: str, n: int = 1) -> None:
+        pass
+
+    def status(self, tool: GradioTool, status: StatusUpdate) -> None:
+        pass
+
+
+class PrintInstrumentation(Instrumentation):
+    """Prints each job status change, as tools used to do unconditionally."""
+
+    def status(self, tool: GradioTool, status: StatusUpdate) -> None:
+        print(f"\n{tool.name} Job Status: {str(status.code)} eta: {status.eta}")
+
+
+Series = Tuple[str, str, str]
+
+
+class MetricsCollector(Instrumentation):
+    """In-memory aggregator with latency percentiles per tool and per Space.
+
+    Keeps the last `max_samples` durations of every (tool, src, span) series.
+    """
+
+    def __init__(self, max_samples: int = 2048) -> None:
+        self.max_samples = max_samples
+        self._samples: Dict[Series, Deque[float]] = {}
+        self._counters: Dict[Series, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, tool: GradioTool, span: str, seconds: float) -> None:
+        series = (tool.name, tool.src, span)
+        with self._lock:
+            if series not in self._samples:
+                self._samples[series] = deque(maxlen=self.max_samples)
+            self._samples[series].append(seconds)
+
+    def count(self, tool: GradioTool, counter: str, n: int = 1) -> None:
+        series = (tool.name, tool.src, counter)
+        with self._lock:
+            self._counters[series] = self._counters.get(series, 0) + n
+
+    def samples(
+        self, span: str = "run", tool: Optional[str] = None, src: Optional[str] = None
+    ) -> List[float]:
+        with self._lock:
+            return [
+                s
+                for (name, space, sp), values in self._samples.items()
+                if sp == span and tool in (None, name) and src in (None, space)
+                for s in values
+            ]
+
+    def percentiles(
+        self, span: str = "run", tool: Optional[str] = None, src: Optional[str] = None
+    ) -> Dict[str, float]:
+        """p50/p95/p99 of `span` in seconds, optionally for one tool name or src."""
+        values = sorted(self.samples(span, tool, src))
+        if not values:
+            return {}
+        return {f"p{q}": _quantile(values, q / 100) for q in (50, 95, 99)}
+
+    def counters(
+        self, tool: Optional[str] = None, src: Optional[str] = None
+    ) -> Dict[str, int]:
+        totals: Dict[str, int] = {}
+        with self._lock:
+            for (name, space, counter), n in self._counters.items():
+                if tool in (None, name) and src in (None, space):
+                    totals[counter] = totals.get(counter, 0) + n
+        return totals
+
+    def summary(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Percentiles for every span, per tool name."""
+        with self._lock:
+            names = sorted({name for name, _, _ in self._samples})
+        return {
+            name: {
+                span: pct
+                for span in SPANS
+                for pct in [self.percentiles(span, tool=name)]
+                if pct
+            }
+            for name in names
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+            self._counters.clear()
+
+
+def _quantile(values: List[float], q: float) -> float:
+    """Linear-interpolated quantile of already sorted values."""
+    pos = (len(values) - 1) * q
+    low = int(pos)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (pos - low)
+
+
+def time_downloads(client: Any) -> None:
+    """Time how long `client`'s endpoints spend deserializing job outputs.
+
+    Deserializing is where gradio_client downloads file outputs, inside the
+    job itself, so it can only be timed by wrapping the endpoints.
+    """
+    for endpoint in getattr(client, "endpoints", []):
+        if getattr(endpoint, "_timed_downloads", False):
+            continue
+        endpoint.make_end_to_end_fn = _carry_downloads(endpoint.make_end_to_end_fn)
+        endpoint.process_predictions = _timed(endpoint.process_predictions)
+        endpoint._timed_downloads = True
+
+
+def track_downloads(submit: Callable[[], Any]) -> Any:
+    """The job `submit()` returns, remembering its download times."""
+    downloads: List[float] = []
+    token = _downloads.set(downloads)
+    try:
+        job = submit()
+    finally:
+        _downloads.reset(token)
+    try:
+        job._gradio_tools_downloads = downloads
+    except AttributeError:
+        pass
+    return job
+
+
+def downloads_of(job: Any) -> List[float]:
+    return getattr(job, "_gradio_tools_downloads", [])
+
+
+def _carry_downloads(make: Callable[..., Callable]) -> Callable[..., Callable]:
+    # The job's function is made in the submitting thread and run in the
+    # client's executor; carry the submitter's download list across.
+    def make_end_to_end_fn(helper: Any = None) -> Callable:
+        fn = make(helper)
+        downloads = _downloads.get()
+        if downloads is None:
+            return fn
+
+        def _inner(*data):
+            token = _downloads.set(downloads)
+            try:
+                return fn(*data)
+            finally:
+                _downloads.reset(token)
+
+        return _inner
+
+    return make_end_to_end_fn
+
+
+def _timed(process: Callable[..., Any]) -> Callable[..., Any]:
+    def process_predictions(*predictions):
+        start = time.perf_counter()
+        try:
+            return process(*predictions)
+        finally:
+            downloads = _downloads.get()
+            if downloads is not None:
+                downloads.append(time.perf_counter() - start)
+
+    return process_predictions
+
+
+class JobTimer:
+    """Splits the wait for one job into queue_wait, processing and download.
+
+    The split is taken from the status updates seen while waiting, so its
+    resolution is the interval at which the wait samples status.
+    """
+
+    def __init__(self, tool: GradioTool, instrumentation: Instrumentation) -> None:
+        self.tool = tool
+        self.instrumentation = instrumentation
+        self.submitted = time.perf_counter()
+        self.started: float | None = None
+        self.last_code: Status | None = None
+
+    def on_status(self, status: StatusUpdate) -> None:
+        if status.code != self.last_code:
+            self.last_code = status.code
+            self.instrumentation.status(self.tool, status)
+        if self.started is None and status.code in _RUNNING:
+            self.started = time.perf_counter()
+
+    def finished(self, downloads: Sequence[float] = ()) -> None:
+        """Record the spans, given how long the job spent in `downloads`."""
+        end = time.perf_counter()
+        started = self.started or self.submitted
+        download = sum(downloads)
+        processing = max(end - started - download, 0.0)
+        self.instrumentation.record(self.tool, "queue_wait", started - self.submitted)
+        self.instrumentation.record(self.tool, "processing", processing)
+        if downloads:
+            self.instrumentation.record(self.tool, "download", download)
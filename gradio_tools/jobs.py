@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import contextvars
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator
+
+
+@dataclass
+class Backoff:
+    """Geometric delay schedule for jobs that can only be polled."""
+
+    initial: float = 0.05
+    factor: float = 2.0
+    maximum: float = 5.0
+    jitter: float = 0.0
+
+    def delays(self) -> Iterator[float]:
+        delay = self.initial
+        while True:
+            if self.jitter:
+                yield delay * (1 + random.uniform(-self.jitter, self.jitter))
+            else:
+                yield delay
+            delay = min(delay * self.factor, self.maximum)
+
+
+def future_of(job: Any) -> concurrent.futures.Future | None:
+    future = getattr(job, "future", None)
+    if isinstance(future, concurrent.futures.Future):
+        return future
+    if isinstance(job, concurrent.futures.Future):
+        return job
+    return None
+
+
+# How often to sample a job's status while waiting on its completion signal,
+# when a caller asked to see status updates.
+STATUS_INTERVAL = 0.1
+
+StatusCallback = Callable[[Any], None]
+
+
+def remaining(deadline: float | None, cap: float | None = None) -> float | None:
+    if deadline is None:
+        return cap
+    left = max(deadline - time.monotonic(), 0.0)
+    return left if cap is None else min(left, cap)
+
+
+def wait_for_job(
+    job: Any,
+    backoff: Backoff | None = None,
+    timeout: float | None = None,
+    on_status: StatusCallback | None = None,
+) -> bool:
+    """Block until `job` is done or `timeout` seconds pass; return whether it finished.
+
+    gradio_client Jobs wrap a concurrent Future, so we wait on its completion
+    signal directly. Anything else is polled with `backoff`, shortened to the
+    ETA the backend reports when it expects to finish sooner. `on_status`, if
+    given, is called with the job's status while waiting.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    future = future_of(job)
+    if future is not None:
+        if on_status is None:
+            done, _ = concurrent.futures.wait([future], timeout=timeout)
+            return bool(done)
+        while True:
+            on_status(job.status())
+            step = remaining(deadline, STATUS_INTERVAL)
+            done, _ = concurrent.futures.wait([future], timeout=step)
+            if done:
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+    backoff = backoff or Backoff()
+    for delay in backoff.delays():
+        if job.done():
+            return True
+        if deadline is not None and time.monotonic() >= deadline:
+            return False
+        status = job.status()
+        if on_status is not None:
+            on_status(status)
+        if status.eta:
+            delay = min(delay, max(status.eta, backoff.initial))
+        time.sleep(remaining(deadline, delay))  # type: ignore
+    return False
+
+
+async def async_wait_for_job(
+    job: Any,
+    backoff: Backoff | None = None,
+    timeout: float | None = None,
+    on_status: StatusCallback | None = None,
+) -> bool:
+    """Like `wait_for_job` but awaits completion without blocking the event loop."""
+    deadline = None if timeout is None else time.monotonic() + timeout
+    future = future_of(job)
+    if future is not None:
+        wrapped = asyncio.wrap_future(future)
+        if on_status is None:
+            done, _ = await asyncio.wait([wrapped], timeout=timeout)
+            return bool(done)
+        while True:
+            on_status(job.status())
+            step = remaining(deadline, STATUS_INTERVAL)
+            done, _ = await asyncio.wait([wrapped], timeout=step)
+            if done:
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+    backoff = backoff or Backoff()
+    for delay in backoff.delays():
+        if job.done():
+            return True
+        if deadline is not None and time.monotonic() >= deadline:
+            return False
+        status = job.status()
+        if on_status is not None:
+            on_status(status)
+        if status.eta:
+            delay = min(delay, max(status.eta, backoff.initial))
+        await asyncio.sleep(remaining(deadline, delay))  # type: ignore
+    return False
+
+
+@dataclass
+class StreamEvent:
+    """One update from `GradioTool.run_stream`.
+
+    `kind` is "status" when the job's status changes, "output" for each
+    intermediate output and "result" for the final, postprocessed result.
+    """
+
+    kind: str
+    output: Any = None
+    status: Any = None
+
+    @property
+    def eta(self) -> float | None:
+        return getattr(self.status, "eta", None)
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one query in a `GradioTool.run_many` batch."""
+
+    index: int
+    query: str
+    output: Any = None
+    error: BaseException | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def run_concurrently(
+    fn: Callable[[str], Any],
+    queries: Iterable[str],
+    max_concurrency: int = 4,
+    ordered: bool = True,
+) -> Iterator[BatchResult]:
+    """Call `fn` on every query with at most `max_concurrency` calls in flight.
+
+    Results are yielded in input order if `ordered`, otherwise as they finish.
+    An exception raised for one query is reported on its BatchResult and does
+    not stop the rest of the batch.
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+    queries = list(queries)
+
+    def call(index: int) -> BatchResult:
+        try:
+            return BatchResult(index, queries[index], output=fn(queries[index]))
+        except Exception as e:
+            return BatchResult(index, queries[index], error=e)
+
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers=max_concurrency)
+    # Each call sees the caller's context, e.g. its priority and tenant.
+    futures = [
+        pool.submit(contextvars.copy_context().run, call, i)
+        for i in range(len(queries))
+    ]
+    try:
+        if ordered:
+            for future in futures:
+                yield future.result()
+        else:
+            for future in concurrent.futures.as_completed(futures):
+                yield future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+        pool.shutdown(wait=False)
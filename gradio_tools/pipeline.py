@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import inspect
+import string
+from dataclasses import dataclass
+from typing import (TYPE_CHECKING, Any, AsyncIterator, Callable, Dict,
+                    Iterator, List, Tuple, Union)
+
+if TYPE_CHECKING:
+    from gradio_tools.tools.gradio_tool import GradioTool
+
+INPUT = "input"
+
+Query = Union[str, Callable[..., str]]
+
+
+@dataclass
+class Step:
+    name: str
+    tool: GradioTool
+    query: Query
+    inputs: Tuple[str, ...]
+
+    def build(self, values: Dict[str, Any]) -> str:
+        args = {name: values[name] for name in self.inputs}
+        if callable(self.query):
+            return self.query(**args)
+        return self.query.format(**{k: str(v) for k, v in args.items()})
+
+
+@dataclass
+class StepResult:
+    """Outcome of one step of a `Pipeline` run.
+
+    A step whose inputs failed is not run; its `error` is the upstream one.
+    """
+
+    step: str
+    query: str | None = None
+    output: Any = None
+    error: BaseException | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class Pipeline:
+    """A fixed workflow of tools wired output-to-input as a DAG.
+
+    Each step's query is a format string (or a function) over the outputs of
+    earlier steps, which it names; "{input}" is the pipeline's own input.
+    A step starts as soon as the steps it reads from are done, so independent
+    branches run side by side and a run takes about as long as its critical
+    path. Outputs are passed on as returned, so Artifacts stay on the Space
+    that made them.
+
+        pipeline = Pipeline()
+        pipeline.add("prompt", StableDiffusionPromptGeneratorTool(), "{input}")
+        pipeline.add("image", StableDiffusionTool(), "{prompt}")
+        pipeline.add("caption", ImageCaptioningTool(), "{image}")
+        pipeline.add("music", ImageToMusicTool(), "{image}")
+        outputs = pipeline.run("a dog on a skateboard")
+    """
+
+    def __init__(
+        self, max_concurrency: int | None = None, prewarm: bool = True
+    ) -> None:
+        self.max_concurrency = max_concurrency
+        # Wake the Spaces of later steps while the first ones run.
+        self.prewarm = prewarm
+        self.steps: Dict[str, Step] = {}
+
+    def add(self, name: str, tool: GradioTool, query: Query = "{input}") -> Pipeline:
+        if name == INPUT or name in self.steps:
+            raise ValueError(f"A step named {name!r} already exists")
+        if callable(query):
+            inputs = tuple(inspect.signature(query).parameters)
+        else:
+            inputs = tuple(
+                dict.fromkeys(f for _, f, _, _ in string.Formatter().parse(query) if f)
+            )
+        # Steps can only read from steps added before them, which keeps the
+        # graph acyclic.
+        unknown = [i for i in inputs if i != INPUT and i not in self.steps]
+        if unknown:
+            raise ValueError(f"Step {name!r} reads from unknown steps {unknown}")
+        self.steps[name] = Step(name, tool, query, inputs)
+        return self
+
+    def run(self, input: str, timeout: float | None = None) -> Dict[str, Any]:
+        """Run every step and return their outputs by name.
+
+        Raises the first error if any step failed.
+        """
+        return _outputs(self.run_stream(input, timeout))
+
+    async def arun(self, input: str, timeout: float | None = None) -> Dict[str, Any]:
+        return _outputs([r async for r in self.arun_stream(input, timeout)])
+
+    def run_stream(
+        self, input: str, timeout: float | None = None
+    ) -> Iterator[StepResult]:
+        """Yield a StepResult for each step as soon as it finishes.
+
+        `timeout` applies to each tool call. Closing the generator early
+        cancels the steps that have not started.
+        """
+        state = _RunState(self.steps, input)
+        self._prewarm_downstream()
+        workers = self.max_concurrency or max(len(self.steps), 1)
+        pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+        running: Dict[concurrent.futures.Future, Tuple[Step, str]] = {}
+        try:
+            while state.pending or running:
+                for step, query, skipped in state.ready():
+                    if skipped is not None:
+                        yield skipped
+                    else:
+                        future = pool.submit(step.tool.run, query, timeout)
+                        running[future] = (step, query)
+                if not running:
+                    continue
+                done, _ = concurrent.futures.wait(
+                    running, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    step, query = running.pop(future)
+                    try:
+                        result = state.finish(step, query, output=future.result())
+                    except Exception as e:
+                        result = state.finish(step, query, error=e)
+                    yield result
+        finally:
+            for future in running:
+                future.cancel()
+            pool.shutdown(wait=False)
+
+    async def arun_stream(
+        self, input: str, timeout: float | None = None
+    ) -> AsyncIterator[StepResult]:
+        """Async `run_stream`. Closing it early cancels the running steps."""
+        state = _RunState(self.steps, input)
+        self._prewarm_downstream()
+        limit = asyncio.Semaphore(self.max_concurrency or max(len(self.steps), 1))
+        running: Dict[asyncio.Task, Tuple[Step, str]] = {}
+
+        async def call(step: Step, query: str) -> Any:
+            async with limit:
+                return await step.tool.arun(query, timeout)
+
+        try:
+            while state.pending or running:
+                for step, query, skipped in state.ready():
+                    if skipped is not None:
+                        yield skipped
+                    else:
+                        task = asyncio.ensure_future(call(step, query))
+                        running[task] = (step, query)
+                if not running:
+                    continue
+                done, _ = await asyncio.wait(
+                    running, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    step, query = running.pop(task)
+                    try:
+                        result = state.finish(step, query, output=task.result())
+                    except Exception as e:
+                        result = state.finish(step, query, error=e)
+                    yield result
+        finally:
+            for task in running:
+                task.cancel()
+
+    def _prewarm_downstream(self) -> None:
+        if self.prewarm:
+            for step in self.steps.values():
+                if any(i != INPUT for i in step.inputs):
+                    step.tool.prewarm()
+
+
+class _RunState:
+    def __init__(self, steps: Dict[str, Step], input: str) -> None:
+        self.pending = dict(steps)
+        self.values: Dict[str, Any] = {INPUT: input}
+        self.errors: Dict[str, BaseException] = {}
+
+    def ready(self) -> List[Tuple[Step, str, StepResult | None]]:
+        """Steps whose inputs are all in, with their query or a skipped result."""
+        ready = []
+        progress = True
+        while progress:
+            progress = False
+            for step in list(self.pending.values()):
+                if not all(i in self.values or i in self.errors for i in step.inputs):
+                    continue
+                del self.pending[step.name]
+                error = next(
+                    (self.errors[i] for i in step.inputs if i in self.errors), None
+                )
+                if error is not None:
+                    # Its dependents may now be resolvable too.
+                    ready.append((step, "", self.finish(step, None, error=error)))
+                    progress = True
+                    continue
+                try:
+                    ready.append((step, step.build(self.values), None))
+                except Exception as e:
+                    ready.append((step, "", self.finish(step, None, error=e)))
+                    progress = True
+        return ready
+
+    def finish(
+        self,
+        step: Step,
+        query: str | None,
+        output: Any = None,
+        error: BaseException | None = None,
+    ) -> StepResult:
+        if error is None:
+            self.values[step.name] = output
+        else:
+            self.errors[step.name] = error
+        return StepResult(step.name, query, output, error)
+
+
+def _outputs(results: Iterator[StepResult] | List[StepResult]) -> Dict[str, Any]:
+    outputs = {}
+    for result in results:
+        if result.error is not None:
+            raise result.error
+        outputs[result.step] = result.output
+    return outputs
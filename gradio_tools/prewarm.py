@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import concurrent.futures
+import threading
+import time
+from typing import TYPE_CHECKING, Iterable, List
+
+import huggingface_hub
+import requests
+
+from gradio_tools.jobs import Backoff
+from gradio_tools.spaces import SpaceResolver, default_resolver
+
+if TYPE_CHECKING:
+    from gradio_tools.tools.gradio_tool import GradioTool
+
+# Stages of a Space that answers requests slowly or not at all until woken.
+ASLEEP = ("SLEEPING",)
+STARTING = ("BUILDING", "APP_STARTING", "RUNNING_APP_STARTING", "RUNNING_BUILDING")
+
+# Prewarming is mostly waiting on the Hub and on Spaces to boot.
+prewarm_executor = concurrent.futures.ThreadPoolExecutor(
+    max_workers=8, thread_name_prefix="gradio_tools-prewarm"
+)
+
+
+def wake_space(
+    src: str,
+    hf_token: str | None = None,
+    timeout: float = 300.0,
+    backoff: Backoff | None = None,
+    resolver: SpaceResolver | None = None,
+) -> bool:
+    """Wake a sleeping Space and wait until it has started; return whether it slept.
+
+    Spaces wake up on the first request to their app, so this sends one and
+    then polls the Space's runtime until it is no longer asleep or starting,
+    or `timeout` seconds pass.
+    """
+    resolver = default_resolver if resolver is None else resolver
+
+    def stage() -> str | None:
+        return resolver.resolve(src, hf_token, refresh=True).stage
+
+    deadline = time.monotonic() + timeout
+    current = stage()
+    asleep = current in ASLEEP
+    if asleep:
+        host = huggingface_hub.space_info(src, token=hf_token).host
+        headers = {"Authorization": f"Bearer {hf_token}"} if hf_token else {}
+        try:
+            requests.get(host, headers=headers, timeout=10)
+        except requests.RequestException:
+            # Sleeping Spaces often time out the waking request itself.
+            pass
+        current = stage()
+    backoff = backoff or Backoff(initial=1.0, factor=1.5, maximum=10.0)
+    for delay in backoff.delays():
+        if current not in ASLEEP + STARTING or time.monotonic() >= deadline:
+            break
+        time.sleep(min(delay, max(deadline - time.monotonic(), 0)))
+        current = stage()
+    return asleep
+
+
+class Prewarmer:
+    """Keeps the Spaces behind a set of tools awake.
+
+    `start` prewarms every tool in the background, e.g. all the tools an
+    agent registers, so that the first call to each does not wait on a cold
+    Space. With `interval`, the tools are prewarmed again every `interval`
+    seconds until `stop`, which wakes Spaces that have gone back to sleep.
+    """
+
+    def __init__(
+        self, tools: Iterable[GradioTool], interval: float | None = None
+    ) -> None:
+        self.tools = list(tools)
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._futures: List[concurrent.futures.Future] = []
+
+    def prewarm(self) -> List[concurrent.futures.Future]:
+        return [tool.prewarm() for tool in self.tools]
+
+    def start(self) -> Prewarmer:
+        self._futures = self.prewarm()
+        if self.interval is not None and self._thread is None:
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._loop, daemon=True)
+            self._thread.start()
+        return self
+
+    def _loop(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self._futures = self.prewarm()
+
+    def wait(self, timeout: float | None = None) -> None:
+        """Wait for the latest round of prewarming started by `start`."""
+        concurrent.futures.wait(self._futures, timeout=timeout)
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> Prewarmer:
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, List, Sequence
+
+import gradio_client as grc
+from gradio_client.client import Job
+from gradio_client.utils import QueueError
+
+from gradio_tools.jobs import future_of
+
+STRATEGIES = ("least_outstanding", "eta")
+
+
+class Replica:
+    def __init__(self, client: grc.Client) -> None:
+        self.client = client
+        self.outstanding: List[Job] = []
+        # Counted when a replica is chosen, before its job exists, so that
+        # concurrent submits see each other's picks.
+        self.inflight = 0
+        self.submitted = 0
+        self.queue_errors = 0
+        self.unhealthy_until = 0.0
+
+    @property
+    def src(self) -> str:
+        return getattr(self.client, "space_id", None) or getattr(self.client, "src", "")
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.unhealthy_until
+
+    def eta(self) -> float:
+        """Seconds until this replica's last outstanding job should finish."""
+        etas = [job.status().eta or 0.0 for job in self.outstanding]
+        return max(etas, default=0.0)
+
+
+class ReplicaSet:
+    """Spreads jobs for one tool across several copies of the same app.
+
+    Exposes the `submit` method of a gradio_client Client, so a tool's
+    `create_job` works unchanged. Each job goes to the healthy replica with
+    the fewest outstanding jobs or, with strategy="eta", the shortest
+    expected queue. A replica whose job fails with QueueError is taken out of
+    rotation for `cooldown` seconds.
+    """
+
+    def __init__(
+        self,
+        clients: Sequence[grc.Client],
+        strategy: str = "least_outstanding",
+        cooldown: float = 60.0,
+    ) -> None:
+        if not clients:
+            raise ValueError("ReplicaSet needs at least one client")
+        if strategy not in STRATEGIES:
+            raise ValueError(f"strategy must be one of {STRATEGIES}, not {strategy}")
+        self.replicas = [Replica(c) for c in clients]
+        self.strategy = strategy
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+
+    def submit(self, *args, **kwargs) -> Job:
+        with self._lock:
+            replica = self._choose()
+            replica.submitted += 1
+            replica.inflight += 1
+        try:
+            job = replica.client.submit(*args, **kwargs)
+        except BaseException:
+            with self._lock:
+                replica.inflight -= 1
+            raise
+        future = future_of(job)
+        if future is None:
+            with self._lock:
+                replica.inflight -= 1
+            return job
+        with self._lock:
+            replica.outstanding.append(job)
+        future.add_done_callback(lambda f: self._finished(replica, job, f))
+        return job
+
+    def _choose(self) -> Replica:
+        now = time.monotonic()
+        candidates = [r for r in self.replicas if r.healthy(now)] or self.replicas
+        if self.strategy == "eta":
+            return min(candidates, key=lambda r: (r.eta(), r.inflight))
+        return min(candidates, key=lambda r: r.inflight)
+
+    def _finished(self, replica: Replica, job: Job, future) -> None:
+        with self._lock:
+            replica.inflight -= 1
+            if job in replica.outstanding:
+                replica.outstanding.remove(job)
+            if not future.cancelled() and isinstance(future.exception(), QueueError):
+                replica.queue_errors += 1
+                replica.unhealthy_until = time.monotonic() + self.cooldown
+
+    def stats(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "src": r.src,
+                    "outstanding": r.inflight,
+                    "submitted": r.submitted,
+                    "queue_errors": r.queue_errors,
+                    "healthy": r.healthy(now),
+                }
+                for r in self.replicas
+            ]
+
+    def __getattr__(self, name: str) -> Any:
+        # Everything but submit (view_api, space_id, ...) comes from the first copy.
+        if name == "replicas":
+            raise AttributeError(name)
+        return getattr(self.replicas[0].client, name)
+
+    def __len__(self) -> int:
+        return len(self.replicas)
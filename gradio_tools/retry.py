@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterator, Tuple, Type
+
+import requests
+from gradio_client.utils import QueueError, TooManyRequestsError
+
+from gradio_tools.jobs import Backoff, remaining
+
+
+class ToolError(Exception):
+    """A tool call that failed for good, after any retries."""
+
+    def __init__(self, tool: str, reason: str, attempts: int = 1) -> None:
+        self.tool = tool
+        self.reason = reason
+        self.attempts = attempts
+        super().__init__(str(self))
+
+    def __str__(self) -> str:
+        return (
+            f"{self.tool} failed after {self.attempts} attempt(s): {self.reason}. "
+            "Do not call this tool again for this input."
+        )
+
+
+class CircuitOpenError(ToolError):
+    pass
+
+
+class ToolTimeoutError(ToolError, TimeoutError):
+    pass
+
+
+class QueryError(ToolError, ValueError):
+    """The tool's input could not be parsed; nothing was sent to the Space."""
+
+    def __str__(self) -> str:
+        # Unlike other failures, the agent should retry with fixed input.
+        return self.reason
+
+
+class CircuitBreaker:
+    """Per-Space circuit breaker shared by any tools that are given it.
+
+    After `failure_threshold` consecutive retryable failures against a Space,
+    calls to it fail fast for `reset_timeout` seconds. The first call after
+    that is let through as a trial; success closes the circuit again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures: Dict[str, int] = {}
+        self._opened_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def allow(self, src: str) -> bool:
+        with self._lock:
+            opened_at = self._opened_at.get(src)
+            if opened_at is None:
+                return True
+            if time.monotonic() - opened_at < self.reset_timeout:
+                return False
+            # Half-open: let this call through and hold the rest back until
+            # it reports in.
+            self._opened_at[src] = time.monotonic()
+            return True
+
+    def record_success(self, src: str) -> None:
+        with self._lock:
+            self._failures.pop(src, None)
+            self._opened_at.pop(src, None)
+
+    def record_failure(self, src: str) -> None:
+        with self._lock:
+            self._failures[src] = self._failures.get(src, 0) + 1
+            if self._failures[src] >= self.failure_threshold:
+                self._opened_at[src] = time.monotonic()
+
+    def is_open(self, src: str) -> bool:
+        with self._lock:
+            return src in self._opened_at
+
+
+@dataclass
+class RetryPolicy:
+    """How a tool retries calls the Space rejected because it was overloaded.
+
+    Retries stop after `max_attempts` calls or once the next attempt would
+    start more than `deadline` seconds after the first, whichever is first.
+    A call with a timeout also stops retrying when the timeout is reached,
+    raising ToolTimeoutError.
+    """
+
+    max_attempts: int = 5
+    deadline: float | None = None
+    backoff: Backoff = field(
+        default_factory=lambda: Backoff(
+            initial=1.0, factor=2.0, maximum=30.0, jitter=0.2
+        )
+    )
+    retry_on: Tuple[Type[BaseException], ...] = (
+        QueueError,
+        TooManyRequestsError,
+        requests.Timeout,
+    )
+
+    def _next_delay(
+        self, delays: Iterator[float], attempt: int, start: float
+    ) -> float | None:
+        if attempt >= self.max_attempts:
+            return None
+        delay = next(delays)
+        if self.deadline is not None:
+            if time.monotonic() - start + delay > self.deadline:
+                return None
+        return delay
+
+    def call(
+        self,
+        fn: Callable[[], Any],
+        name: str,
+        src: str,
+        breaker: CircuitBreaker | None = None,
+        on_retry: Callable[[BaseException], None] | None = None,
+        deadline: float | None = None,
+    ) -> Any:
+        start, delays, attempt = time.monotonic(), self.backoff.delays(), 0
+        while True:
+            attempt += 1
+            if breaker is not None and not breaker.allow(src):
+                raise CircuitOpenError(name, f"{src} is unavailable", attempt - 1)
+            try:
+                result = fn()
+            except self.retry_on as e:
+                if breaker is not None:
+                    breaker.record_failure(src)
+                delay = self._next_delay(delays, attempt, start)
+                if delay is None:
+                    raise ToolError(name, _reason(e), attempt) from e
+                _check_deadline(deadline, name, e, attempt)
+                if on_retry is not None:
+                    on_retry(e)
+                time.sleep(remaining(deadline, delay))  # type: ignore
+                _check_deadline(deadline, name, e, attempt)
+                continue
+            if breaker is not None:
+                breaker.record_success(src)
+            return result
+
+    async def acall(
+        self,
+        fn: Callable[[], Awaitable[Any]],
+        name: str,
+        src: str,
+        breaker: CircuitBreaker | None = None,
+        on_retry: Callable[[BaseException], None] | None = None,
+        deadline: float | None = None,
+    ) -> Any:
+        start, delays, attempt = time.monotonic(), self.backoff.delays(), 0
+        while True:
+            attempt += 1
+            if breaker is not None and not breaker.allow(src):
+                raise CircuitOpenError(name, f"{src} is unavailable", attempt - 1)
+            try:
+                result = await fn()
+            except self.retry_on as e:
+                if breaker is not None:
+                    breaker.record_failure(src)
+                delay = self._next_delay(delays, attempt, start)
+                if delay is None:
+                    raise ToolError(name, _reason(e), attempt) from e
+                _check_deadline(deadline, name, e, attempt)
+                if on_retry is not None:
+                    on_retry(e)
+                await asyncio.sleep(remaining(deadline, delay))  # type: ignore
+                _check_deadline(deadline, name, e, attempt)
+                continue
+            if breaker is not None:
+                breaker.record_success(src)
+            return result
+
+
+def _check_deadline(
+    deadline: float | None, name: str, error: BaseException, attempts: int
+) -> None:
+    if deadline is not None and time.monotonic() >= deadline:
+        raise ToolTimeoutError(
+            name, f"timed out retrying ({_reason(error)})", attempts
+        ) from error
+
+
+def _reason(e: BaseException) -> str:
+    if isinstance(e, QueueError):
+        return "the Space's queue is full"
+    if isinstance(e, TooManyRequestsError):
+        return "the Space is rate limiting requests"
+    if isinstance(e, requests.Timeout):
+        return "the Space stopped responding"
+    return str(e) or type(e).__name__
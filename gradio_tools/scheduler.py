@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import (Any, AsyncIterator, Callable, Dict, Iterator, List,
+                    Optional, Tuple)
+
+# Priority classes; lower numbers go first. Any int works.
+INTERACTIVE = 0
+BATCH = 10
+
+_priority: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar(
+    "gradio_tools_priority", default=None
+)
+_tenant: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "gradio_tools_tenant", default=None
+)
+
+
+@contextmanager
+def call_context(
+    priority: int | None = None, tenant: str | None = None
+) -> Iterator[None]:
+    """Run the tool calls made inside the block at `priority`, for `tenant`.
+
+    The values follow the calls into run_many's threads and asyncio tasks.
+    """
+    tokens = []
+    if priority is not None:
+        tokens.append((_priority, _priority.set(priority)))
+    if tenant is not None:
+        tokens.append((_tenant, _tenant.set(tenant)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+def with_priority(priority: int, fn: Callable[..., Any], *args: Any) -> Any:
+    """Call `fn` at `priority` unless the caller already chose one."""
+    if _priority.get() is not None:
+        return fn(*args)
+    with call_context(priority=priority):
+        return fn(*args)
+
+
+class SlotTimeoutError(TimeoutError):
+    """A call was not admitted to its Space in time."""
+
+
+class TokenBucket:
+    """Allows `rate` calls per second on average, and bursts of `burst`."""
+
+    def __init__(self, rate: float, burst: float = 1.0) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = time.monotonic()
+
+    def reserve(self) -> float:
+        """Take a token, returning how many seconds to wait before using it."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def refund(self) -> None:
+        self.tokens += 1
+
+
+class _Space:
+    def __init__(self) -> None:
+        self.inflight = 0
+        self.waiting: List[Tuple[int, int, concurrent.futures.Future]] = []
+
+
+class Scheduler:
+    """Admission control in front of `create_job`, shared by the tools given it.
+
+    Each Space runs at most `max_inflight` jobs from these tools at once.
+    Calls waiting for a slot are admitted in priority order, then in the
+    order they arrived, so interactive calls overtake queued batch work.
+    Tenants with a quota, given as (calls per second, burst) in `quotas` or
+    `default_quota`, wait for a token before they queue for a Space, so one
+    tenant cannot fill a Space's queue.
+
+    The priority and tenant of a call come from `call_context`.
+    """
+
+    def __init__(
+        self,
+        max_inflight: int = 4,
+        quotas: Dict[str, Tuple[float, float]] | None = None,
+        default_quota: Tuple[float, float] | None = None,
+    ) -> None:
+        if max_inflight < 1:
+            raise ValueError("max_inflight must be at least 1")
+        self.max_inflight = max_inflight
+        self.quotas = dict(quotas or {})
+        self.default_quota = default_quota
+        self._buckets: Dict[Optional[str], TokenBucket] = {}
+        self._spaces: Dict[str, _Space] = {}
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+
+    def _reserve(self, tenant: str | None) -> float:
+        quota = self.quotas.get(tenant, self.default_quota)  # type: ignore
+        if quota is None:
+            return 0.0
+        with self._lock:
+            bucket = self._buckets.get(tenant)
+            if bucket is None:
+                bucket = self._buckets[tenant] = TokenBucket(*quota)
+            return bucket.reserve()
+
+    def _refund(self, tenant: str | None) -> None:
+        with self._lock:
+            self._buckets[tenant].refund()
+
+    def _enqueue(self, src: str) -> concurrent.futures.Future:
+        """A Future that is resolved once the call is admitted to `src`."""
+        priority = _priority.get()
+        entry = (
+            INTERACTIVE if priority is None else priority,
+            next(self._order),
+            concurrent.futures.Future(),
+        )
+        with self._lock:
+            space = self._spaces.setdefault(src, _Space())
+            heapq.heappush(space.waiting, entry)
+            self._admit(space)
+        return entry[2]
+
+    def _admit(self, space: _Space) -> None:
+        while space.waiting and space.inflight < self.max_inflight:
+            _, _, admitted = heapq.heappop(space.waiting)
+            if admitted.set_running_or_notify_cancel():
+                space.inflight += 1
+                admitted.set_result(None)
+
+    def _withdraw(self, src: str, admitted: concurrent.futures.Future) -> None:
+        """Give up waiting; if the slot was granted meanwhile, hand it back."""
+        if not admitted.cancel():
+            self.release(src)
+
+    def release(self, src: str) -> None:
+        with self._lock:
+            space = self._spaces[src]
+            space.inflight -= 1
+            self._admit(space)
+
+    def _check_quota(
+        self, tenant: str | None, delay: float, timeout: float | None
+    ) -> None:
+        if timeout is not None and delay > timeout:
+            self._refund(tenant)
+            raise SlotTimeoutError(f"tenant {tenant!r} is over its quota")
+
+    @contextmanager
+    def slot(self, src: str, timeout: float | None = None) -> Iterator[None]:
+        """Hold one of `src`'s slots for the duration of the block.
+
+        Raises SlotTimeoutError if the call is not admitted within `timeout`.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        tenant = _tenant.get()
+        delay = self._reserve(tenant)
+        self._check_quota(tenant, delay, timeout)
+        time.sleep(delay)
+        admitted = self._enqueue(src)
+        left = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+        done, _ = concurrent.futures.wait([admitted], timeout=left)
+        if not done:
+            self._withdraw(src, admitted)
+            raise SlotTimeoutError(f"timed out waiting for a slot on {src}")
+        try:
+            yield
+        finally:
+            self.release(src)
+
+    @asynccontextmanager
+    async def aslot(
+        self, src: str, timeout: float | None = None
+    ) -> AsyncIterator[None]:
+        """Async `slot`; waiting does not block the event loop."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        tenant = _tenant.get()
+        delay = self._reserve(tenant)
+        self._check_quota(tenant, delay, timeout)
+        await asyncio.sleep(delay)
+        admitted = self._enqueue(src)
+        left = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+        try:
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(admitted)), left)
+        except asyncio.TimeoutError:
+            self._withdraw(src, admitted)
+            raise SlotTimeoutError(f"timed out waiting for a slot on {src}") from None
+        except BaseException:
+            self._withdraw(src, admitted)
+            raise
+        try:
+            yield
+        finally:
+            self.release(src)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """In-flight and waiting calls per Space."""
+        with self._lock:
+            return {
+                src: {
+                    "inflight": space.inflight,
+                    "waiting": sum(not f.cancelled() for _, _, f in space.waiting),
+                }
+                for src, space in self._spaces.items()
+            }
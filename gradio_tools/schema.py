@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import gradio_client as grc
+
+Check = Callable[[Any], bool]
+
+# Compiled once per python type that view_api reports; unknown types,
+# e.g. dicts of component-specific keys, accept anything.
+_CHECKS: Dict[str, Check] = {
+    "str": lambda x: isinstance(x, str),
+    "int": lambda x: isinstance(x, int) and not isinstance(x, bool),
+    "float": lambda x: isinstance(x, (int, float)) and not isinstance(x, bool),
+    "int | float": lambda x: isinstance(x, (int, float)) and not isinstance(x, bool),
+    "bool": lambda x: isinstance(x, bool),
+}
+
+
+_MISSING = object()
+
+
+def _check_for(type_: str) -> Check | None:
+    if type_ in _CHECKS:
+        return _CHECKS[type_]
+    if type_.startswith(("List[", "Tuple[")):
+        return lambda x: isinstance(x, (list, tuple))
+    return None
+
+
+def _type_of(info: Dict[str, Any]) -> str:
+    python_type = info.get("python_type")
+    if isinstance(python_type, dict):
+        return python_type.get("type", "")
+    return info.get("type_python", "")
+
+
+def _name(label: str) -> str:
+    return (
+        "".join(c for c in label if c.isalnum() or c in " _").replace(" ", "_").lower()
+    )
+
+
+class EndpointBinder:
+    """Checks a call against one endpoint's signature before it is submitted.
+
+    Built once per endpoint from the Space's API info. `bind` maps keyword
+    arguments, by their parameter label, to positions and raises ValueError
+    for a call the Space would reject, so a malformed call fails at once
+    instead of after waiting in the Space's queue. None, an empty input, is
+    accepted for every parameter.
+    """
+
+    def __init__(self, endpoint: str, parameters: List[Dict[str, Any]]) -> None:
+        self.endpoint = endpoint
+        self.names = [
+            _name(p.get("label") or f"arg{i}") for i, p in enumerate(parameters)
+        ]
+        self.types = [_type_of(p) for p in parameters]
+        self.checks = [_check_for(t) for t in self.types]
+        self._positions = {name: i for i, name in enumerate(self.names)}
+
+    def bind(self, *args: Any, **kwargs: Any) -> Tuple[Any, ...]:
+        n = len(self.names)
+        if len(args) > n:
+            raise ValueError(
+                f"{self.endpoint} takes {n} argument(s) ({', '.join(self.names)}) "
+                f"but {len(args)} were given"
+            )
+        if kwargs:
+            bound: List[Any] = list(args) + [_MISSING] * (n - len(args))
+            for name, value in kwargs.items():
+                i = self._positions.get(name)
+                if i is None:
+                    raise ValueError(f"{self.endpoint} has no parameter {name!r}")
+                if bound[i] is not _MISSING:
+                    raise ValueError(f"{self.endpoint} got {name!r} twice")
+                bound[i] = value
+            args = tuple(bound)
+        missing = [self.names[i] for i in range(len(args), n)] + [
+            self.names[i] for i, a in enumerate(args) if a is _MISSING
+        ]
+        if missing:
+            raise ValueError(f"{self.endpoint} is missing {', '.join(missing)}")
+        for name, type_, check, value in zip(self.names, self.types, self.checks, args):
+            if value is not None and check is not None and not check(value):
+                raise ValueError(
+                    f"{self.endpoint} expects {name} to be {type_}, "
+                    f"not {type(value).__name__} {value!r}"
+                )
+        return args
+
+
+def config_digest(client: grc.Client) -> str:
+    """Identifies the revision of the app a client is connected to.
+
+    The config is what the client downloaded when it connected, so this
+    costs nothing; it changes whenever the app's endpoints do.
+    """
+    config = json.dumps(client.config, sort_keys=True, default=str)
+    return hashlib.sha256(config.encode()).hexdigest()
+
+
+class SchemaCache:
+    """API info from `client.view_api`, fetched once per app revision.
+
+    view_api is a network round trip (to the Space, or to the Hub for older
+    Gradio versions). Schemas are kept in memory and in `directory`, keyed by
+    the digest of the app's config, so restarts and other processes reuse
+    them until the Space changes.
+    """
+
+    def __init__(self, directory: str | Path | None = None) -> None:
+        self.directory = Path(
+            directory or Path(tempfile.gettempdir()) / "gradio_tools" / "schemas"
+        )
+        self.fetches = 0
+        self._schemas: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, client: grc.Client) -> Dict[str, Any]:
+        digest = config_digest(client)
+        with self._lock:
+            schema = self._schemas.get(digest)
+        if schema is not None:
+            return schema
+        path = self.directory / f"{digest}.json"
+        try:
+            schema = json.loads(path.read_text())
+        except (OSError, ValueError):
+            schema = client.view_api(print_info=False, return_format="dict")
+            schema = {
+                kind: {str(k): v for k, v in schema.get(kind, {}).items()}
+                for kind in ("named_endpoints", "unnamed_endpoints")
+            }
+            with self._lock:
+                self.fetches += 1
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+            tmp.write_text(json.dumps(schema))
+            os.replace(tmp, path)
+        with self._lock:
+            self._schemas[digest] = schema
+        return schema
+
+    def binder(
+        self,
+        client: grc.Client,
+        api_name: str | None = None,
+        fn_index: int | None = None,
+    ) -> EndpointBinder:
+        """The binder for an endpoint; ValueError if the app has no such endpoint."""
+        schema = self.get(client)
+        if api_name is not None:
+            info = schema["named_endpoints"].get(api_name)
+            endpoint = api_name
+        else:
+            info = schema["unnamed_endpoints"].get(str(fn_index))
+            endpoint = f"fn_index={fn_index}"
+            if info is None:
+                # Named endpoints can also be called by index.
+                info = _named_by_index(client, schema, fn_index)
+        if info is None:
+            available = list(schema["named_endpoints"]) + [
+                f"fn_index={i}" for i in schema["unnamed_endpoints"]
+            ]
+            raise ValueError(
+                f"the Space has no endpoint {endpoint}; it has {', '.join(available)}"
+            )
+        return EndpointBinder(endpoint, info.get("parameters", []))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._schemas.clear()
+            for path in self.directory.glob("*.json"):
+                path.unlink()
+
+
+def _named_by_index(
+    client: grc.Client, schema: Dict[str, Any], fn_index: int | None
+) -> Dict[str, Any] | None:
+    try:
+        api_name = client.config["dependencies"][fn_index]["api_name"]
+    except (KeyError, IndexError, TypeError):
+        return None
+    if not api_name:
+        return None
+    return schema["named_endpoints"].get("/" + api_name)
+
+
+default_schemas = SchemaCache()
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+# Failures that belong to the caller rather than to the job it was creating.
+_CALLER_ONLY = (TimeoutError, asyncio.TimeoutError, concurrent.futures.TimeoutError)
+
+
+class _Abandoned(Exception):
+    """The leader gave up before creating the job; followers try again."""
+
+
+class Flight:
+    """A caller's share of a (possibly coalesced) job."""
+
+    def __init__(self) -> None:
+        self.future: concurrent.futures.Future = concurrent.futures.Future()
+        self.waiters = 1
+
+    @property
+    def job(self) -> Any:
+        return self.future.result()
+
+    def finished(self) -> bool:
+        if not self.future.done():
+            return False
+        return self.future.exception() is not None or self.job.done()
+
+
+class SingleFlight:
+    """Share one in-flight Job between identical concurrent calls.
+
+    The first caller for a key (the leader) creates the job; callers that
+    arrive while it is still running get the same job instead of submitting
+    their own. Threads and coroutines share the same table, so a sync `run`
+    and an async `arun` for the same query also coalesce. `release` reports
+    whether the caller was the last one waiting, i.e. whether it may cancel
+    the job without pulling it out from under anyone else.
+    """
+
+    def __init__(self) -> None:
+        self.coalesced = 0
+        self._flights: Dict[str, Flight] = {}
+        self._lock = threading.Lock()
+
+    def _join(self, key: str) -> Tuple[Flight, bool]:
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None and not flight.finished():
+                flight.waiters += 1
+                self.coalesced += 1
+                return flight, False
+            flight = self._flights[key] = Flight()
+            return flight, True
+
+    def join(self, key: str, create: Callable[[], Any]) -> Flight:
+        while True:
+            flight, leader = self._join(key)
+            try:
+                if leader:
+                    flight.future.set_result(create())
+                else:
+                    flight.future.result()
+            except _Abandoned:
+                continue
+            except BaseException as e:
+                self._fail(key, flight, leader, e)
+                raise
+            return flight
+
+    async def ajoin(self, key: str, create: Callable[[], Awaitable[Any]]) -> Flight:
+        while True:
+            flight, leader = self._join(key)
+            try:
+                if leader:
+                    flight.future.set_result(await create())
+                else:
+                    # Shielded so a cancelled follower does not cancel the
+                    # leader's job for everyone else.
+                    await asyncio.shield(asyncio.wrap_future(flight.future))
+            except _Abandoned:
+                continue
+            except BaseException as e:
+                self._fail(key, flight, leader, e)
+                raise
+            return flight
+
+    def _fail(self, key: str, flight: Flight, leader: bool, e: BaseException) -> None:
+        if leader and (not isinstance(e, Exception) or isinstance(e, _CALLER_ONLY)):
+            # The leader was cancelled or ran out of time, which says nothing
+            # about the job: drop the flight so a follower creates it instead.
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            flight.future.set_exception(_Abandoned())
+            return
+        if leader:
+            flight.future.set_exception(e)
+        self.release(key, flight)
+
+    def release(self, key: str, flight: Flight) -> bool:
+        with self._lock:
+            flight.waiters -= 1
+            if flight.waiters > 0:
+                return False
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            return True
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+
+default_flight = SingleFlight()
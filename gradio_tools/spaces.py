@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import concurrent.futures
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import huggingface_hub
+from huggingface_hub.utils import HFValidationError, RepositoryNotFoundError
+
+Key = Tuple[str, Optional[str]]
+
+
+def space_runtime(src: str, hf_token: str | None = None) -> Any:
+    """The Space's runtime info from the Hub, or None if `src` is not a Space."""
+    try:
+        return huggingface_hub.get_space_runtime(src, token=hf_token)
+    except (RepositoryNotFoundError, HFValidationError):
+        return None
+
+
+def _value(x: Any) -> str | None:
+    return getattr(x, "value", x)
+
+
+@dataclass
+class SpaceRecord:
+    """What the Hub said about a src, and when."""
+
+    src: str
+    is_space: bool
+    stage: str | None = None
+    hardware: str | None = None
+    requested_hardware: str | None = None
+    resolved_at: float = 0.0
+
+    @classmethod
+    def from_runtime(cls, src: str, runtime: Any) -> SpaceRecord:
+        return cls(
+            src=src,
+            is_space=runtime is not None,
+            stage=_value(getattr(runtime, "stage", None)),
+            hardware=_value(getattr(runtime, "hardware", None)),
+            requested_hardware=_value(getattr(runtime, "requested_hardware", None)),
+            resolved_at=time.time(),
+        )
+
+
+class SpaceResolver:
+    """Memoized Hub lookups of whether a src is a Space, its stage and hardware.
+
+    Records are kept for `ttl` seconds in memory and, if `directory` is set,
+    on disk so that other processes and restarts reuse them. Concurrent
+    lookups of the same src share one request. Callers that need the live
+    stage, like prewarming, pass `refresh=True`.
+    """
+
+    def __init__(
+        self, ttl: float | None = 600.0, directory: str | Path | None = None
+    ) -> None:
+        self.ttl = ttl
+        self.directory = Path(directory) if directory is not None else None
+        self.hits = 0
+        self.misses = 0
+        self._records: Dict[Key, SpaceRecord] = {}
+        self._key_locks: Dict[Key, threading.Lock] = {}
+        self._lock = threading.Lock()
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def resolve(
+        self, src: str, hf_token: str | None = None, refresh: bool = False
+    ) -> SpaceRecord:
+        # Private Spaces are only visible with a token, so the answer depends
+        # on which token asked.
+        key = (src, hf_token)
+        if not refresh:
+            record = self._lookup(key)
+            if record is not None:
+                return record
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            if not refresh:
+                record = self._lookup(key)
+                if record is not None:
+                    return record
+            with self._lock:
+                self.misses += 1
+            record = SpaceRecord.from_runtime(src, space_runtime(src, hf_token))
+            self._store(key, record)
+        return record
+
+    def resolve_many(
+        self,
+        srcs: Iterable[str],
+        hf_token: str | None = None,
+        max_concurrency: int = 8,
+    ) -> Dict[str, SpaceRecord]:
+        """Resolve several srcs in parallel, e.g. every Space of a toolset."""
+        srcs = list(dict.fromkeys(srcs))
+        if not srcs:
+            return {}
+        workers = min(max_concurrency, len(srcs))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+            records = pool.map(lambda src: self.resolve(src, hf_token), srcs)
+            return dict(zip(srcs, records))
+
+    def _fresh(self, record: SpaceRecord) -> bool:
+        return self.ttl is None or time.time() - record.resolved_at <= self.ttl
+
+    def _lookup(self, key: Key) -> SpaceRecord | None:
+        with self._lock:
+            record = self._records.get(key)
+            if record is None:
+                record = self._read(key)
+            if record is None or not self._fresh(record):
+                return None
+            self._records[key] = record
+            self.hits += 1
+            return record
+
+    def _path(self, key: Key) -> Path:
+        src, hf_token = key
+        # Only a digest of the token goes into the file name, never the token.
+        digest = hashlib.sha256(f"{src}\0{hf_token or ''}".encode()).hexdigest()
+        return self.directory / f"{digest}.json"  # type: ignore
+
+    def _read(self, key: Key) -> SpaceRecord | None:
+        if self.directory is None:
+            return None
+        try:
+            return SpaceRecord(**json.loads(self._path(key).read_text()))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def _store(self, key: Key, record: SpaceRecord) -> None:
+        with self._lock:
+            self._records[key] = record
+        if self.directory is not None:
+            path = self._path(key)
+            tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+            tmp.write_text(json.dumps(asdict(record)))
+            os.replace(tmp, path)
+
+    def invalidate(self, src: str) -> None:
+        with self._lock:
+            for key in [k for k in self._records if k[0] == src]:
+                del self._records[key]
+                if self.directory is not None:
+                    self._path(key).unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._records.clear()
+            if self.directory is not None:
+                for path in self.directory.glob("*.json"):
+                    path.unlink()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+
+default_resolver = SpaceResolver()
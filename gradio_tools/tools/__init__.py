@@ -1,15 +1,37 @@
-from gradio_tools.tools.bark import BarkTextToSpeechTool
-from gradio_tools.tools.clip_interrogator import ClipInterrogatorTool
-from gradio_tools.tools.document_qa import DocQueryDocumentAnsweringTool
-from gradio_tools.tools.gradio_tool import GradioTool
-from gradio_tools.tools.image_captioning import ImageCaptioningTool
-from gradio_tools.tools.image_to_music import ImageToMusicTool
-from gradio_tools.tools.prompt_generator import \
-    StableDiffusionPromptGeneratorTool
-from gradio_tools.tools.sam_with_clip import SAMImageSegmentationTool
-from gradio_tools.tools.stable_diffusion import StableDiffusionTool
-from gradio_tools.tools.text_to_video import TextToVideoTool
-from gradio_tools.tools.whisper import WhisperAudioTranscriptionTool
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from gradio_tools.tools.bark import BarkTextToSpeechTool
+    from gradio_tools.tools.clip_interrogator import ClipInterrogatorTool
+    from gradio_tools.tools.document_qa import DocQueryDocumentAnsweringTool
+    from gradio_tools.tools.gradio_tool import GradioTool, warmup_all
+    from gradio_tools.tools.image_captioning import ImageCaptioningTool
+    from gradio_tools.tools.image_to_music import ImageToMusicTool
+    from gradio_tools.tools.prompt_generator import \
+        StableDiffusionPromptGeneratorTool
+    from gradio_tools.tools.sam_with_clip import SAMImageSegmentationTool
+    from gradio_tools.tools.stable_diffusion import StableDiffusionTool
+    from gradio_tools.tools.text_to_video import TextToVideoTool
+    from gradio_tools.tools.whisper import WhisperAudioTranscriptionTool
+
+# Each tool's module is imported the first time the tool is looked up.
+_LAZY = {
+    "BarkTextToSpeechTool": "gradio_tools.tools.bark",
+    "ClipInterrogatorTool": "gradio_tools.tools.clip_interrogator",
+    "DocQueryDocumentAnsweringTool": "gradio_tools.tools.document_qa",
+    "GradioTool": "gradio_tools.tools.gradio_tool",
+    "warmup_all": "gradio_tools.tools.gradio_tool",
+    "ImageCaptioningTool": "gradio_tools.tools.image_captioning",
+    "ImageToMusicTool": "gradio_tools.tools.image_to_music",
+    "StableDiffusionPromptGeneratorTool": "gradio_tools.tools.prompt_generator",
+    "SAMImageSegmentationTool": "gradio_tools.tools.sam_with_clip",
+    "StableDiffusionTool": "gradio_tools.tools.stable_diffusion",
+    "TextToVideoTool": "gradio_tools.tools.text_to_video",
+    "WhisperAudioTranscriptionTool": "gradio_tools.tools.whisper",
+}
 
 __all__ = [
     "GradioTool",
@@ -23,4 +45,18 @@ __all__ = [
     "DocQueryDocumentAnsweringTool",
     "BarkTextToSpeechTool",
     "SAMImageSegmentationTool",
+    "warmup_all",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY))
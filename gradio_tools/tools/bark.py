@@ -4,6 +4,7 @@ from typing import TYPE_CHECKING, List
 
 from gradio_client.client import Job
 
+from gradio_tools.arguments import Arg, ArgSpec
 from gradio_tools.tools.gradio_tool import GradioTool
 
 if TYPE_CHECKING:
@@ -41,9 +42,22 @@ NON_SPEECH_TOKENS = [
 ]
 
 
+def _speaker(choice: str) -> str:
+    if choice in VOICES:
+        return choice
+    if choice in SUPPORTED_LANGS:
+        return f"Speaker 0 ({SUPPORTED_LANGS[choice]})"
+    return "Unconditional"
+
+
 class BarkTextToSpeechTool(GradioTool):
     """Tool for calling bark text-to-speech llm."""
 
+    cacheable = False
+    query_args = ArgSpec(
+        Arg("text", greedy=True), Arg("speaker", _speaker, default="Unconditional")
+    )
+
     def __init__(
         self,
         name="BarkTextToSpeech",
@@ -58,24 +72,13 @@ class BarkTextToSpeechTool(GradioTool):
         src="suno/bark",
         hf_token=None,
         duplicate=False,
+        **kwargs,
     ) -> None:
-        super().__init__(name, description, src, hf_token, duplicate)
+        super().__init__(name, description, src, hf_token, duplicate, **kwargs)
 
     def create_job(self, query: str) -> Job:
-        try:
-            text, speaker = (
-                query[: query.rindex("|")],
-                query[(query.rindex("|") + 1) :].strip(),
-            )
-        except ValueError:
-            text, speaker = query, "Unconditional"
-        if speaker in VOICES:
-            pass
-        elif speaker in SUPPORTED_LANGS:
-            speaker = f"Speaker 0 ({SUPPORTED_LANGS[speaker]})"
-        else:
-            speaker = "Unconditional"
-        return self.client.submit(text, speaker, fn_index=3)
+        text, speaker = self.parse_query(query)
+        return self.submit_api(text, speaker, fn_index=3)
 
     def postprocess(self, output: str) -> str:
         return output
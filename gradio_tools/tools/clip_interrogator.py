@@ -20,11 +20,12 @@ class ClipInterrogatorTool(GradioTool):
         src="pharma/CLIP-Interrogator",
         hf_token=None,
         duplicate=True,
+        **kwargs,
     ) -> None:
-        super().__init__(name, description, src, hf_token, duplicate)
+        super().__init__(name, description, src, hf_token, duplicate, **kwargs)
 
     def create_job(self, query: str) -> Job:
-        return self.client.submit(
+        return self.submit_api(
             query, "ViT-L (best for Stable Diffusion 1.*)", "best", fn_index=3
         )
 
@@ -2,6 +2,7 @@ from typing import TYPE_CHECKING, List
 
 from gradio_client.client import Job
 
+from gradio_tools.arguments import Arg, ArgSpec
 from gradio_tools.tools.gradio_tool import GradioTool
 
 if TYPE_CHECKING:
@@ -9,6 +10,8 @@ if TYPE_CHECKING:
 
 
 class DocQueryDocumentAnsweringTool(GradioTool):
+    query_args = ArgSpec(Arg("image"), Arg("question", greedy=True))
+
     def __init__(
         self,
         name="DocQuery",
@@ -19,12 +22,13 @@ class DocQueryDocumentAnsweringTool(GradioTool):
         src="abidlabs/docquery",
         hf_token=None,
         duplicate=True,
+        **kwargs,
     ) -> None:
-        super().__init__(name, description, src, hf_token, duplicate)
+        super().__init__(name, description, src, hf_token, duplicate, **kwargs)
 
     def create_job(self, query: str) -> Job:
-        img, question = query.split("|")
-        return self.client.submit(img.strip(), question.strip(), api_name="/predict")
+        img, question = self.parse_query(query)
+        return self.submit_api(img, question, api_name="/predict")
 
     def postprocess(self, output: str) -> str:
         return output
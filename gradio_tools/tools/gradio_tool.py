@@ -1,23 +1,52 @@
 from __future__ import annotations
 
+import asyncio
+import concurrent.futures
+import contextlib
+import functools
+import threading
 import time
 from abc import abstractmethod
-from typing import Any, List, Tuple, Union
+from typing import (Any, AsyncIterator, ContextManager, Dict, Iterable,
+                    Iterator, List, Sequence, Tuple, Union)
 
 import gradio_client as grc
-import huggingface_hub
 from gradio_client.client import Job
 from gradio_client.utils import QueueError
 
-try:
-    import langchain as lc
-
-    LANGCHAIN_INSTALLED = True
-except (ModuleNotFoundError, ImportError):
-    LANGCHAIN_INSTALLED = False
+from gradio_tools.arguments import ArgSpec
+from gradio_tools.artifacts import ArtifactStore
+from gradio_tools.batching import MicroBatcher
+from gradio_tools.cache import MISSING, ResultCache, cache_key
+from gradio_tools.client_pool import ClientPool, default_pool
+from gradio_tools.duplicates import DuplicateRegistry
+from gradio_tools.instrumentation import (Instrumentation, JobTimer,
+                                          downloads_of, time_downloads,
+                                          track_downloads)
+from gradio_tools.jobs import (STATUS_INTERVAL, Backoff, BatchResult,
+                               StreamEvent, async_wait_for_job, remaining,
+                               run_concurrently, wait_for_job)
+from gradio_tools.prewarm import prewarm_executor, wake_space
+from gradio_tools.replicas import STRATEGIES, ReplicaSet
+from gradio_tools.retry import (CircuitBreaker, QueryError, RetryPolicy,
+                                ToolError, ToolTimeoutError)
+from gradio_tools.scheduler import (BATCH, Scheduler, SlotTimeoutError,
+                                    with_priority)
+from gradio_tools.schema import EndpointBinder, SchemaCache, default_schemas
+from gradio_tools.singleflight import Flight, default_flight
+from gradio_tools.spaces import SpaceResolver, default_resolver
+from gradio_tools.uploads import UploadManager, default_uploads
+from gradio_tools.workers import WorkerPool, WorkerPoolFull
 
 
 class GradioTool:
+    # Tools whose Space samples randomly set this to False so that `cache`
+    # never replays an earlier generation.
+    cacheable = True
+    # Tools that take several arguments in one query declare them here and
+    # read them with `parse_query`.
+    query_args: ArgSpec | None = None
+
     def __init__(
         self,
         name: str,
@@ -25,48 +54,756 @@ class GradioTool:
         src: str,
         hf_token: str | None = None,
         duplicate: bool = True,
+        backoff: Backoff | None = None,
+        client_pool: ClientPool | None = None,
+        cache: ResultCache | None = None,
+        coalesce: bool | None = None,
+        replicas: int | Sequence[str] | None = None,
+        replica_strategy: str = "least_outstanding",
+        cooldown: float = 60.0,
+        retry: RetryPolicy | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        instrumentation: Instrumentation | None = None,
+        uploads: UploadManager | None = None,
+        artifacts: ArtifactStore | None = None,
+        resolver: SpaceResolver | None = None,
+        registry: DuplicateRegistry | None = None,
+        executor: WorkerPool | None = None,
+        scheduler: Scheduler | None = None,
+        batcher: MicroBatcher | None = None,
+        schemas: SchemaCache | None = None,
     ) -> None:
         self.name = name
         self.description = description
-        if hf_token and self._is_space(src) and duplicate:
-            self.client = grc.Client.duplicate(from_id=src, hf_token=hf_token)
-            self.src = self.client.space_id
-        else:
-            self.src = src
-            self.client = grc.Client(self.src, hf_token=hf_token)
-        self.description += (
-            "If the output is the string QUEUE_FULL you "
-            "should try this action again and never stop until you "
-            "don't see this message."
-        )
+        self.src = src
+        # `src` becomes the duplicate's id on warmup; remember where it came from.
+        self.origin_src = src
+        self.hf_token = hf_token
+        self.duplicate = duplicate
+        self.client_pool = client_pool
+        if isinstance(replicas, int) and not hf_token:
+            raise ValueError("replicas=N duplicates the Space and needs an hf_token")
+        if replica_strategy not in STRATEGIES:
+            raise ValueError(
+                f"replica_strategy must be one of {STRATEGIES}, not {replica_strategy}"
+            )
+        self.replicas = replicas
+        # How the replicas' ReplicaSet picks a copy and rests a full one.
+        self.replica_strategy = replica_strategy
+        self.cooldown = cooldown
+        self._client: grc.Client | None = None
+        self._client_lock = threading.Lock()
+        self.backoff = backoff or Backoff()
+        self.cache = cache
+        # Identical concurrent calls share one job, unless sharing would hand
+        # several callers the same sample from a non-deterministic Space.
+        self.coalesce = self.cacheable if coalesce is None else coalesce
+        self.retry = retry or RetryPolicy()
+        self.circuit_breaker = circuit_breaker
+        self.instrumentation = instrumentation
+        self.uploads = uploads or default_uploads
+        self.artifacts = artifacts
+        self.resolver = default_resolver if resolver is None else resolver
+        # Set to share duplicated Spaces between processes and restarts.
+        self.registry = registry
+        # Set to run calls on a bounded pool of threads or processes.
+        self.executor = executor
+        # Set to queue calls by priority and tenant before they reach the Space.
+        self.scheduler = scheduler
+        # Set to submit concurrent calls together, in batches.
+        self.batcher = batcher
+        self.schemas = schemas or default_schemas
+        self._check_executor()
+        # Compiled per endpoint; None where the Space's API info is unavailable.
+        self._binders: Dict[Tuple[str | None, int | None], EndpointBinder | None] = {}
+        self.timeouts = 0
+        self.cancellations = 0
+        self._stats_lock = threading.Lock()
+        self._prewarm: concurrent.futures.Future | None = None
+        self._prewarm_lock = threading.Lock()
         self._block = None
 
-    @staticmethod
-    def _is_space(src: str) -> bool:
-        try:
-            huggingface_hub.get_space_runtime(src)
-            return True
-        except huggingface_hub.hf_api.RepositoryNotFoundError:
-            return False
+    # Attributes that only make sense in the process that created them. A
+    # pickled tool, e.g. one sent to a process WorkerPool, leaves them behind
+    # and connects to its Space again when it is first used.
+    _process_local = (
+        "_client",
+        "_client_lock",
+        "_stats_lock",
+        "_prewarm",
+        "_prewarm_lock",
+        "_block",
+        "client_pool",
+        "cache",
+        "circuit_breaker",
+        "instrumentation",
+        "uploads",
+        "artifacts",
+        "resolver",
+        "registry",
+        "executor",
+        "scheduler",
+        "batcher",
+        "schemas",
+        "_binders",
+    )
+
+    # Options a pickled tool would lose, so a process WorkerPool can't honour them.
+    _parent_only = (
+        "cache",
+        "circuit_breaker",
+        "instrumentation",
+        "artifacts",
+        "scheduler",
+        "batcher",
+    )
+
+    def _check_executor(self) -> None:
+        if self.executor is None or not self.executor.processes:
+            return
+        lost = [attr for attr in self._parent_only if getattr(self, attr) is not None]
+        if lost:
+            raise ValueError(
+                f"{', '.join(lost)} can't be used with a process WorkerPool; "
+                "use a thread pool instead"
+            )
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        for attr in self._process_local:
+            state.pop(attr, None)
+        # The duplicate is reattached to by its id rather than duplicated again.
+        if self._client is not None:
+            state["duplicate"] = False
+            if isinstance(self.replicas, int):
+                state["replicas"] = [client.space_id for client in self._clients()]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        for attr in self._process_local:
+            self.__dict__.setdefault(attr, None)
+        self._client_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._prewarm_lock = threading.Lock()
+        self.uploads = default_uploads
+        self.resolver = default_resolver
+        self.schemas = default_schemas
+        self._binders = {}
+
+    @property
+    def client(self) -> grc.Client:
+        if self._client is None:
+            self.warmup()
+        return self._client  # type: ignore
+
+    @client.setter
+    def client(self, client: grc.Client) -> None:
+        self._client = client
+
+    def warmup(self) -> GradioTool:
+        """Connect to the Space now rather than on the first job.
+
+        Space detection, duplication and client creation all happen here.
+        """
+        with self._client_lock:
+            if self._client is None:
+                start = time.perf_counter()
+                self._client = self._connect()
+                for client in self._clients():
+                    self.uploads.install(client)
+                    if self.artifacts is not None:
+                        self.artifacts.install(client)
+                    time_downloads(client)
+                self._record("client_init", time.perf_counter() - start)
+        return self
+
+    def _pool(self) -> ClientPool:
+        if self.artifacts is not None and self.client_pool is None:
+            # Lazy outputs change what the client returns, so don't hand this
+            # client to tools that expect downloaded files.
+            return self.artifacts.clients
+        # Not `or`: an empty pool is falsy.
+        return default_pool if self.client_pool is None else self.client_pool
+
+    def _connect(self) -> grc.Client:
+        pool = self._pool()
+        if isinstance(self.replicas, int):
+            names = [None] + [
+                f"{self.src.split('/')[-1]}-replica-{i}"
+                for i in range(1, self.replicas)
+            ]
+            with concurrent.futures.ThreadPoolExecutor(len(names)) as executor:
+                clients = list(executor.map(self._duplicate, names))
+            self.src = clients[0].space_id
+            return self._replica_set(clients)
+        if self.replicas:
+            clients = [pool.get(src, self.hf_token) for src in self.replicas]
+            return self._replica_set(clients)
+        if self.hf_token and self.duplicate and self._is_space(self.src):
+            client = self._duplicate(None)
+            self.src = client.space_id
+            return client
+        return pool.get(self.src, self.hf_token)
+
+    def _replica_set(self, clients: List[grc.Client]) -> grc.Client:
+        return ReplicaSet(clients, self.replica_strategy, self.cooldown)  # type: ignore
+
+    def _clients(self) -> List[grc.Client]:
+        if isinstance(self._client, ReplicaSet):
+            return [replica.client for replica in self._client.replicas]
+        return [self._client]  # type: ignore
+
+    def _duplicate(self, to_id: str | None) -> grc.Client:
+        def duplicate() -> grc.Client:
+            return grc.Client.duplicate(
+                from_id=self.src, to_id=to_id, hf_token=self.hf_token
+            )
+
+        if self.registry is None:
+            return duplicate()
+        return self.registry.attach(
+            self.src,
+            self.hf_token,  # type: ignore
+            to_id,
+            duplicate,
+            lambda space_id: grc.Client(space_id, hf_token=self.hf_token),
+        )
+
+    def prewarm(self) -> concurrent.futures.Future:
+        """Wake the tool's Space and warm up its client in the background.
+
+        The Spaces woken are the ones the tool calls: its duplicates or
+        replicas, if it has any, rather than the Space it was given.
+
+        Returns a Future that resolves to the tool once it is ready. Calling
+        this again while a prewarm is running returns the same Future;
+        calling it after one finished checks the Space again, in case it
+        went back to sleep.
+        """
+        with self._prewarm_lock:
+            if self._prewarm is None or self._prewarm.done():
+                self._prewarm = prewarm_executor.submit(self._wake_and_warmup)
+            return self._prewarm
+
+    def _wake_and_warmup(self) -> GradioTool:
+        srcs = self.replicas if isinstance(self.replicas, list) else [self.src]
+        if self._client is None and self._duplicates():
+            # The duplicates to wake are only known once warmup finds them.
+            srcs = []
+        self._wake(srcs)
+        self.warmup()
+        self._wake(
+            [
+                client.space_id
+                for client in self._clients()
+                if client.space_id and client.space_id not in srcs
+            ]
+        )
+        return self
+
+    def _duplicates(self) -> bool:
+        """Whether warmup connects to duplicates rather than to `src` as given."""
+        if self.replicas:
+            return isinstance(self.replicas, int)
+        return bool(self.hf_token and self.duplicate)
+
+    def _wake(self, srcs: Iterable[str]) -> None:
+        for src in srcs:
+            try:
+                if wake_space(src, self.hf_token, resolver=self.resolver):
+                    self._count("wakeups")
+            except Exception:
+                # Waking is best effort; warmup reports real problems.
+                pass
+
+    def _is_space(self, src: str) -> bool:
+        return self.resolver.resolve(src, self.hf_token).is_space
 
     @abstractmethod
     def create_job(self, query: str) -> Job:
         pass
 
+    def parse_query(self, query: str) -> Tuple[Any, ...]:
+        """Split `query` into the arguments declared in `query_args`."""
+        try:
+            return self.query_args.parse(query, type(self).__name__)  # type: ignore
+        except QueryError:
+            self._count("invalid")
+            raise
+
+    def submit_api(
+        self,
+        *args: Any,
+        api_name: str | None = None,
+        fn_index: int | None = None,
+        **kwargs: Any,
+    ) -> Job:
+        """Submit a call to one of the Space's endpoints, as `create_job` does.
+
+        The call is checked against the endpoint's signature from the
+        Space's API info first, and ToolError is raised without contacting
+        the Space if the endpoint is gone or the arguments don't fit it.
+        Keyword arguments are matched to the endpoint's parameter labels.
+        """
+        binder = self._binder(api_name, fn_index)
+        if binder is not None:
+            try:
+                args = binder.bind(*args, **kwargs)
+            except ValueError as e:
+                self._count("invalid")
+                raise ToolError(self.name, str(e)) from e
+        elif kwargs:
+            raise ToolError(self.name, "keyword arguments need the Space's API info")
+        if api_name is not None:
+            submit = functools.partial(self.client.submit, *args, api_name=api_name)
+        else:
+            submit = functools.partial(self.client.submit, *args, fn_index=fn_index)
+        return track_downloads(submit)
+
+    def _binder(
+        self, api_name: str | None, fn_index: int | None
+    ) -> EndpointBinder | None:
+        key = (api_name, fn_index)
+        if key in self._binders:
+            return self._binders[key]
+        client = self.client
+        if isinstance(client, ReplicaSet):
+            client = self._clients()[0]
+        try:
+            self.schemas.get(client)
+        except Exception:
+            # No API info (an old Gradio, or no network to the Hub): submit
+            # unchecked rather than fail.
+            self._binders[key] = None
+            return None
+        try:
+            binder = self.schemas.binder(client, api_name, fn_index)
+        except ValueError as e:
+            self._count("invalid")
+            raise ToolError(self.name, str(e)) from e
+        self._binders[key] = binder
+        return binder
+
+    async def acreate_job(self, query: str) -> Job:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.create_job, query)
+
+    def batches(self) -> bool:
+        """Whether a MicroBatcher should group concurrent calls to this tool.
+
+        True for tools whose endpoint the Space runs with `batch=True`, or
+        that override `create_batch_job`. A MicroBatcher passes calls to
+        other tools straight through.
+        """
+        return False
+
+    def create_batch_job(self, queries: List[str]) -> Job | None:
+        """Submit `queries` as one request, for endpoints that accept batches.
+
+        The job's result must hold one output per query, in order. Returns
+        None, the default, when the Space's endpoint takes one input at a
+        time; a MicroBatcher then submits the queries as separate jobs.
+        """
+        return None
+
+    def endpoint_batches(
+        self, api_name: str | None = None, fn_index: int | None = None
+    ) -> bool:
+        """Whether the Space runs an endpoint with `batch=True`.
+
+        Gradio's queue runs the requests to such an endpoint that are waiting
+        together as one batch, so calls submitted back to back share a pass
+        on the GPU.
+        """
+        try:
+            dependencies = self.client.config["dependencies"]
+            if api_name is not None:
+                name = api_name.lstrip("/")
+                dependency = next(d for d in dependencies if d["api_name"] == name)
+            else:
+                dependency = dependencies[fn_index]
+            return bool(dependency.get("batch"))
+        except (AttributeError, KeyError, IndexError, TypeError, StopIteration):
+            return False
+
+    def _new_job(self, query: str) -> Job:
+        if self.batcher is None:
+            return self.create_job(query)
+        return self.batcher.submit(self, query)
+
+    async def _anew_job(self, query: str) -> Job:
+        if self.batcher is None:
+            return await self.acreate_job(query)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.batcher.submit, self, query)
+
     @abstractmethod
     def postprocess(self, output: Union[Tuple[Any], Any]) -> str:
         pass
 
-    def run(self, query: str):
-        job = self.create_job(query)
-        while not job.done():
-            status = job.status()
-            print(f"\nJob Status: {str(status.code)} eta: {status.eta}")
-            time.sleep(30)
+    def run(self, query: str, timeout: float | None = None):
+        """Run the tool on `query`.
+
+        If `timeout` seconds pass without a result, the remote job is
+        cancelled and ToolTimeoutError is raised. With an `executor`, the call
+        runs on one of its workers and this blocks until it is done.
+        """
+        if self.executor is not None and not self.executor.in_worker():
+            return self.submit(query, timeout).result()
+        return self._run(query, timeout)
+
+    def submit(
+        self, query: str, timeout: float | None = None
+    ) -> concurrent.futures.Future:
+        """Dispatch `run(query)` to the tool's executor and return its Future.
+
+        Waits for room if the executor is saturated, and raises ToolError if
+        it stays saturated for longer than the executor's `block_timeout`.
+        """
+        if self.executor is None:
+            raise ValueError("submit needs a tool created with an executor")
+        self._check_executor()
+        if self.executor.processes:
+            # Duplicate in this process so the workers all attach to one copy.
+            self.warmup()
+        try:
+            return self.executor.submit(self._run, query, timeout)
+        except WorkerPoolFull as e:
+            self._count("rejected")
+            raise ToolError(self.name, str(e)) from e
+
+    def _run(self, query: str, timeout: float | None = None):
+        start = time.perf_counter()
+        try:
+            key, cached = self._lookup(query)
+            if cached is not MISSING:
+                return cached
+            deadline = None if timeout is None else time.monotonic() + timeout
+            try:
+                output = self.retry.call(
+                    lambda: self._attempt(key, query, deadline),
+                    self.name,
+                    self.origin_src,
+                    self.circuit_breaker,
+                    self._on_retry,
+                    deadline,
+                )
+            except ToolError:
+                self._count("failures")
+                raise
+            return self._store(key, output)
+        finally:
+            self._record("run", time.perf_counter() - start)
+
+    async def arun(self, query: str, timeout: float | None = None):
+        """Async `run`. Cancelling the awaiting task also cancels the remote job."""
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            key, cached = await loop.run_in_executor(None, self._lookup, query)
+            if cached is not MISSING:
+                return cached
+            deadline = None if timeout is None else time.monotonic() + timeout
+            try:
+                output = await self.retry.acall(
+                    lambda: self._aattempt(key, query, deadline),
+                    self.name,
+                    self.origin_src,
+                    self.circuit_breaker,
+                    self._on_retry,
+                    deadline,
+                )
+            except ToolError:
+                self._count("failures")
+                raise
+            return await loop.run_in_executor(None, self._store, key, output)
+        finally:
+            self._record("run", time.perf_counter() - start)
+
+    def run_stream(
+        self, query: str, timeout: float | None = None
+    ) -> Iterator[StreamEvent]:
+        """Run the tool on `query`, yielding events as the job progresses.
+
+        Spaces that stream (generator endpoints) produce an "output" event for
+        each partial output; every job produces "status" events as its status
+        changes and ends with a "result" event. Streamed calls are not retried
+        or coalesced. Closing the generator early cancels the remote job.
+        """
+        key, cached = self._lookup(query)
+        if cached is not MISSING:
+            yield StreamEvent("result", output=cached)
+            return
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._admitted(deadline):
+            job = self.create_job(query)
+            seen, last_code, done = 0, None, False
+            try:
+                while not done:
+                    done = wait_for_job(
+                        job, self.backoff, remaining(deadline, STATUS_INTERVAL)
+                    )
+                    for output in _outputs(job)[seen:]:
+                        seen += 1
+                        yield StreamEvent("output", output=self.postprocess(output))
+                    status = job.status()
+                    if status.code != last_code:
+                        last_code = status.code
+                        yield StreamEvent("status", status=status)
+                    if not done and deadline is not None:
+                        self._check_deadline(deadline)
+            finally:
+                if not done:
+                    self._abandon(None, None, job)
+        output = self._store(key, self.postprocess(job.result()))
+        yield StreamEvent("result", output=output)
+
+    async def arun_stream(
+        self, query: str, timeout: float | None = None
+    ) -> AsyncIterator[StreamEvent]:
+        """Async `run_stream`."""
+        loop = asyncio.get_running_loop()
+        key, cached = await loop.run_in_executor(None, self._lookup, query)
+        if cached is not MISSING:
+            yield StreamEvent("result", output=cached)
+            return
+        deadline = None if timeout is None else time.monotonic() + timeout
+        async with self._aadmitted(deadline):
+            job = await self.acreate_job(query)
+            seen, last_code, done = 0, None, False
+            try:
+                while not done:
+                    done = await async_wait_for_job(
+                        job, self.backoff, remaining(deadline, STATUS_INTERVAL)
+                    )
+                    for output in _outputs(job)[seen:]:
+                        seen += 1
+                        yield StreamEvent("output", output=self.postprocess(output))
+                    status = job.status()
+                    if status.code != last_code:
+                        last_code = status.code
+                        yield StreamEvent("status", status=status)
+                    if not done and deadline is not None:
+                        self._check_deadline(deadline)
+            finally:
+                if not done:
+                    self._abandon(None, None, job)
+        output = self.postprocess(job.result())
+        output = await loop.run_in_executor(None, self._store, key, output)
+        yield StreamEvent("result", output=output)
+
+    def _attempt(self, key: str | None, query: str, deadline: float | None):
+        self._check_deadline(deadline)
+        with self._admitted(deadline):
+            return self._submit_and_wait(key, query, deadline)
+
+    def _submit_and_wait(self, key: str | None, query: str, deadline: float | None):
+        start = time.perf_counter()
+        flight, key = None, self._flight_key(key)
+        if key is not None:
+            flight = default_flight.join(key, lambda: self._new_job(query))
+            job = flight.job
+        else:
+            job = self._new_job(query)
+        self._record("submit", time.perf_counter() - start)
+        timer = self._job_timer()
+        try:
+            done = wait_for_job(
+                job, self.backoff, remaining(deadline), timer and timer.on_status
+            )
+        except BaseException:
+            self._abandon(key, flight, job)
+            raise
+        return self._finish(key, flight, job, done, timer)
+
+    async def _aattempt(self, key: str | None, query: str, deadline: float | None):
+        self._check_deadline(deadline)
+        async with self._aadmitted(deadline):
+            return await self._asubmit_and_wait(key, query, deadline)
+
+    async def _asubmit_and_wait(
+        self, key: str | None, query: str, deadline: float | None
+    ):
+        start = time.perf_counter()
+        flight, key = None, self._flight_key(key)
+        if key is not None:
+            flight = await default_flight.ajoin(key, lambda: self._anew_job(query))
+            job = flight.job
+        else:
+            job = await self._anew_job(query)
+        self._record("submit", time.perf_counter() - start)
+        timer = self._job_timer()
+        try:
+            done = await async_wait_for_job(
+                job, self.backoff, remaining(deadline), timer and timer.on_status
+            )
+        except BaseException:
+            self._abandon(key, flight, job)
+            raise
+        return self._finish(key, flight, job, done, timer)
+
+    @contextlib.contextmanager
+    def _admitted(self, deadline: float | None) -> Iterator[None]:
+        """Wait for the scheduler, if any, to let this call reach the Space.
+
+        The tool's pooled clients count as in use until the call is done.
+        """
+        self.warmup()
+        with self._in_use():
+            if self.scheduler is None:
+                yield
+                return
+            start = time.perf_counter()
+            try:
+                with self.scheduler.slot(self.src, remaining(deadline)):
+                    self._record("admission", time.perf_counter() - start)
+                    yield
+            except SlotTimeoutError as e:
+                self._count("timeouts")
+                raise ToolTimeoutError(self.name, str(e)) from e
+
+    @contextlib.asynccontextmanager
+    async def _aadmitted(self, deadline: float | None) -> AsyncIterator[None]:
+        if self._client is None:
+            await asyncio.get_running_loop().run_in_executor(None, self.warmup)
+        with self._in_use():
+            if self.scheduler is None:
+                yield
+                return
+            start = time.perf_counter()
+            try:
+                async with self.scheduler.aslot(self.src, remaining(deadline)):
+                    self._record("admission", time.perf_counter() - start)
+                    yield
+            except SlotTimeoutError as e:
+                self._count("timeouts")
+                raise ToolTimeoutError(self.name, str(e)) from e
+
+    def _in_use(self) -> ContextManager[None]:
+        srcs = self.replicas if isinstance(self.replicas, list) else [self.src]
+        return self._pool().in_use(srcs, self.hf_token)
+
+    def _finish(
+        self,
+        key: str | None,
+        flight: Flight | None,
+        job: Job,
+        done: bool,
+        timer: JobTimer | None,
+    ):
+        if not done:
+            self._abandon(key, flight, job)
+            self._count("timeouts")
+            raise ToolTimeoutError(self.name, "timed out waiting for the Space")
+        if flight is not None:
+            default_flight.release(key, flight)  # type: ignore
+        if timer is not None:
+            timer.finished(downloads_of(job))
         try:
-            output = self.postprocess(job.result())
+            result = job.result()
         except QueueError:
-            output = "QUEUE_FULL"
+            self._count("queue_full")
+            raise
+        start = time.perf_counter()
+        output = self.postprocess(result)
+        self._record("postprocess", time.perf_counter() - start)
+        return output
+
+    def _abandon(self, key: str | None, flight: Flight | None, job: Job) -> None:
+        """Give up on `job`, cancelling it unless coalesced callers still want it."""
+        if flight is None or default_flight.release(key, flight):  # type: ignore
+            cancel = getattr(job, "cancel", None)
+            if cancel is not None:
+                cancel()
+                self._count("cancellations")
+
+    def _check_deadline(self, deadline: float | None) -> None:
+        if deadline is not None and time.monotonic() >= deadline:
+            self._count("timeouts")
+            raise ToolTimeoutError(self.name, "timed out waiting for the Space")
+
+    def _job_timer(self) -> JobTimer | None:
+        if self.instrumentation is None:
+            return None
+        return JobTimer(self, self.instrumentation)
+
+    def _on_retry(self, error: BaseException) -> None:
+        self._count("retries")
+
+    def _record(self, span: str, seconds: float) -> None:
+        if self.instrumentation is not None:
+            self.instrumentation.record(self, span, seconds)
+
+    def _count(self, counter: str) -> None:
+        if counter in ("timeouts", "cancellations"):
+            with self._stats_lock:
+                setattr(self, counter, getattr(self, counter) + 1)
+        if self.instrumentation is not None:
+            self.instrumentation.count(self, counter)
+
+    def run_many(
+        self,
+        queries: Iterable[str],
+        max_concurrency: int = 4,
+        ordered: bool = True,
+        timeout: float | None = None,
+    ) -> Iterator[BatchResult]:
+        """Run every query, keeping up to `max_concurrency` jobs in flight.
+
+        Yields a BatchResult per query, in input order or, if `ordered` is False,
+        in completion order. Failed queries carry their exception in `error`.
+        `timeout` applies to each query separately. With an `executor`, the
+        executor bounds concurrency instead of `max_concurrency`. Unless the
+        caller set a priority with `call_context`, the calls run at BATCH
+        priority.
+        """
+        if self.executor is not None:
+            run = functools.partial(self._run, timeout=timeout)
+            run = functools.partial(with_priority, BATCH, run)
+            return self.executor.map(run, queries, ordered)
+        run = functools.partial(self.run, timeout=timeout)
+        run = functools.partial(with_priority, BATCH, run)
+        return run_concurrently(run, queries, max_concurrency, ordered)
+
+    def _caching(self) -> bool:
+        return self.cache is not None and self.cacheable
+
+    def _call_key(self, query: str) -> str | None:
+        if self._caching() or self.coalesce:
+            return cache_key(self, query)
+        return None
+
+    def _flight_key(self, key: str | None) -> str | None:
+        """The key identical in-flight calls share, if they may be coalesced.
+
+        Only calls that would reach the Space through the same client share
+        a job, so tools with different tokens, duplicates or client pools
+        never receive each other's results.
+        """
+        if key is None or not self.coalesce:
+            return None
+        return f"{key}:{id(self.client)}"
+
+    def _lookup(self, query: str) -> Tuple[str | None, Any]:
+        """The call key for `query` and its cached output, or MISSING.
+
+        Both may hash files and read a disk cache, so the async methods run
+        this, and `_store`, in an executor.
+        """
+        key = self._call_key(query)
+        return key, self._cached(key)
+
+    def _cached(self, key: str | None) -> Any:
+        if key is None or not self._caching():
+            return MISSING
+        cached = self.cache.get(key, MISSING)  # type: ignore
+        self._count("cache_misses" if cached is MISSING else "cache_hits")
+        return cached
+
+    def _store(self, key: str | None, output: Any) -> Any:
+        if key is not None and self._caching():
+            self.cache.set(key, output)  # type: ignore
         return output
 
     # Optional gradio functionalities
@@ -113,14 +850,46 @@ class GradioTool:
     # Optional langchain functionalities
     @property
     def langchain(self) -> "langchain.agents.Tool":  # type: ignore
-        if not LANGCHAIN_INSTALLED:
+        # Imported here rather than with the module: langchain is slow to
+        # import and most workers never ask for it.
+        try:
+            import langchain as lc
+        except (ModuleNotFoundError, ImportError):
             raise ModuleNotFoundError(
                 "langchain must be installed to access langchain tool"
             )
 
+        def func(query: str):
+            try:
+                return self.run(query)
+            except ToolError as e:
+                return str(e)
+
+        async def coroutine(query: str):
+            try:
+                return await self.arun(query)
+            except ToolError as e:
+                return str(e)
+
         return lc.agents.Tool(  # type: ignore
-            name=self.name, func=self.run, description=self.description
+            name=self.name,
+            func=func,
+            coroutine=coroutine,
+            description=self.description,
         )
 
     def __repr__(self) -> str:
         return f"GradioTool(name={self.name}, src={self.src})"
+
+
+def _outputs(job: Job) -> List[Any]:
+    outputs = getattr(job, "outputs", None)
+    return list(outputs()) if outputs is not None else []
+
+
+def warmup_all(
+    tools: Iterable[GradioTool], max_concurrency: int = 8
+) -> List[GradioTool]:
+    """Warm up several tools in parallel, e.g. every tool an agent registers."""
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        return list(pool.map(lambda tool: tool.warmup(), tools))
@@ -24,11 +24,12 @@ class ImageCaptioningTool(GradioTool):
         src="gradio-client-demos/BLIP-2",
         hf_token=None,
         duplicate=True,
+        **kwargs,
     ) -> None:
-        super().__init__(name, description, src, hf_token, duplicate)
+        super().__init__(name, description, src, hf_token, duplicate, **kwargs)
 
     def create_job(self, query: str) -> Job:
-        return self.client.submit(query.strip("'"), "Beam Search", fn_index=0)
+        return self.submit_api(query.strip("'"), "Beam Search", fn_index=0)
 
     def postprocess(self, output: str) -> str:
         return output  # type: ignore
@@ -9,6 +9,8 @@ if TYPE_CHECKING:
 
 
 class ImageToMusicTool(GradioTool):
+    cacheable = False
+
     def __init__(
         self,
         name="ImagetoMusic",
@@ -20,13 +22,12 @@ class ImageToMusicTool(GradioTool):
         src="fffiloni/img-to-music",
         hf_token=None,
         duplicate=False,
+        **kwargs,
     ) -> None:
-        super().__init__(name, description, src, hf_token, duplicate)
+        super().__init__(name, description, src, hf_token, duplicate, **kwargs)
 
     def create_job(self, query: str) -> Job:
-        return self.client.submit(
-            query.strip("'"), 15, "medium", "loop", None, fn_index=0
-        )
+        return self.submit_api(query.strip("'"), 15, "medium", "loop", None, fn_index=0)
 
     def postprocess(self, output: Union[Tuple[Any], Any]) -> str:
         return output[1]  # type: ignore
@@ -18,11 +18,15 @@ class StableDiffusionPromptGeneratorTool(GradioTool):
         src="microsoft/Promptist",
         hf_token=None,
         duplicate=False,
+        **kwargs,
     ) -> None:
-        super().__init__(name, description, src, hf_token, duplicate)
+        super().__init__(name, description, src, hf_token, duplicate, **kwargs)
 
     def create_job(self, query: str) -> Job:
-        return self.client.submit(query, api_name="/predict")
+        return self.submit_api(query, api_name="/predict")
+
+    def batches(self) -> bool:
+        return self.endpoint_batches(api_name="/predict")
 
     def postprocess(self, output: str) -> str:
         return output
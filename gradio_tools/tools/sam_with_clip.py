@@ -4,15 +4,29 @@ from typing import TYPE_CHECKING, List
 
 from gradio_client.client import Job
 
+from gradio_tools.arguments import Arg, ArgSpec, between
 from gradio_tools.tools.gradio_tool import GradioTool
 
 if TYPE_CHECKING:
     import gradio as gr
 
 
+def _threshold(name: str) -> Arg:
+    return Arg(name, float, check=between(0, 1), requirement="between 0 and 1")
+
+
 class SAMImageSegmentationTool(GradioTool):
     """Tool for segmenting images based on natural language queries."""
 
+    # The description asks the agent for every threshold, defaults included.
+    query_args = ArgSpec(
+        Arg("image"),
+        Arg("query"),
+        _threshold("predicted_iou_threshold"),
+        _threshold("stability_score_threshold"),
+        _threshold("clip_threshold"),
+    )
+
     def __init__(
         self,
         name="SAMImageSegmentation",
@@ -30,29 +44,24 @@ class SAMImageSegmentationTool(GradioTool):
         src="curt-park/segment-anything-with-clip",
         hf_token=None,
         duplicate=False,
+        **kwargs,
     ) -> None:
-        super().__init__(name, description, src, hf_token, duplicate)
+        super().__init__(name, description, src, hf_token, duplicate, **kwargs)
 
     def create_job(self, query: str) -> Job:
-        try:
-            (
-                image,
-                query,
-                predicted_iou_threshold,
-                stability_score_threshold,
-                clip_threshold,
-            ) = query.split("|")
-        except ValueError as e:
-            raise ValueError(
-                "Not enough arguments passed to the SAMImageSegmentationTool! "
-                "Expected 5 (image, query, predicted_iou_threshold, stability_score_threshold, clip_threshold)"
-            ) from e
-        return self.client.submit(
-            float(predicted_iou_threshold),
-            float(stability_score_threshold),
-            float(clip_threshold),
+        (
+            image,
+            query,
+            predicted_iou_threshold,
+            stability_score_threshold,
+            clip_threshold,
+        ) = self.parse_query(query)
+        return self.submit_api(
+            predicted_iou_threshold,
+            stability_score_threshold,
+            clip_threshold,
             image,
-            query.strip(),
+            query,
             api_name="/predict",
         )
 
@@ -13,6 +13,8 @@ if TYPE_CHECKING:
 class StableDiffusionTool(GradioTool):
     """Tool for calling stable diffusion from llm"""
 
+    cacheable = False
+
     def __init__(
         self,
         name="StableDiffusion",
@@ -24,11 +26,12 @@ class StableDiffusionTool(GradioTool):
         src="gradio-client-demos/text-to-image",
         hf_token=None,
         duplicate=False,
+        **kwargs,
     ) -> None:
-        super().__init__(name, description, src, hf_token, duplicate)
+        super().__init__(name, description, src, hf_token, duplicate, **kwargs)
 
     def create_job(self, query: str) -> Job:
-        return self.client.submit(query, api_name="/predict")
+        return self.submit_api(query, api_name="/predict")
 
     def postprocess(self, output: str) -> str:
         return output
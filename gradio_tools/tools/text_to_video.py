@@ -9,6 +9,8 @@ if TYPE_CHECKING:
 
 
 class TextToVideoTool(GradioTool):
+    cacheable = False
+
     def __init__(
         self,
         name="TextToVideo",
@@ -21,11 +23,12 @@ class TextToVideoTool(GradioTool):
         src="damo-vilab/modelscope-text-to-video-synthesis",
         hf_token=None,
         duplicate=False,
+        **kwargs,
     ) -> None:
-        super().__init__(name, description, src, hf_token, duplicate)
+        super().__init__(name, description, src, hf_token, duplicate, **kwargs)
 
     def create_job(self, query: str) -> Job:
-        return self.client.submit(query, -1, 16, 25, fn_index=1)
+        return self.submit_api(query, -1, 16, 25, fn_index=1)
 
     def postprocess(self, output: str) -> str:
         return output
@@ -22,11 +22,12 @@ class WhisperAudioTranscriptionTool(GradioTool):
         src="abidlabs/whisper",
         hf_token=None,
         duplicate=False,
+        **kwargs,
     ) -> None:
-        super().__init__(name, description, src, hf_token, duplicate)
+        super().__init__(name, description, src, hf_token, duplicate, **kwargs)
 
     def create_job(self, query: str) -> Job:
-        return self.client.submit(query, api_name="/predict")
+        return self.submit_api(query, api_name="/predict")
 
     def postprocess(self, output: str) -> str:
         return output
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Tuple
+
+import gradio_client as grc
+import requests
+from gradio_client.serializing import FileSerializable
+
+from gradio_tools.cache import file_digest
+
+Key = Tuple[str, str]
+
+
+class UploadManager:
+    """Uploads each distinct local file once per Space and reuses the reference.
+
+    gradio_client uploads or base64-encodes every file argument on every call.
+    Once installed on a client, file, audio and video inputs that name a local
+    file are uploaded to the Space's /upload route the first time their
+    contents are seen and sent as a reference to the server-side copy after
+    that. Files are keyed by a sha256 of their contents, so the same blob is
+    shared across paths and across tools that talk to the same Space.
+    References older than `ttl` seconds are uploaded again, since a Space that
+    restarts loses its temporary files. An upload that stalls for `timeout`
+    seconds raises requests.Timeout, which the tool's RetryPolicy retries.
+    """
+
+    def __init__(
+        self, ttl: float | None = 3600.0, max_size: int = 4096, timeout: float = 60.0
+    ) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self.timeout = timeout
+        self.uploads = 0
+        self.reused = 0
+        self.bytes_uploaded = 0
+        self.bytes_saved = 0
+        self._refs: OrderedDict[Key, Tuple[float, str]] = OrderedDict()
+        self._key_locks: Dict[Key, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def ref(self, client: grc.Client, path: str) -> Dict[str, Any] | None:
+        """A reference to `path` on the client's Space, uploading it if needed.
+
+        Returns None if the Space refused the upload; the caller should then
+        send the file the usual way.
+        """
+        key = (client.src, file_digest(path))
+        size = os.path.getsize(path)
+        remote = self._lookup(key, size)
+        if remote is None:
+            with self._lock:
+                key_lock = self._key_locks.setdefault(key, threading.Lock())
+            with key_lock:
+                remote = self._lookup(key, size)
+                if remote is None:
+                    remote = self._upload(client, path)
+                    if remote is None:
+                        return None
+                    self._store(key, remote, size)
+        return {
+            "is_file": True,
+            "name": remote,
+            "orig_name": Path(path).name,
+            "data": None,
+        }
+
+    def _lookup(self, key: Key, size: int) -> str | None:
+        with self._lock:
+            entry = self._refs.get(key)
+            if entry is None:
+                return None
+            uploaded_at, remote = entry
+            if self.ttl is not None and time.monotonic() - uploaded_at > self.ttl:
+                del self._refs[key]
+                return None
+            self._refs.move_to_end(key)
+            self.reused += 1
+            self.bytes_saved += size
+            return remote
+
+    def _store(self, key: Key, remote: str, size: int) -> None:
+        with self._lock:
+            self._refs[key] = (time.monotonic(), remote)
+            self.uploads += 1
+            self.bytes_uploaded += size
+            while len(self._refs) > self.max_size:
+                self._refs.popitem(last=False)
+
+    def _upload(self, client: grc.Client, path: str) -> str | None:
+        with open(path, "rb") as f:
+            r = requests.post(
+                client.upload_url,
+                headers=client.headers,
+                files=[("files", (Path(path).name, f))],
+                timeout=self.timeout,
+            )
+        if r.status_code != 200:
+            return None
+        return r.json()[0]
+
+    def install(self, client: grc.Client) -> None:
+        """Route the file inputs of every endpoint of `client` through this manager."""
+        for endpoint in getattr(client, "endpoints", []):
+            if not hasattr(endpoint, "_upload_manager"):
+                endpoint.serialize = _serializer(endpoint, endpoint.serialize)
+            endpoint._upload_manager = self
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "uploads": self.uploads,
+                "reused": self.reused,
+                "bytes_uploaded": self.bytes_uploaded,
+                "bytes_saved": self.bytes_saved,
+                "size": len(self._refs),
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._refs.clear()
+            self._key_locks.clear()
+
+
+def _is_local_file(x: Any) -> bool:
+    return isinstance(x, (str, Path)) and os.path.isfile(x)
+
+
+def _remote_ref(endpoint: Any, x: Any) -> Dict[str, Any] | None:
+    """A reference to a file already on this Space, given its file= URL."""
+    prefix = endpoint.root_url + "file="
+    if not isinstance(x, str) or not x.startswith(prefix):
+        return None
+    name = x[len(prefix) :]
+    return {"is_file": True, "name": name, "orig_name": Path(name).name, "data": None}
+
+
+def _serializer(endpoint: Any, serialize: Callable[..., tuple]) -> Callable[..., tuple]:
+    def _serialize(*data) -> tuple:
+        manager: UploadManager = endpoint._upload_manager
+        refs = list(data)
+        for i, serializer in enumerate(endpoint.serializers):
+            if i < len(refs) and isinstance(serializer, FileSerializable):
+                remote = _remote_ref(endpoint, refs[i])
+                if remote is not None:
+                    refs[i] = remote
+                elif _is_local_file(refs[i]):
+                    refs[i] = manager.ref(endpoint.client, str(refs[i]))
+                    if refs[i] is None:
+                        return serialize(*data)
+        if refs == list(data):
+            return serialize(*data)
+        # Every local file and output of this Space is now a reference dict,
+        # which the serializers pass through as is; image inputs are still
+        # sent inline.
+        return tuple(s.serialize(d) for s, d in zip(endpoint.serializers, refs))
+
+    return _serialize
+
+
+default_uploads = UploadManager()
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import concurrent.futures
+import contextvars
+import os
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator
+
+from gradio_tools.jobs import BatchResult
+
+
+class WorkerPoolFull(RuntimeError):
+    """Raised when a WorkerPool stays saturated for longer than the caller waits."""
+
+
+class WorkerPool:
+    """Bounded pool of threads or processes that tool calls are dispatched to.
+
+    At most `max_workers` calls run at once and at most `max_queue` more wait
+    for a worker. Submitting to a saturated pool blocks for up to
+    `block_timeout` seconds (forever if None) and then raises WorkerPoolFull,
+    so a gateway that accepts work faster than Spaces finish it slows down
+    instead of piling up calls in memory.
+
+    With `processes=True` calls run in worker processes, so CPU-bound input
+    preparation, deserialization and postprocessing use every core. The
+    callable and its arguments are pickled; a pickled GradioTool reconnects
+    to its Space in the worker, and so can't use a cache, instrumentation
+    or other per-process state.
+    """
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        max_queue: int | None = None,
+        processes: bool = False,
+        block_timeout: float | None = None,
+    ) -> None:
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue = self.max_workers if max_queue is None else max_queue
+        self.processes = processes
+        self.block_timeout = block_timeout
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue)
+        self._pending: set = set()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        if processes:
+            self._executor: concurrent.futures.Executor = (
+                concurrent.futures.ProcessPoolExecutor(max_workers=self.max_workers)
+            )
+        else:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="gradio-tools"
+            )
+
+    def submit(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        block_timeout: float | None = None,
+        **kwargs: Any,
+    ) -> concurrent.futures.Future:
+        """Schedule `fn(*args, **kwargs)`, waiting for room if the pool is full."""
+        timeout = self.block_timeout if block_timeout is None else block_timeout
+        if not self._slots.acquire(timeout=timeout):
+            with self._lock:
+                self.rejected += 1
+            raise WorkerPoolFull(
+                f"{self.max_workers} workers busy and {self.max_queue} calls queued"
+            )
+        try:
+            if self.processes:
+                future = self._executor.submit(fn, *args, **kwargs)
+            else:
+                context = contextvars.copy_context()
+                future = self._executor.submit(
+                    context.run, self._call, fn, *args, **kwargs
+                )
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self.submitted += 1
+            self._pending.add(future)
+        future.add_done_callback(self._done)
+        return future
+
+    def _call(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        self._local.worker = True
+        return fn(*args, **kwargs)
+
+    def _done(self, future: concurrent.futures.Future) -> None:
+        with self._lock:
+            self._pending.discard(future)
+            self.completed += 1
+        self._slots.release()
+
+    def in_worker(self) -> bool:
+        """Whether the current thread is one of this pool's workers.
+
+        Calls made from a worker run inline rather than being queued behind
+        the call that made them.
+        """
+        return getattr(self._local, "worker", False)
+
+    def map(
+        self,
+        fn: Callable[[str], Any],
+        queries: Iterable[str],
+        ordered: bool = True,
+    ) -> Iterator[BatchResult]:
+        """Like `run_concurrently`, with the pool bounding concurrency.
+
+        Queries are submitted as room frees up, and finished results are
+        yielded while the rest are still being submitted.
+        """
+        queries = list(queries)
+        futures: Deque = deque()
+        try:
+            for index, query in enumerate(queries):
+                future = self.submit(fn, query)
+                future.index = index  # type: ignore
+                futures.append(future)
+                while futures and (futures[0].done() or not ordered):
+                    done = self._first_done(futures, ordered)
+                    if done is None:
+                        break
+                    yield self._result(queries, done)
+            if ordered:
+                for future in futures:
+                    yield self._result(queries, future)
+            else:
+                for future in concurrent.futures.as_completed(futures):
+                    yield self._result(queries, future)
+        finally:
+            for future in futures:
+                future.cancel()
+
+    @staticmethod
+    def _first_done(futures: Deque, ordered: bool) -> Any:
+        if ordered:
+            return futures.popleft()
+        for future in futures:
+            if future.done():
+                futures.remove(future)
+                return future
+        return None
+
+    @staticmethod
+    def _result(queries: list, future: concurrent.futures.Future) -> BatchResult:
+        index = future.index  # type: ignore
+        try:
+            return BatchResult(index, queries[index], output=future.result())
+        except Exception as e:
+            return BatchResult(index, queries[index], error=e)
+
+    def stats(self) -> Dict[str, Any]:
+        """How busy the pool is right now, and what it has done so far."""
+        with self._lock:
+            pending = list(self._pending)
+            submitted, completed, rejected = (
+                self.submitted,
+                self.completed,
+                self.rejected,
+            )
+        busy = sum(1 for future in pending if future.running())
+        return {
+            "workers": self.max_workers,
+            "busy": busy,
+            "queued": len(pending) - busy,
+            "utilization": busy / self.max_workers,
+            "saturated": len(pending) >= self.max_workers + self.max_queue,
+            "submitted": submitted,
+            "completed": completed,
+            "rejected": rejected,
+        }
+
+    def utilization(self) -> float:
+        """Fraction of workers running a call."""
+        return self.stats()["utilization"]
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self) -> WorkerPool:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.shutdown()
@@ -0,0 +1,24 @@
+import pytest
+
+import gradio_tools.tools
+from gradio_tools.client_pool import default_pool
+from gradio_tools.spaces import default_resolver
+
+# Tools are imported lazily; load them all so that tests parametrized over
+# GradioTool.__subclasses__() see every tool.
+for name in gradio_tools.tools.__all__:
+    getattr(gradio_tools.tools, name)
+
+
+@pytest.fixture(autouse=True)
+def fresh_client_pool():
+    default_pool.clear()
+    yield
+    default_pool.clear()
+
+
+@pytest.fixture(autouse=True)
+def fresh_space_resolver():
+    default_resolver.clear()
+    yield
+    default_resolver.clear()
@@ -0,0 +1,150 @@
+"""A local stand-in for a Space, speaking the gradio_client submit/status/result protocol.
+
+StubClient is configured through class attributes, so tests patch
+`gradio_client.Client` with a subclass (or `make_stub(...)`) to get a Space
+with the latency, worker count, queue depth and failure rate they need.
+"""
+import inspect
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from gradio_client.client import Job
+from gradio_client.utils import QueueError, Status, StatusUpdate
+
+
+def _status(code, eta=None, rank=0, queue_size=None):
+    return StatusUpdate(
+        code=code,
+        rank=rank,
+        queue_size=queue_size,
+        success=None,
+        time=None,
+        eta=eta,
+        progress_data=None,
+    )
+
+
+class _Call:
+    def __init__(self):
+        self.outputs = []
+        self.started_at = None
+
+
+class StubJob(Job):
+    def __init__(self, future, call, latency=0.0):
+        super().__init__(future)
+        self.cancel_requested = False
+        self.call = call
+        self.latency = latency
+
+    def status(self):
+        if self.done():
+            return super().status()
+        now = time.monotonic()
+        started_at = self.call.started_at
+        if started_at is None or now < started_at:
+            eta = (started_at or now) + self.latency - now
+            return _status(Status.IN_QUEUE, eta)
+        return _status(Status.PROCESSING, started_at + self.latency - now)
+
+    def outputs(self):
+        return list(self.call.outputs)
+
+    def cancel(self):
+        self.cancel_requested = True
+        return self.future.cancel()
+
+
+class StubClient:
+    latency = 0.1
+    # Extra time each job reports IN_QUEUE after a worker picks it up.
+    queue_time = 0.0
+    # Jobs processed at once; the rest wait in the queue.
+    concurrency = 16
+    # Waiting jobs allowed beyond `concurrency` before submits fail with
+    # QueueError. None means unbounded.
+    max_queue = None
+    # Probability that a job fails with QueueError when it starts.
+    failure_rate = 0.0
+    seed = 0
+
+    def __init__(self, src, hf_token=None, **kwargs):
+        self.src = src
+        self.space_id = src
+        self.hf_token = hf_token
+        self.executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        self.submitted = []
+        self.jobs = []
+        self.outstanding = 0
+        self._lock = threading.Lock()
+        self._random = random.Random(self.seed)
+
+    def submit(self, *args, api_name=None, fn_index=None, result_callbacks=None):
+        self.submitted.append(args)
+        call = _Call()
+        with self._lock:
+            full = (
+                self.max_queue is not None
+                and self.outstanding >= self.concurrency + self.max_queue
+            )
+            if not full:
+                self.outstanding += 1
+        if full:
+            future = Future()
+            future.set_exception(QueueError("Queue is full! Please try again."))
+        else:
+            future = self.executor.submit(self._run, call, *args)
+        job = StubJob(future, call, self.latency)
+        self.jobs.append(job)
+        return job
+
+    def _run(self, call, *args):
+        try:
+            call.started_at = time.monotonic() + self.queue_time
+            with self._lock:
+                fail = self._random.random() < self.failure_rate
+            if fail:
+                raise QueueError("Queue is full! Please try again.")
+            result = self._predict(*args)
+            # Generator endpoints publish each yielded value as it is produced.
+            if inspect.isgenerator(result):
+                for result in result:
+                    call.outputs.append(result)
+            else:
+                call.outputs.append(result)
+            return result
+        finally:
+            with self._lock:
+                self.outstanding -= 1
+
+    def _predict(self, *args):
+        time.sleep(self.queue_time + self.latency)
+        return args[0] if len(args) == 1 else args
+
+
+def make_stub(**config):
+    """A StubClient subclass with the given class attributes overridden."""
+    return type("ConfiguredStubClient", (StubClient,), config)
+
+
+class PolledJob:
+    """A job that exposes no completion signal and can only be polled."""
+
+    def __init__(self, output, latency):
+        self.output = output
+        self.finish_at = time.monotonic() + latency
+        self.polls = 0
+
+    def done(self):
+        self.polls += 1
+        return time.monotonic() >= self.finish_at
+
+    def status(self):
+        remaining = self.finish_at - time.monotonic()
+        code = Status.FINISHED if remaining <= 0 else Status.PROCESSING
+        return _status(code, max(remaining, 0))
+
+    def result(self, timeout=None):
+        return self.output
@@ -0,0 +1,79 @@
+from unittest.mock import patch
+
+import pytest
+from stub_space import StubClient
+
+from gradio_tools import (BarkTextToSpeechTool, DocQueryDocumentAnsweringTool,
+                          MetricsCollector, SAMImageSegmentationTool,
+                          ToolError)
+from gradio_tools.arguments import Arg, ArgSpec, between
+from gradio_tools.retry import QueryError
+
+SPEC = ArgSpec(
+    Arg("image"),
+    Arg("question", greedy=True),
+    Arg("top_k", int, default=1, check=between(1, 10), requirement="1 to 10"),
+)
+
+
+def test_fields_are_stripped_converted_and_defaulted():
+    assert SPEC.parse(" doc.png | what? | 3", "Tool") == ("doc.png", "what?", 3)
+    assert SPEC.parse("doc.png|what?", "Tool") == ("doc.png", "what?", 1)
+    assert SPEC.parse("doc.png|what?|", "Tool") == ("doc.png", "what?", 1)
+
+
+def test_greedy_argument_keeps_separators():
+    assert SPEC.parse("doc.png|is a|b true?|2", "Tool") == (
+        "doc.png",
+        "is a|b true?",
+        2,
+    )
+
+
+@pytest.mark.parametrize(
+    "query,message",
+    [
+        ("doc.png", "Not enough arguments passed to the Tool! Expected 3"),
+        ("doc.png| |2", "question is empty"),
+        ("doc.png|what?|many", "top_k must be a number, not 'many'"),
+        ("doc.png|what?|11", "top_k must be 1 to 10, not 11"),
+    ],
+)
+def test_bad_input_is_rejected(query, message):
+    with pytest.raises(QueryError, match=message):
+        SPEC.parse(query, "Tool")
+
+
+def test_query_errors_tell_the_agent_what_to_fix():
+    error = QueryError("Tool", "top_k must be a number")
+    assert isinstance(error, ToolError) and isinstance(error, ValueError)
+    assert str(error) == "top_k must be a number"
+
+
+def test_specs_are_checked_when_declared():
+    with pytest.raises(ValueError):
+        ArgSpec(Arg("a", greedy=True), Arg("b", greedy=True))
+    with pytest.raises(ValueError):
+        ArgSpec(Arg("a", default=""), Arg("b"))
+
+
+@patch("gradio_client.Client", StubClient)
+def test_malformed_queries_never_reach_the_space():
+    metrics = MetricsCollector()
+    tool = SAMImageSegmentationTool(instrumentation=metrics)
+    with pytest.raises(QueryError, match="clip_threshold must be between 0 and 1"):
+        tool.run("horse.png|a red horse|0.9|0.8|1.5")
+    assert tool.client.submitted == []
+    assert metrics.counters()["invalid"] == 1
+
+
+@patch("gradio_client.Client", StubClient)
+def test_tools_parse_their_queries():
+    bark = BarkTextToSpeechTool()
+    assert bark.run("Hallo | wie geht's?|German") == (
+        "Hallo | wie geht's?",
+        "Speaker 0 (de)",
+    )
+    assert bark.run("hello") == ("hello", "Unconditional")
+    docquery = DocQueryDocumentAnsweringTool()
+    assert docquery.run("doc.png|is a|b true?") == ("doc.png", "is a|b true?")
@@ -0,0 +1,155 @@
+import pickle
+import threading
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from gradio_client.serializing import (FileSerializable, StringSerializable,
+                                       VideoSerializable)
+from stub_space import StubClient
+
+from gradio_tools import (Artifact, ArtifactStore, StableDiffusionTool,
+                          UploadManager)
+from gradio_tools.client_pool import default_pool
+
+ROOT = "https://a.hf.space/"
+
+
+def served(files):
+    """Patch requests.get to serve `files` (name -> bytes) in small chunks.
+
+    A file whose body is an exception fails after its first chunk.
+    """
+
+    def chunks(body):
+        if isinstance(body, Exception):
+            yield b"abcd"
+            raise body
+        yield from (body[i : i + 4] for i in range(0, len(body), 4))
+
+    def get(url, headers, stream, timeout):
+        assert timeout is not None
+        body = files[url.split("file=")[-1]]
+        response = MagicMock()
+        response.__enter__.return_value = response
+        response.iter_content = lambda size: chunks(body)
+        return response
+
+    return patch("gradio_tools.artifacts.requests.get", side_effect=get)
+
+
+def endpoint(store, deserializers):
+    client = SimpleNamespace(output_dir="/nowhere", hf_token=None)
+    endpoint = SimpleNamespace(
+        client=client,
+        root_url=ROOT,
+        deserializers=deserializers,
+        deserialize=MagicMock(),
+    )
+    store.install(SimpleNamespace(endpoints=[endpoint]))
+    return endpoint
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ArtifactStore(tmp_path / "artifacts", max_bytes=20)
+
+
+def test_outputs_are_lazy(store):
+    ep = endpoint(
+        store, [FileSerializable(), StringSerializable(), VideoSerializable()]
+    )
+    with served({}) as get:
+        image, text, video = ep.deserialize(
+            {"is_file": True, "name": "/tmp/out.png", "data": None},
+            "hello",
+            [{"is_file": True, "name": "/tmp/out.mp4", "data": None}, None],
+        )
+    get.assert_not_called()
+    assert isinstance(image, Artifact) and image == ROOT + "file=/tmp/out.png"
+    assert isinstance(video, Artifact) and video.name == "/tmp/out.mp4"
+    assert text == "hello"
+    assert not image.cached
+
+
+def test_materialize_downloads_once(store):
+    ep = endpoint(store, [FileSerializable()])
+    (image,) = ep.deserialize({"is_file": True, "name": "/tmp/out.png"})
+    with served({"/tmp/out.png": b"0123456789"}) as get:
+        path = image.materialize()
+        assert image.materialize() == path
+    assert get.call_count == 1
+    assert path.endswith(".png") and open(path, "rb").read() == b"0123456789"
+    assert (store.downloads, store.hits) == (1, 1)
+
+
+def test_streaming_caches_as_it_reads(store):
+    ep = endpoint(store, [FileSerializable()])
+    (audio,) = ep.deserialize({"is_file": True, "name": "/tmp/out.wav"})
+    with served({"/tmp/out.wav": b"abcdefghij"}) as get:
+        assert b"".join(audio.iter_bytes()) == b"abcdefghij"
+        assert b"".join(audio.iter_bytes(chunk_size=3)) == b"abcdefghij"
+    assert get.call_count == 1
+    assert audio.cached
+
+
+def test_failed_download_leaves_no_partial_file(store):
+    ep = endpoint(store, [FileSerializable()])
+    (audio,) = ep.deserialize({"is_file": True, "name": "/tmp/out.wav"})
+    with served({"/tmp/out.wav": OSError("connection reset")}):
+        with pytest.raises(OSError):
+            b"".join(audio.iter_bytes())
+    assert not audio.cached
+    assert store.size() == 0
+
+
+def test_abandoned_stream_does_not_block_other_readers(store):
+    ep = endpoint(store, [FileSerializable()])
+    (audio,) = ep.deserialize({"is_file": True, "name": "/tmp/out.wav"})
+    with served({"/tmp/out.wav": b"abcdefghij"}) as get:
+        chunks = audio.iter_bytes(chunk_size=2)
+        assert next(chunks) == b"ab"
+        reader = threading.Thread(target=audio.materialize, daemon=True)
+        reader.start()
+        reader.join(timeout=5)
+        assert not reader.is_alive()
+        assert b"".join(audio.iter_bytes()) == b"abcdefghij"
+    assert get.call_count == 1
+
+
+def test_least_recently_used_files_are_evicted(store):
+    ep = endpoint(store, [FileSerializable()])
+    files = {f"/tmp/{i}.png": bytes(8) for i in range(3)}
+    artifacts = [ep.deserialize({"is_file": True, "name": name})[0] for name in files]
+    with served(files):
+        for artifact in artifacts:
+            artifact.materialize()
+    assert [a.cached for a in artifacts] == [False, True, True]
+    assert store.size() <= store.max_bytes
+    assert store.evictions == 1
+
+
+def test_same_space_artifact_is_sent_as_reference(store):
+    ep = endpoint(store, [FileSerializable()])
+    (image,) = ep.deserialize({"is_file": True, "name": "/tmp/out.png"})
+    ep.serializers = [FileSerializable()]
+    ep.serialize = MagicMock()
+    UploadManager().install(SimpleNamespace(endpoints=[ep]))
+    with served({}) as get, patch("gradio_tools.uploads.requests.post") as post:
+        (sent,) = ep.serialize(image.strip())
+    get.assert_not_called()
+    post.assert_not_called()
+    assert sent["is_file"] and sent["name"] == "/tmp/out.png"
+
+
+def test_pickled_artifact_is_its_url(store):
+    artifact = Artifact(ROOT + "file=/tmp/x.png", "/tmp/x.png", store)
+    assert pickle.loads(pickle.dumps(artifact)) == artifact.url
+
+
+@patch("gradio_client.Client", StubClient)
+def test_tools_with_a_store_get_their_own_clients(store):
+    lazy = StableDiffusionTool(artifacts=store).warmup()
+    eager = StableDiffusionTool().warmup()
+    assert lazy.client is not eager.client
+    assert len(store.clients) == 1 and len(default_pool) == 1
@@ -0,0 +1,75 @@
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+from stub_space import PolledJob, StubClient
+
+from gradio_tools import (Backoff, ClipInterrogatorTool, ImageCaptioningTool,
+                          MemoryCache, StableDiffusionTool)
+from gradio_tools.cache import file_digest
+
+
+@patch("gradio_client.Client", StubClient)
+def test_arun_concurrent_does_not_block_loop():
+    tool = ImageCaptioningTool()
+    ticks = []
+
+    async def heartbeat():
+        while True:
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.01)
+
+    async def main():
+        beat = asyncio.create_task(heartbeat())
+        start = time.perf_counter()
+        outputs = await asyncio.gather(*(tool.arun(f"img{i}.png") for i in range(16)))
+        elapsed = time.perf_counter() - start
+        beat.cancel()
+        return outputs, elapsed
+
+    outputs, elapsed = asyncio.run(main())
+    assert outputs == [(f"img{i}.png", "Beam Search") for i in range(16)]
+    assert elapsed < 16 * StubClient.latency / 2
+    assert len(ticks) > 5
+
+
+@patch("gradio_client.Client", StubClient)
+def test_arun_polled_job():
+    tool = StableDiffusionTool(backoff=Backoff(initial=0.01, maximum=0.05))
+    job = PolledJob("a dog", latency=0.1)
+    with patch.object(tool, "create_job", return_value=job):
+        assert asyncio.run(tool.arun("a dog")) == "a dog"
+
+
+@patch("gradio_client.Client", StubClient)
+def test_arun_polls_no_later_than_the_eta():
+    # Without the job's ETA, the third poll would come a second after the second.
+    tool = StableDiffusionTool(backoff=Backoff(initial=0.01, factor=10, maximum=2))
+    job = PolledJob("a dog", latency=0.3)
+    with patch.object(tool, "create_job", return_value=job):
+        start = time.perf_counter()
+        assert asyncio.run(tool.arun("a dog")) == "a dog"
+    assert time.perf_counter() - start < 0.6
+
+
+@patch("gradio_client.Client", StubClient)
+def test_arun_hashes_files_and_reads_cache_off_the_loop(tmp_path):
+    image = tmp_path / "img.png"
+    image.write_bytes(b"pixels")
+    tool = ClipInterrogatorTool(cache=MemoryCache())
+    threads = []
+
+    def recording_digest(path):
+        threads.append(threading.current_thread())
+        return file_digest(path)
+
+    async def main():
+        with patch("gradio_tools.cache.file_digest", recording_digest):
+            first = await tool.arun(str(image))
+            second = await tool.arun(str(image))
+        return first, second, threading.current_thread()
+
+    first, second, loop_thread = asyncio.run(main())
+    assert first == second and len(tool.client.submitted) == 1
+    assert threads and loop_thread not in threads
@@ -0,0 +1,109 @@
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+from stub_space import PolledJob, StubClient
+
+from gradio_tools import MicroBatcher, StableDiffusionPromptGeneratorTool
+
+
+class BatchedStub(StubClient):
+    """A Space whose /predict endpoint runs with batch=True.
+
+    Like Gradio, it wraps each (unbatched) request's input as a batch of one
+    and unwraps the output, so a list sent as the prompt is one bad prompt.
+    """
+
+    config = {"dependencies": [{"api_name": "predict", "batch": True}]}
+
+    def _predict(self, prompt):
+        return self._refine([prompt])[0]
+
+    def _refine(self, prompts):
+        time.sleep(self.latency)
+        if not all(isinstance(p, str) for p in prompts):
+            raise TypeError("prompts must be strings")
+        return prompts
+
+
+@patch("gradio_client.Client", BatchedStub)
+def test_concurrent_calls_are_submitted_together():
+    batcher = MicroBatcher(max_batch=4, max_wait=0.05)
+    tool = StableDiffusionPromptGeneratorTool(batcher=batcher)
+    queries = [f"a cat {i}" for i in range(8)]
+    results = list(tool.run_many(queries, max_concurrency=8))
+    assert [r.output for r in results] == queries
+    # One prompt per request; the Space's queue does the grouping.
+    assert sorted(args for (args,) in tool.client.submitted) == queries
+    assert batcher.stats() == {"batches": 2, "calls": 8, "mean_batch_size": 4.0}
+
+
+@patch("gradio_client.Client", BatchedStub)
+def test_mismatched_batch_output_fails_every_caller():
+    tool = StableDiffusionPromptGeneratorTool(
+        batcher=MicroBatcher(max_batch=3, max_wait=0.05)
+    )
+    tool.warmup()
+    short = PolledJob(["a"], latency=0.05)
+    with patch.object(tool, "create_batch_job", return_value=short):
+        results = list(tool.run_many(["a", "b", "c"], max_concurrency=3, timeout=5))
+    assert all(isinstance(r.error, ValueError) for r in results)
+    assert "returned 1 outputs" in str(results[0].error)
+
+
+@patch("gradio_client.Client", StubClient)
+def test_unbatched_endpoints_skip_the_batcher():
+    batcher = MicroBatcher(max_batch=4, max_wait=0.5)
+    tool = StableDiffusionPromptGeneratorTool(batcher=batcher)
+    tool.warmup()
+    assert not tool.batches()
+    start = time.perf_counter()
+    results = list(tool.run_many([f"a cat {i}" for i in range(4)], max_concurrency=4))
+    elapsed = time.perf_counter() - start
+    assert [r.output for r in results] == [f"a cat {i}" for i in range(4)]
+    assert len(tool.client.submitted) == 4
+    assert batcher.stats()["batches"] == 0
+    assert elapsed < 0.5
+
+
+@patch("gradio_client.Client", BatchedStub)
+def test_lone_call_waits_at_most_max_wait():
+    tool = StableDiffusionPromptGeneratorTool(batcher=MicroBatcher(max_wait=0.05))
+    tool.warmup()
+    with patch.object(tool, "create_batch_job") as create_batch_job:
+        start = time.perf_counter()
+        assert tool.run("a cat") == "a cat"
+        elapsed = time.perf_counter() - start
+    create_batch_job.assert_not_called()
+    assert elapsed < 0.05 + 2 * StubClient.latency
+
+
+@patch("gradio_client.Client", BatchedStub)
+def test_batch_failures_reach_every_caller():
+    tool = StableDiffusionPromptGeneratorTool(
+        batcher=MicroBatcher(max_batch=3, max_wait=0.05)
+    )
+    with patch.object(tool, "create_batch_job", side_effect=ValueError("bad batch")):
+        results = list(tool.run_many(["a", "b", "c"], max_concurrency=3))
+    assert all(isinstance(r.error, ValueError) for r in results)
+
+
+@patch("gradio_client.Client", BatchedStub)
+def test_async_calls_are_batched():
+    tool = StableDiffusionPromptGeneratorTool(
+        batcher=MicroBatcher(max_batch=4, max_wait=0.05)
+    )
+    tool.warmup()
+
+    async def main():
+        return await asyncio.gather(*(tool.arun(f"dog {i}") for i in range(4)))
+
+    assert asyncio.run(main()) == [f"dog {i}" for i in range(4)]
+    assert len(tool.client.submitted) == 4
+    assert tool.batcher.stats()["batches"] == 1
+
+
+def test_max_batch_must_be_positive():
+    with pytest.raises(ValueError):
+        MicroBatcher(max_batch=0)
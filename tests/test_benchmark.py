@@ -0,0 +1,151 @@
+"""Offline benchmarks for every tool against the local stub Space.
+
+Run with `pytest tests/test_benchmark.py -s` to see the report. The asserts
+are deliberately loose: they only catch wrapper regressions that cost a
+multiple of the stub's own latency, not machine-to-machine noise.
+"""
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from stub_space import make_stub
+
+from gradio_tools import Backoff, MetricsCollector, RetryPolicy
+from gradio_tools.tools import GradioTool
+
+LATENCY = 0.02
+RUNS = 5
+BATCH = 40
+CONCURRENCY = 8
+AGENTS = 8
+
+FastStub = make_stub(latency=LATENCY, concurrency=64)
+
+QUERIES = {
+    "BarkTextToSpeechTool": "hello number {i}|English",
+    "DocQueryDocumentAnsweringTool": "invoice{i}.png|What is the total?",
+    "SAMImageSegmentationTool": "img{i}.png|a horse|0.9|0.8|0.85",
+}
+
+TOOLS = sorted(GradioTool.__subclasses__(), key=lambda cls: cls.__name__)
+
+
+def queries(cls, n, offset=0):
+    """Distinct queries, so identical in-flight calls are not coalesced."""
+    template = QUERIES.get(cls.__name__, "input{i}.png")
+    return [template.format(i=i + offset) for i in range(n)]
+
+
+def report(cls, scenario, calls, elapsed, metrics):
+    pct = metrics.percentiles("run")
+    overhead = pct["p50"] - LATENCY
+    print(
+        f"\n{cls.__name__:<36} {scenario:<10} {calls / elapsed:8.1f} calls/s "
+        f"p50 {pct['p50'] * 1000:6.1f}ms p95 {pct['p95'] * 1000:6.1f}ms "
+        f"p99 {pct['p99'] * 1000:6.1f}ms overhead {overhead * 1000:6.1f}ms"
+    )
+    return pct
+
+
+@pytest.mark.parametrize("cls", TOOLS, ids=lambda cls: cls.__name__)
+@patch("gradio_client.Client", FastStub)
+def test_benchmark_sequential_run(cls):
+    metrics = MetricsCollector()
+    tool = cls(instrumentation=metrics)
+    tool.warmup()
+    start = time.perf_counter()
+    for query in queries(cls, RUNS):
+        tool.run(query)
+    elapsed = time.perf_counter() - start
+    pct = report(cls, "run", RUNS, elapsed, metrics)
+    assert len(metrics.samples("run")) == RUNS
+    assert pct["p50"] < LATENCY + 0.1
+
+
+@pytest.mark.parametrize("cls", TOOLS, ids=lambda cls: cls.__name__)
+@patch("gradio_client.Client", FastStub)
+def test_benchmark_run_many(cls):
+    metrics = MetricsCollector()
+    tool = cls(instrumentation=metrics)
+    tool.warmup()
+    start = time.perf_counter()
+    results = list(tool.run_many(queries(cls, BATCH), max_concurrency=CONCURRENCY))
+    elapsed = time.perf_counter() - start
+    report(cls, "run_many", BATCH, elapsed, metrics)
+    assert all(r.ok for r in results)
+    # BATCH / CONCURRENCY waves of LATENCY when the wrapper adds nothing.
+    assert elapsed < 10 * (BATCH / CONCURRENCY) * LATENCY
+
+
+@pytest.mark.parametrize("cls", TOOLS, ids=lambda cls: cls.__name__)
+@patch("gradio_client.Client", FastStub)
+def test_benchmark_concurrent_agents(cls):
+    metrics = MetricsCollector()
+    tool = cls(instrumentation=metrics)
+    tool.warmup()
+    errors = []
+
+    def agent(n):
+        try:
+            for query in queries(cls, RUNS, offset=n * RUNS):
+                tool.run(query)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=agent, args=(n,)) for n in range(AGENTS)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    report(cls, "agents", AGENTS * RUNS, elapsed, metrics)
+    assert not errors
+    # The agents run side by side, so this is about RUNS calls' worth of time.
+    assert elapsed < 10 * RUNS * LATENCY
+
+
+@pytest.mark.parametrize("cls", TOOLS, ids=lambda cls: cls.__name__)
+@patch("gradio_client.Client", FastStub)
+def test_benchmark_async_agents(cls):
+    metrics = MetricsCollector()
+    tool = cls(instrumentation=metrics)
+    tool.warmup()
+
+    async def agent(n):
+        for query in queries(cls, RUNS, offset=n * RUNS):
+            await tool.arun(query)
+
+    async def main():
+        await asyncio.gather(*(agent(n) for n in range(AGENTS)))
+
+    start = time.perf_counter()
+    asyncio.run(main())
+    elapsed = time.perf_counter() - start
+    report(cls, "async", AGENTS * RUNS, elapsed, metrics)
+    assert len(metrics.samples("run")) == AGENTS * RUNS
+    assert elapsed < 10 * RUNS * LATENCY
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        {"failure_rate": 0.2},
+        {"concurrency": 2, "max_queue": 2},
+    ],
+    ids=["flaky", "saturated"],
+)
+def test_benchmark_overloaded_space(config):
+    cls = TOOLS[0]
+    metrics = MetricsCollector()
+    retry = RetryPolicy(max_attempts=50, backoff=Backoff(0.005, 1.5, 0.02))
+    with patch("gradio_client.Client", make_stub(latency=LATENCY, **config)):
+        tool = cls(instrumentation=metrics, retry=retry)
+        start = time.perf_counter()
+        results = list(tool.run_many(queries(cls, BATCH), max_concurrency=8))
+        elapsed = time.perf_counter() - start
+    report(cls, "overload", BATCH, elapsed, metrics)
+    assert all(r.ok for r in results)
+    assert metrics.counters().get("retries", 0) > 0
@@ -0,0 +1,62 @@
+import time
+from unittest.mock import patch
+
+from stub_space import StubClient
+
+from gradio_tools import (ClipInterrogatorTool, DiskCache, MemoryCache,
+                          StableDiffusionPromptGeneratorTool, StableDiffusionTool)
+
+
+@patch("gradio_client.Client", StubClient)
+def test_memory_cache_skips_remote_call():
+    tool = StableDiffusionPromptGeneratorTool(cache=MemoryCache())
+    assert tool.run("a cat") == "a cat"
+    start = time.perf_counter()
+    assert tool.run("  a cat ") == "a cat"
+    assert time.perf_counter() - start < StubClient.latency
+    assert len(tool.client.submitted) == 1
+    assert tool.cache.hits == 1
+
+
+@patch("gradio_client.Client", StubClient)
+def test_cache_keyed_on_file_contents(tmp_path):
+    image = tmp_path / "img.png"
+    image.write_bytes(b"first")
+    tool = ClipInterrogatorTool(cache=MemoryCache())
+    tool.run(str(image))
+    tool.run(str(image))
+    assert len(tool.client.submitted) == 1
+    image.write_bytes(b"second image")
+    tool.run(str(image))
+    assert len(tool.client.submitted) == 2
+
+
+def test_memory_cache_lru_and_ttl():
+    cache = MemoryCache(max_size=2, ttl=0.05)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+    assert cache.get("a") is None and cache.get("c") == 3
+    time.sleep(0.1)
+    assert cache.get("c") is None
+
+
+def test_disk_cache_copies_file_outputs(tmp_path):
+    output = tmp_path / "out.png"
+    output.write_bytes(b"pixels")
+    cache = DiskCache(tmp_path / "cache")
+    cache.set("key", str(output))
+    output.unlink()
+    cached = cache.get("key")
+    assert cached.endswith(".png") and open(cached, "rb").read() == b"pixels"
+    assert DiskCache(tmp_path / "cache").get("key") == cached
+    cache.set("obj", object())
+    assert cache.get("obj") is None
+
+
+@patch("gradio_client.Client", StubClient)
+def test_non_deterministic_tools_opt_out():
+    tool = StableDiffusionTool(cache=MemoryCache())
+    tool.run("a cat")
+    tool.run("a cat")
+    assert len(tool.client.submitted) == 2
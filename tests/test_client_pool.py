@@ -0,0 +1,109 @@
+import threading
+import time
+from unittest.mock import patch
+
+from stub_space import StubClient, make_stub
+
+from gradio_tools import (
+    ClientPool,
+    ImageCaptioningTool,
+    StableDiffusionTool,
+    WhisperAudioTranscriptionTool,
+)
+from gradio_tools.client_pool import default_pool
+
+
+class SlowStubClient(StubClient):
+    instances = 0
+
+    def __init__(self, src, hf_token=None, **kwargs):
+        type(self).instances += 1
+        time.sleep(0.05)
+        super().__init__(src, hf_token, **kwargs)
+
+
+@patch("gradio_client.Client", SlowStubClient)
+def test_tools_share_clients():
+    SlowStubClient.instances = 0
+    start = time.perf_counter()
+    toolsets = [
+        [
+            tool.warmup()
+            for tool in (
+                StableDiffusionTool(),
+                ImageCaptioningTool(),
+                WhisperAudioTranscriptionTool(),
+            )
+        ]
+        for _ in range(10)
+    ]
+    elapsed = time.perf_counter() - start
+    print(f"\n10 toolsets built in {elapsed * 1000:.1f}ms")
+    assert SlowStubClient.instances == 3
+    assert toolsets[0][0].client is toolsets[9][0].client
+    assert default_pool.stats() == {"hits": 27, "misses": 3, "evictions": 0, "size": 3}
+
+
+@patch("gradio_client.Client", SlowStubClient)
+def test_concurrent_get_builds_once():
+    SlowStubClient.instances = 0
+    pool = ClientPool()
+    clients = []
+    threads = [
+        threading.Thread(target=lambda: clients.append(pool.get("a/space")))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert SlowStubClient.instances == 1
+    assert len({id(c) for c in clients}) == 1
+
+
+@patch("gradio_client.Client", StubClient)
+def test_keyed_by_token_and_evicts():
+    pool = ClientPool(max_idle=0.05, max_size=2)
+    assert pool.get("a/space") is not pool.get("a/space", hf_token="tok")
+    pool.get("b/space")
+    assert len(pool) == 2 and pool.evictions == 1
+    time.sleep(0.1)
+    pool.get("c/space")
+    assert len(pool) == 1
+    assert pool.stats()["evictions"] == 3
+
+
+@patch("gradio_client.Client", StubClient)
+def test_evicted_keys_release_their_locks():
+    pool = ClientPool(max_size=2)
+    for i in range(10):
+        pool.get(f"space/{i}")
+    assert len(pool) == 2
+    assert len(pool._key_locks) == 2
+
+
+@patch("gradio_client.Client", StubClient)
+def test_clients_in_use_are_not_idle():
+    pool = ClientPool(max_idle=0.05)
+    tool = WhisperAudioTranscriptionTool(client_pool=pool)
+    client = tool.warmup().client
+    with pool.in_use([tool.src]):
+        time.sleep(0.1)
+        assert pool.get(tool.src) is client
+    time.sleep(0.02)
+    # Released just now, so still fresh.
+    assert pool.get(tool.src) is client
+    assert pool.evictions == 0
+
+
+@patch("gradio_client.Client", make_stub(latency=0.1))
+def test_long_job_keeps_its_client_pooled():
+    pool = ClientPool(max_idle=0.05)
+    tool = WhisperAudioTranscriptionTool(client_pool=pool)
+    client = tool.warmup().client
+    job = threading.Thread(target=tool.run, args=("a.wav",))
+    job.start()
+    time.sleep(0.08)
+    assert pool.get(tool.src) is client
+    job.join()
+    assert pool.evictions == 0
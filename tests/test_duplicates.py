@@ -0,0 +1,135 @@
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+from huggingface_hub.utils import RepositoryNotFoundError
+
+from gradio_tools import DuplicateRegistry, WhisperAudioTranscriptionTool
+from gradio_tools.jobs import Backoff
+
+
+@pytest.fixture(autouse=True)
+def whoami():
+    with patch("huggingface_hub.whoami", return_value={"name": "me"}) as whoami:
+        yield whoami
+
+
+def registry(tmp_path, **kwargs):
+    return DuplicateRegistry(
+        tmp_path / "duplicates.json", backoff=Backoff(0.01, 1.0, 0.01), **kwargs
+    )
+
+
+def duplicate(space_id="me/whisper", latency=0.0):
+    def create():
+        time.sleep(latency)
+        return SimpleNamespace(space_id=space_id)
+
+    return MagicMock(side_effect=create)
+
+
+def connected():
+    return MagicMock(side_effect=lambda space_id: SimpleNamespace(space_id=space_id))
+
+
+def test_later_processes_attach_to_the_duplicate(tmp_path, whoami):
+    create, connect = duplicate(), connected()
+    first = registry(tmp_path).attach("abidlabs/whisper", "tok", None, create, connect)
+    again = registry(tmp_path).attach("abidlabs/whisper", "tok", None, create, connect)
+    assert first.space_id == "me/whisper"
+    assert create.call_count == 1
+    connect.assert_called_once_with("me/whisper")
+    assert again.space_id == "me/whisper"
+    assert whoami.call_count == 1
+    entry = registry(tmp_path).get("abidlabs/whisper", "me")
+    assert entry["state"] == "ready"
+    assert "tok" not in (tmp_path / "duplicates.json").read_text()
+
+
+def test_replicas_are_registered_separately(tmp_path):
+    reg = registry(tmp_path)
+    reg.attach("abidlabs/whisper", "tok", None, duplicate("me/whisper"), MagicMock())
+    reg.attach("abidlabs/whisper", "tok", "w-2", duplicate("me/w-2"), MagicMock())
+    assert reg.get("abidlabs/whisper", "me", "w-2")["space_id"] == "me/w-2"
+    assert reg.get("abidlabs/whisper", "me")["space_id"] == "me/whisper"
+
+
+def test_concurrent_workers_duplicate_once(tmp_path):
+    create, connect = duplicate(latency=0.2), connected()
+    clients = []
+
+    def worker():
+        # Each worker has its own registry object, like separate processes.
+        reg = registry(tmp_path)
+        clients.append(reg.attach("abidlabs/whisper", "tok", None, create, connect))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert create.call_count == 1
+    assert connect.call_count == 7
+    assert {c.space_id for c in clients} == {"me/whisper"}
+
+
+def test_stale_creation_is_taken_over(tmp_path):
+    reg = registry(tmp_path, stale_after=0.05)
+    with reg._locked() as data:
+        data["spaces"][reg.key("abidlabs/whisper", "me")] = {
+            "space_id": None,
+            "state": "creating",
+            "pid": -1,
+            "updated_at": time.time(),
+        }
+    create = duplicate()
+    reg.attach("abidlabs/whisper", "tok", None, create, MagicMock())
+    assert create.call_count == 1
+
+
+def test_failed_duplicate_is_not_recorded(tmp_path):
+    reg = registry(tmp_path)
+    create = MagicMock(side_effect=ValueError("quota exceeded"))
+    with pytest.raises(ValueError):
+        reg.attach("abidlabs/whisper", "tok", None, create, MagicMock())
+    assert reg.get("abidlabs/whisper", "me") is None
+
+
+def test_deleted_duplicate_is_recreated(tmp_path):
+    reg = registry(tmp_path)
+    reg.attach("abidlabs/whisper", "tok", None, duplicate(), MagicMock())
+    gone = MagicMock(
+        side_effect=RepositoryNotFoundError("Space not found", response=MagicMock())
+    )
+    create = duplicate()
+    client = reg.attach("abidlabs/whisper", "tok", None, create, gone)
+    assert create.call_count == 1 and client.space_id == "me/whisper"
+
+
+def test_connection_error_does_not_duplicate_again(tmp_path):
+    reg = registry(tmp_path)
+    reg.attach("abidlabs/whisper", "tok", None, duplicate(), MagicMock())
+    offline = MagicMock(side_effect=requests.ConnectionError("connection reset"))
+    create = duplicate()
+    with pytest.raises(requests.ConnectionError):
+        reg.attach("abidlabs/whisper", "tok", None, create, offline)
+    create.assert_not_called()
+    assert reg.get("abidlabs/whisper", "me")["space_id"] == "me/whisper"
+
+
+@patch("gradio_client.Client")
+def test_tools_use_the_registry(mock_client, tmp_path):
+    mock_client.duplicate.return_value = SimpleNamespace(space_id="me/whisper")
+    mock_client.return_value = SimpleNamespace(space_id="me/whisper")
+    with patch("gradio_tools.spaces.space_runtime", return_value=object()):
+        for _ in range(3):
+            tool = WhisperAudioTranscriptionTool(
+                hf_token="tok", duplicate=True, registry=registry(tmp_path)
+            )
+            tool.warmup()
+            assert tool.src == "me/whisper"
+    mock_client.duplicate.assert_called_once()
+    assert mock_client.call_count == 2
@@ -0,0 +1,75 @@
+import subprocess
+import sys
+
+# Records, in the child process, any attempt to import a module from the
+# blocked packages.
+GUARD = """
+import sys
+
+attempted = []
+
+
+class Guard:
+    def find_spec(self, name, path=None, target=None):
+        if name.split(".")[0] in {blocked!r}:
+            attempted.append(name)
+        return None
+
+
+sys.meta_path.insert(0, Guard())
+"""
+
+
+def run(code, blocked=()):
+    script = GUARD.format(blocked=set(blocked)) + code
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in out.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative) / 1e6
+    return out.stdout, times
+
+
+def test_package_import_is_cheap():
+    stdout, times = run(
+        "import gradio_tools\n"
+        "print(sorted(m for m in sys.modules if m.startswith(('gradio', 'hugg'))))\n"
+        "print(attempted)",
+        blocked={"langchain"},
+    )
+    modules, attempted = stdout.splitlines()
+    print(f"\nimport gradio_tools: {times['gradio_tools'] * 1000:.1f}ms")
+    assert modules == "['gradio_tools']"
+    assert attempted == "[]"
+    assert times["gradio_tools"] < 0.05
+
+
+def test_one_tool_loads_only_its_module():
+    stdout, times = run(
+        "from gradio_tools import WhisperAudioTranscriptionTool\n"
+        "WhisperAudioTranscriptionTool()\n"
+        "print(sorted(m for m in sys.modules if m.startswith('gradio_tools.tools.')))\n"
+        "print(attempted)",
+        blocked={"langchain", "gradio"},
+    )
+    modules, attempted = stdout.splitlines()
+    assert modules == "['gradio_tools.tools.gradio_tool', 'gradio_tools.tools.whisper']"
+    # Neither langchain nor the gradio UI package is looked up.
+    assert attempted == "[]"
+
+
+def test_lazy_exports_match_all():
+    import gradio_tools
+    import gradio_tools.tools
+
+    for package in (gradio_tools, gradio_tools.tools):
+        assert set(package.__all__) <= set(dir(package))
+        for name in package.__all__:
+            assert getattr(package, name) is not None
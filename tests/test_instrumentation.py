@@ -0,0 +1,107 @@
+import time
+from unittest.mock import patch
+
+import pytest
+from gradio_client.utils import QueueError
+from stub_space import StubClient
+
+from gradio_tools import (Backoff, MemoryCache, MetricsCollector,
+                          PrintInstrumentation, RetryPolicy,
+                          StableDiffusionPromptGeneratorTool,
+                          WhisperAudioTranscriptionTool)
+from gradio_tools.instrumentation import _quantile
+
+
+class QueuedStubClient(StubClient):
+    queue_time = 0.3
+    latency = 0.2
+
+
+class _Endpoint:
+    """Runs jobs like gradio_client's endpoints, deserializing for 0.1s."""
+
+    def serialize(self, *data):
+        return data
+
+    def make_end_to_end_fn(self, helper=None):
+        return lambda *data: self.process_predictions(*data)
+
+    def process_predictions(self, *predictions):
+        time.sleep(0.1)
+        return predictions[0]
+
+
+class DeserializingStubClient(QueuedStubClient):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.endpoints = [_Endpoint()]
+
+    def submit(self, *args, **kwargs):
+        # gradio_client makes the job's function in the submitting thread.
+        self.end_to_end = self.endpoints[0].make_end_to_end_fn()
+        return super().submit(*args, **kwargs)
+
+    def _predict(self, *args):
+        return self.end_to_end(super()._predict(*args))
+
+
+@patch("gradio_client.Client", DeserializingStubClient)
+def test_spans_split_queue_and_processing():
+    metrics = MetricsCollector()
+    tool = WhisperAudioTranscriptionTool(instrumentation=metrics)
+    tool.run("clip.wav")
+    summary = metrics.summary()["WhisperAudioTranscription"]
+    assert set(summary) == {
+        "client_init",
+        "submit",
+        "queue_wait",
+        "processing",
+        "download",
+        "postprocess",
+        "run",
+    }
+    assert summary["queue_wait"]["p50"] == pytest.approx(0.3, abs=0.15)
+    assert summary["processing"]["p50"] == pytest.approx(0.2, abs=0.08)
+    assert summary["download"]["p50"] == pytest.approx(0.1, abs=0.05)
+    assert metrics.percentiles("run", src="abidlabs/whisper")["p99"] >= 0.5
+
+
+class FlakyStubClient(StubClient):
+    def _predict(self, *args):
+        if len(self.submitted) == 1:
+            raise QueueError()
+        return super()._predict(*args)
+
+
+@patch("gradio_client.Client", FlakyStubClient)
+def test_counters():
+    metrics = MetricsCollector()
+    tool = StableDiffusionPromptGeneratorTool(
+        instrumentation=metrics,
+        cache=MemoryCache(),
+        retry=RetryPolicy(backoff=Backoff(0.001)),
+    )
+    tool.run("a cat")
+    tool.run("a cat")
+    assert metrics.counters(tool="StableDiffusionPromptGenerator") == {
+        "cache_misses": 1,
+        "cache_hits": 1,
+        "queue_full": 1,
+        "retries": 1,
+    }
+
+
+@patch("gradio_client.Client", QueuedStubClient)
+def test_printing_is_opt_in(capsys):
+    WhisperAudioTranscriptionTool().run("clip.wav")
+    assert capsys.readouterr().out == ""
+    WhisperAudioTranscriptionTool(instrumentation=PrintInstrumentation()).run("b.wav")
+    out = capsys.readouterr().out
+    assert "IN_QUEUE" in out and "PROCESSING" in out
+
+
+def test_quantile():
+    values = [float(i) for i in range(101)]
+    assert _quantile(values, 0.5) == 50
+    assert _quantile(values, 0.99) == 99
+    assert _quantile([1.0], 0.95) == 1.0
@@ -0,0 +1,38 @@
+import time
+from unittest.mock import patch
+
+from stub_space import PolledJob, StubClient
+
+from gradio_tools import Backoff, StableDiffusionTool
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - start
+
+
+@patch("gradio_client.Client", StubClient)
+def test_run_returns_on_completion():
+    tool = StableDiffusionTool()
+    output, elapsed = _timed(tool.run, "a cat")
+    print(f"\nend-to-end latency: {elapsed * 1000:.1f}ms (stub {StubClient.latency}s)")
+    assert output == "a cat"
+    assert elapsed < StubClient.latency + 0.5
+
+
+@patch("gradio_client.Client", StubClient)
+def test_run_polls_with_backoff():
+    tool = StableDiffusionTool(backoff=Backoff(initial=0.01, factor=2, maximum=0.2))
+    job = PolledJob("a dog", latency=0.3)
+    with patch.object(tool, "create_job", return_value=job):
+        output, elapsed = _timed(tool.run, "a dog")
+    print(f"\npolled latency: {elapsed * 1000:.1f}ms after {job.polls} polls")
+    assert output == "a dog"
+    assert elapsed < 0.3 + 0.25
+    assert job.polls < 30
+
+
+def test_backoff_schedule():
+    delays = Backoff(initial=0.1, factor=2, maximum=0.5).delays()
+    assert [next(delays) for _ in range(5)] == [0.1, 0.2, 0.4, 0.5, 0.5]
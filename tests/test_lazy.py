@@ -0,0 +1,47 @@
+import time
+from unittest.mock import patch
+
+from stub_space import StubClient
+
+import gradio_tools
+from gradio_tools import GradioTool, warmup_all
+
+
+class SlowStubClient(StubClient):
+    instances = 0
+
+    def __init__(self, src, hf_token=None, **kwargs):
+        type(self).instances += 1
+        time.sleep(0.05)
+        super().__init__(src, hf_token, **kwargs)
+
+
+def _all_tools():
+    return [cls() for cls in GradioTool.__subclasses__()]
+
+
+@patch("gradio_client.Client", SlowStubClient)
+def test_startup_lazy_vs_eager():
+    SlowStubClient.instances = 0
+    start = time.perf_counter()
+    tools = _all_tools()
+    lazy = time.perf_counter() - start
+    assert SlowStubClient.instances == 0
+
+    start = time.perf_counter()
+    warmup_all(tools)
+    eager = time.perf_counter() - start
+    print(f"\n{len(tools)} tools: lazy init {lazy * 1000:.1f}ms, "
+          f"parallel warmup {eager * 1000:.1f}ms")
+    assert SlowStubClient.instances == len(tools)
+    assert lazy < 0.05
+    assert eager < len(tools) * 0.05
+
+
+@patch("gradio_client.Client", StubClient)
+def test_first_job_creates_client():
+    tool = gradio_tools.StableDiffusionTool()
+    assert tool._client is None
+    assert tool.run("a cat") == "a cat"
+    assert isinstance(tool.client, StubClient)
+    assert tool.warmup().client is tool.client
@@ -0,0 +1,83 @@
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+from stub_space import StubClient
+
+from gradio_tools import (Pipeline, StableDiffusionPromptGeneratorTool,
+                          StableDiffusionTool, TextToVideoTool,
+                          WhisperAudioTranscriptionTool)
+
+
+class SlowStubClient(StubClient):
+    latency = 0.2
+
+
+@pytest.fixture(autouse=True)
+def offline_hub():
+    with patch("gradio_tools.spaces.space_runtime", return_value=None):
+        yield
+
+
+def diamond():
+    # prompt -> image -> transcript, with video branching off prompt; the
+    # critical path is three calls long out of four.
+    return (
+        Pipeline()
+        .add("prompt", StableDiffusionPromptGeneratorTool(), "{input}")
+        .add("image", StableDiffusionTool(), "{prompt} photo")
+        .add("transcript", WhisperAudioTranscriptionTool(), "{image}")
+        .add("video", TextToVideoTool(), lambda prompt: prompt.upper())
+    )
+
+
+@patch("gradio_client.Client", SlowStubClient)
+def test_pipeline_takes_its_critical_path():
+    pipeline = diamond()
+    start = time.perf_counter()
+    outputs = pipeline.run("a dog")
+    elapsed = time.perf_counter() - start
+    assert outputs["prompt"] == "a dog"
+    assert outputs["transcript"] == "a dog photo"
+    assert outputs["video"][0] == "A DOG"
+    assert 3 * SlowStubClient.latency <= elapsed < 3.75 * SlowStubClient.latency
+
+
+@patch("gradio_client.Client", StubClient)
+def test_pipeline_streams_steps_as_they_finish():
+    steps = [r.step for r in diamond().run_stream("a dog")]
+    assert steps[0] == "prompt"
+    assert steps[-1] == "transcript"
+    assert sorted(steps) == ["image", "prompt", "transcript", "video"]
+
+
+@patch("gradio_client.Client", SlowStubClient)
+def test_async_pipeline():
+    start = time.perf_counter()
+    outputs = asyncio.run(diamond().arun("a cat"))
+    elapsed = time.perf_counter() - start
+    assert outputs["transcript"] == "a cat photo"
+    assert elapsed < 3.75 * SlowStubClient.latency
+
+
+@patch("gradio_client.Client", StubClient)
+def test_failed_step_skips_its_dependents():
+    pipeline = diamond()
+    image = pipeline.steps["image"].tool
+    with patch.object(image, "create_job", side_effect=ValueError("nsfw")):
+        results = {r.step: r for r in pipeline.run_stream("a dog")}
+        with pytest.raises(ValueError, match="nsfw"):
+            pipeline.run("a dog")
+    assert results["prompt"].ok and results["video"].ok
+    assert not results["image"].ok and not results["transcript"].ok
+    assert results["transcript"].query is None
+    assert results["transcript"].error is results["image"].error
+
+
+def test_steps_must_read_from_earlier_steps():
+    pipeline = Pipeline().add("prompt", StableDiffusionPromptGeneratorTool())
+    with pytest.raises(ValueError, match="unknown steps"):
+        pipeline.add("image", StableDiffusionTool(), "{prompt} {caption}")
+    with pytest.raises(ValueError, match="already exists"):
+        pipeline.add("prompt", StableDiffusionTool())
@@ -0,0 +1,142 @@
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from stub_space import StubClient, make_stub
+
+from gradio_tools import (MetricsCollector, Pipeline, Prewarmer,
+                          StableDiffusionTool, TextToVideoTool,
+                          WhisperAudioTranscriptionTool)
+from gradio_tools.jobs import Backoff
+from gradio_tools.prewarm import wake_space
+
+
+class Hub:
+    """Fake Hub whose Spaces sleep until their app gets a request."""
+
+    def __init__(self, stages):
+        self.stages = dict(stages)
+        self.woken = []
+
+    def get_space_runtime(self, src, token=None):
+        return SimpleNamespace(stage=self.stages[src])
+
+    def space_info(self, src, token=None):
+        return SimpleNamespace(host=f"https://{src.replace('/', '-')}.hf.space")
+
+    def get(self, host, headers, timeout):
+        src = next(s for s in self.stages if s.replace("/", "-") in host)
+        self.woken.append(src)
+        self.stages[src] = "RUNNING"
+
+    def patch(self):
+        return (
+            patch("huggingface_hub.get_space_runtime", self.get_space_runtime),
+            patch("huggingface_hub.space_info", self.space_info),
+            patch("gradio_tools.prewarm.requests.get", self.get),
+        )
+
+
+@pytest.fixture
+def hub():
+    hub = Hub(
+        {
+            "abidlabs/whisper": "SLEEPING",
+            "damo-vilab/modelscope-text-to-video-synthesis": "SLEEPING",
+            "stabilityai/stable-diffusion": "RUNNING",
+        }
+    )
+    first, second, third = hub.patch()
+    with first, second, third:
+        yield hub
+
+
+def test_wake_space_wakes_only_sleeping_spaces(hub):
+    assert wake_space("abidlabs/whisper")
+    assert not wake_space("stabilityai/stable-diffusion")
+    assert hub.woken == ["abidlabs/whisper"]
+
+
+def test_wake_space_waits_for_startup(hub):
+    stages = iter(["SLEEPING", "APP_STARTING", "APP_STARTING", "RUNNING"])
+    with patch("huggingface_hub.get_space_runtime") as runtime:
+        runtime.side_effect = lambda src, token: SimpleNamespace(stage=next(stages))
+        assert wake_space("abidlabs/whisper", backoff=Backoff(0.01))
+        assert runtime.call_count == 4
+        assert hub.woken == ["abidlabs/whisper"]
+
+
+@patch("gradio_client.Client", StubClient)
+def test_prewarm_runs_in_the_background(hub):
+    metrics = MetricsCollector()
+    tool = WhisperAudioTranscriptionTool(instrumentation=metrics)
+    future = tool.prewarm()
+    assert future.result(timeout=5) is tool
+    assert tool._client is not None
+    assert hub.woken == ["abidlabs/whisper"]
+    assert metrics.counters()["wakeups"] == 1
+    # A finished prewarm is redone on request, in case the Space fell asleep.
+    assert tool.prewarm() is not future
+
+
+DuplicatingStub = make_stub(
+    duplicate=classmethod(lambda cls, from_id, to_id, hf_token: cls("me/whisper"))
+)
+
+
+@patch("gradio_client.Client", DuplicatingStub)
+def test_prewarm_wakes_the_duplicate(hub):
+    hub.stages["me/whisper"] = "SLEEPING"
+    tool = WhisperAudioTranscriptionTool(hf_token="tok", duplicate=True)
+    assert tool.prewarm().result(timeout=5) is tool
+    assert tool.src == "me/whisper"
+    assert hub.woken == ["me/whisper"]
+    # Once connected, prewarming again checks the duplicate, not the original.
+    hub.stages["me/whisper"] = "SLEEPING"
+    tool.prewarm().result(timeout=5)
+    assert hub.woken == ["me/whisper", "me/whisper"]
+
+
+@patch("gradio_client.Client", StubClient)
+def test_prewarm_failures_do_not_stop_warmup():
+    with patch("huggingface_hub.get_space_runtime", side_effect=OSError("offline")):
+        tool = StableDiffusionTool()
+        assert tool.prewarm().result(timeout=5) is tool
+    assert tool._client is not None
+
+
+@patch("gradio_client.Client", StubClient)
+def test_prewarmer_keeps_tools_awake(hub):
+    tools = [WhisperAudioTranscriptionTool(), TextToVideoTool()]
+    with Prewarmer(tools, interval=0.05) as prewarmer:
+        prewarmer.wait(timeout=5)
+        assert sorted(hub.woken) == sorted(t.src for t in tools)
+        hub.stages["abidlabs/whisper"] = "SLEEPING"
+        time.sleep(0.3)
+    assert hub.woken.count("abidlabs/whisper") == 2
+    assert all(t._client is not None for t in tools)
+
+
+@patch("gradio_client.Client", StubClient)
+def test_prewarmer_wait_does_not_start_another_round(hub):
+    tool = WhisperAudioTranscriptionTool()
+    with patch.object(tool, "prewarm", wraps=tool.prewarm) as prewarm:
+        prewarmer = Prewarmer([tool]).start()
+        prewarmer.wait(timeout=5)
+        assert prewarm.call_count == 1
+    assert prewarmer._futures[0].done()
+
+
+@patch("gradio_client.Client", StubClient)
+def test_pipeline_prewarms_downstream_steps(hub):
+    pipeline = (
+        Pipeline()
+        .add("image", StableDiffusionTool(), "{input}")
+        .add("transcript", WhisperAudioTranscriptionTool(), "{image}")
+    )
+    with patch.object(
+        WhisperAudioTranscriptionTool, "prewarm", autospec=True
+    ) as prewarm:
+        pipeline.run("a dog")
+    prewarm.assert_called_once_with(pipeline.steps["transcript"].tool)
@@ -0,0 +1,89 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+from gradio_client.client import Job
+from gradio_client.utils import QueueError
+from stub_space import StubClient
+
+from gradio_tools import Backoff, ImageCaptioningTool, RetryPolicy
+from gradio_tools.replicas import ReplicaSet
+
+
+class FullStubClient(StubClient):
+    def _predict(self, *args):
+        raise QueueError("Queue is full! Please try again.")
+
+
+def test_least_outstanding_spreads_jobs():
+    replicas = ReplicaSet([StubClient("a"), StubClient("b"), StubClient("c")])
+    jobs = [replicas.submit(i, fn_index=0) for i in range(6)]
+    assert [s["outstanding"] for s in replicas.stats()] == [2, 2, 2]
+    assert [job.result() for job in jobs] == list(range(6))
+    time.sleep(0.01)
+    assert [s["outstanding"] for s in replicas.stats()] == [0, 0, 0]
+
+
+def test_eta_strategy_prefers_short_queue():
+    slow, fast = StubClient("slow"), StubClient("fast")
+    replicas = ReplicaSet([slow, fast], strategy="eta")
+    busy = Job(ThreadPoolExecutor(1).submit(time.sleep, 0.2))
+    replicas.replicas[0].outstanding.append(busy)
+    with patch.object(Job, "status") as status:
+        status.return_value.eta = 30.0
+        replicas.submit("x")
+    assert fast.submitted == [("x",)]
+
+
+def test_queue_error_removes_replica_from_rotation():
+    full, ok = FullStubClient("full"), StubClient("ok")
+    replicas = ReplicaSet([full, ok], cooldown=60)
+    with pytest.raises(QueueError):
+        replicas.submit("first").result()
+    time.sleep(0.01)
+    for i in range(4):
+        replicas.submit(i).result()
+    assert len(full.submitted) == 1 and len(ok.submitted) == 4
+    assert [s["healthy"] for s in replicas.stats()] == [False, True]
+
+
+@patch("gradio_client.Client", StubClient)
+def test_tool_with_user_supplied_replicas():
+    tool = ImageCaptioningTool(replicas=["me/blip-a", "me/blip-b"])
+    results = list(tool.run_many([f"{i}.png" for i in range(4)], max_concurrency=4))
+    assert all(r.ok for r in results)
+    assert [s["submitted"] for s in tool.client.stats()] == [2, 2]
+
+
+def full_first(src, hf_token=None):
+    return (FullStubClient if src.endswith("-full") else StubClient)(src, hf_token)
+
+
+@patch("gradio_client.Client", side_effect=full_first)
+def test_tool_passes_strategy_and_cooldown_to_replicas(mock_client):
+    tool = ImageCaptioningTool(
+        replicas=["me/blip-full", "me/blip-ok"],
+        replica_strategy="eta",
+        cooldown=0.2,
+        retry=RetryPolicy(backoff=Backoff(0.001)),
+    )
+    assert tool.run("img.png") == ("img.png", "Beam Search")
+    assert tool.client.strategy == "eta"
+    assert [s["healthy"] for s in tool.client.stats()] == [False, True]
+    time.sleep(0.25)
+    assert [s["healthy"] for s in tool.client.stats()] == [True, True]
+    with pytest.raises(ValueError):
+        ImageCaptioningTool(replicas=["me/a"], replica_strategy="random")
+
+
+@patch("gradio_client.Client")
+def test_tool_duplicates_n_replicas(mock_client):
+    tool = ImageCaptioningTool(replicas=3, hf_token="token")
+    tool.warmup()
+    to_ids = [c.kwargs["to_id"] for c in mock_client.duplicate.call_args_list]
+    assert sorted(to_ids, key=str) == sorted(
+        [None, "BLIP-2-replica-1", "BLIP-2-replica-2"], key=str
+    )
+    with pytest.raises(ValueError):
+        ImageCaptioningTool(replicas=3)
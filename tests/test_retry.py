@@ -0,0 +1,129 @@
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+import requests
+from gradio_client.utils import QueueError
+from stub_space import StubClient
+
+from gradio_tools import (Backoff, CircuitBreaker, CircuitOpenError,
+                          RetryPolicy, StableDiffusionPromptGeneratorTool,
+                          ToolError, ToolTimeoutError)
+
+FAST = Backoff(initial=0.001, factor=2, maximum=0.01)
+
+
+class FlakyStubClient(StubClient):
+    """Rejects the first `failures` submissions with a full queue."""
+
+    failures = 2
+
+    def _predict(self, *args):
+        if len(self.submitted) <= self.failures:
+            raise QueueError("Queue is full! Please try again.")
+        return super()._predict(*args)
+
+
+@patch("gradio_client.Client", FlakyStubClient)
+def test_queue_full_is_retried_inside_the_tool():
+    tool = StableDiffusionPromptGeneratorTool(retry=RetryPolicy(backoff=FAST))
+    assert tool.run("a cat") == "a cat"
+    assert len(tool.client.submitted) == 3
+    assert "QUEUE_FULL" not in tool.description
+
+
+@patch("gradio_client.Client", FlakyStubClient)
+def test_gives_up_with_structured_failure():
+    tool = StableDiffusionPromptGeneratorTool(
+        retry=RetryPolicy(max_attempts=2, backoff=FAST)
+    )
+    with pytest.raises(ToolError) as e:
+        tool.run("a cat")
+    assert e.value.attempts == 2
+    assert e.value.tool == "StableDiffusionPromptGenerator"
+    assert isinstance(e.value.__cause__, QueueError)
+
+
+@patch("gradio_client.Client", FlakyStubClient)
+def test_async_retry():
+    tool = StableDiffusionPromptGeneratorTool(retry=RetryPolicy(backoff=FAST))
+    assert asyncio.run(tool.arun("a cat")) == "a cat"
+
+
+def test_deadline_stops_retries():
+    calls = []
+
+    def fn():
+        calls.append(1)
+        raise QueueError()
+
+    policy = RetryPolicy(max_attempts=100, deadline=0.05, backoff=Backoff(0.02, 1))
+    with pytest.raises(ToolError):
+        policy.call(fn, "tool", "space")
+    assert 2 <= len(calls) <= 4
+
+
+class FullStubClient(FlakyStubClient):
+    failures = 1000
+
+
+@patch("gradio_client.Client", FullStubClient)
+def test_backoff_does_not_outlast_the_timeout():
+    tool = StableDiffusionPromptGeneratorTool(
+        retry=RetryPolicy(backoff=Backoff(initial=2.0))
+    )
+    start = time.monotonic()
+    with pytest.raises(ToolTimeoutError) as e:
+        tool.run("a cat", timeout=0.3)
+    assert time.monotonic() - start <= 0.4
+    assert e.value.attempts == len(tool.client.submitted) == 1
+
+    start = time.monotonic()
+    with pytest.raises(ToolTimeoutError):
+        asyncio.run(tool.arun("a dog", timeout=0.3))
+    assert time.monotonic() - start <= 0.4
+
+
+@patch("gradio_client.Client", FullStubClient)
+def test_timeout_reports_every_attempt():
+    tool = StableDiffusionPromptGeneratorTool(
+        retry=RetryPolicy(max_attempts=100, backoff=Backoff(0.05, 1))
+    )
+    with pytest.raises(ToolTimeoutError) as e:
+        tool.run("a cat", timeout=0.3)
+    assert e.value.attempts == len(tool.client.submitted) > 1
+
+
+def test_stalled_requests_are_retried():
+    errors = [requests.Timeout()]
+
+    def fn():
+        if errors:
+            raise errors.pop()
+        return "ok"
+
+    assert RetryPolicy(backoff=FAST).call(fn, "tool", "space") == "ok"
+
+
+def test_non_retryable_errors_propagate():
+    def fn():
+        raise ValueError("bad input")
+
+    with pytest.raises(ValueError):
+        RetryPolicy(backoff=FAST).call(fn, "tool", "space")
+
+
+def test_circuit_breaker_fails_fast():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    policy = RetryPolicy(max_attempts=3, backoff=FAST)
+
+    def fn():
+        raise QueueError()
+
+    with pytest.raises(ToolError):
+        policy.call(fn, "tool", "space", breaker)
+    assert breaker.is_open("space")
+    with pytest.raises(CircuitOpenError):
+        policy.call(lambda: "ok", "tool", "space", breaker)
+    assert policy.call(lambda: "ok", "tool", "other", breaker) == "ok"
@@ -0,0 +1,45 @@
+import time
+from unittest.mock import patch
+
+import pytest
+from stub_space import StubClient
+
+from gradio_tools import ImageCaptioningTool, WhisperAudioTranscriptionTool
+
+
+@patch("gradio_client.Client", StubClient)
+def test_run_many_bounded_concurrency():
+    tool = WhisperAudioTranscriptionTool()
+    queries = [f"clip{i}.wav" for i in range(12)]
+    start = time.perf_counter()
+    results = list(tool.run_many(queries, max_concurrency=4))
+    elapsed = time.perf_counter() - start
+    assert [r.output for r in results] == queries
+    assert [r.index for r in results] == list(range(12))
+    # 12 items, 4 at a time -> 3 waves of StubClient.latency
+    assert 3 * StubClient.latency <= elapsed < 12 * StubClient.latency
+
+
+@patch("gradio_client.Client", StubClient)
+def test_run_many_reports_errors_per_item():
+    tool = ImageCaptioningTool()
+    original = tool.create_job
+
+    def create_job(query):
+        if query == "bad.png":
+            raise ValueError("broken image")
+        return original(query)
+
+    with patch.object(tool, "create_job", side_effect=create_job):
+        results = list(tool.run_many(["a.png", "bad.png", "c.png"], ordered=False))
+
+    assert sorted(r.index for r in results) == [0, 1, 2]
+    failed = [r for r in results if not r.ok]
+    assert len(failed) == 1 and failed[0].query == "bad.png"
+    assert isinstance(failed[0].error, ValueError)
+
+
+@patch("gradio_client.Client", StubClient)
+def test_run_many_rejects_bad_concurrency():
+    with pytest.raises(ValueError):
+        list(ImageCaptioningTool().run_many(["a.png"], max_concurrency=0))
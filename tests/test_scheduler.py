@@ -0,0 +1,129 @@
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from stub_space import StubClient, make_stub
+
+from gradio_tools import (Scheduler, ToolTimeoutError,
+                          WhisperAudioTranscriptionTool, call_context)
+from gradio_tools.scheduler import BATCH, INTERACTIVE
+
+
+def hold(scheduler, src, seconds, order, name, **context):
+    with call_context(**context):
+        with scheduler.slot(src):
+            order.append(name)
+            time.sleep(seconds)
+
+
+def test_higher_priority_is_admitted_first():
+    scheduler = Scheduler(max_inflight=1)
+    order = []
+    threads = [
+        threading.Thread(target=hold, args=(scheduler, "s", 0.1, order, "first"))
+    ]
+    threads[0].start()
+    time.sleep(0.02)
+    for name, priority in [("batch", BATCH), ("batch2", BATCH), ("user", INTERACTIVE)]:
+        thread = threading.Thread(
+            target=hold,
+            args=(scheduler, "s", 0.0, order, name),
+            kwargs={"priority": priority},
+        )
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.01)
+    assert scheduler.stats()["s"] == {"inflight": 1, "waiting": 3}
+    for thread in threads:
+        thread.join()
+    assert order == ["first", "user", "batch", "batch2"]
+
+
+def test_tenant_quota_limits_only_that_tenant():
+    scheduler = Scheduler(max_inflight=8, quotas={"bulk": (20.0, 1.0)})
+    start = time.perf_counter()
+    for _ in range(4):
+        with call_context(tenant="bulk"), scheduler.slot("s"):
+            pass
+    assert time.perf_counter() - start >= 0.14
+    start = time.perf_counter()
+    for _ in range(4):
+        with call_context(tenant="user"), scheduler.slot("s"):
+            pass
+    assert time.perf_counter() - start < 0.05
+
+
+def test_over_quota_call_times_out():
+    scheduler = Scheduler(default_quota=(1.0, 1.0))
+    with scheduler.slot("s", timeout=0.1):
+        pass
+    with pytest.raises(TimeoutError):
+        with scheduler.slot("s", timeout=0.1):
+            pass
+
+
+def test_in_flight_jobs_are_capped_per_space():
+    stub = make_stub(latency=0.1)
+    with patch("gradio_client.Client", stub):
+        tool = WhisperAudioTranscriptionTool(scheduler=Scheduler(max_inflight=2))
+        outstanding = []
+        original = tool.create_job
+
+        def create_job(query):
+            job = original(query)
+            outstanding.append(tool.client.outstanding)
+            return job
+
+        with patch.object(tool, "create_job", side_effect=create_job):
+            start = time.perf_counter()
+            results = list(tool.run_many([f"{i}.wav" for i in range(6)], 6))
+            elapsed = time.perf_counter() - start
+    assert all(r.ok for r in results)
+    assert max(outstanding) <= 2
+    assert elapsed >= 3 * 0.1
+
+
+@patch("gradio_client.Client", StubClient)
+def test_interactive_calls_overtake_run_many():
+    scheduler = Scheduler(max_inflight=1)
+    tool = WhisperAudioTranscriptionTool(scheduler=scheduler)
+    batch = threading.Thread(
+        target=lambda: list(tool.run_many([f"{i}.wav" for i in range(8)], 8))
+    )
+    batch.start()
+    time.sleep(0.05)
+    start = time.perf_counter()
+    assert tool.run("now.wav") == "now.wav"
+    assert time.perf_counter() - start < 3 * StubClient.latency
+    batch.join()
+
+
+@patch("gradio_client.Client", StubClient)
+def test_waiting_for_a_slot_counts_against_the_timeout():
+    scheduler = Scheduler(max_inflight=1)
+    tool = WhisperAudioTranscriptionTool(scheduler=scheduler)
+    busy = threading.Thread(target=tool.run, args=("long.wav",))
+    busy.start()
+    time.sleep(0.02)
+    with pytest.raises(ToolTimeoutError):
+        tool.run("a.wav", timeout=0.03)
+    busy.join()
+    assert scheduler.stats()[tool.src] == {"inflight": 0, "waiting": 0}
+
+
+@patch("gradio_client.Client", StubClient)
+def test_async_calls_are_scheduled():
+    scheduler = Scheduler(max_inflight=2)
+    tool = WhisperAudioTranscriptionTool(scheduler=scheduler)
+
+    async def main():
+        start = time.perf_counter()
+        outputs = await asyncio.gather(*(tool.arun(f"{i}.wav") for i in range(4)))
+        return outputs, time.perf_counter() - start
+
+    outputs, elapsed = asyncio.run(main())
+    assert outputs == [f"{i}.wav" for i in range(4)]
+    assert elapsed >= 2 * StubClient.latency
+    assert scheduler.stats()[tool.src]["inflight"] == 0
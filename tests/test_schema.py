@@ -0,0 +1,109 @@
+from unittest.mock import patch
+
+import pytest
+from stub_space import StubClient, make_stub
+
+from gradio_tools import (TextToVideoTool, ToolError,
+                          WhisperAudioTranscriptionTool)
+from gradio_tools.schema import EndpointBinder, SchemaCache
+
+
+def param(label, type_):
+    return {"label": label, "python_type": {"type": type_}, "component": "X"}
+
+
+AUDIO = {"parameters": [param("Input Audio", "str")], "returns": []}
+VIDEO = {
+    "parameters": [
+        param("Prompt", "str"),
+        param("Seed", "int | float"),
+        param("Frames", "int | float"),
+        param("Steps", "int | float"),
+    ],
+    "returns": [],
+}
+
+
+def space(named=None, unnamed=None, dependencies=(), version="3.35.2"):
+    def view_api(self, print_info=True, return_format=None):
+        return {"named_endpoints": named or {}, "unnamed_endpoints": unnamed or {}}
+
+    return make_stub(
+        latency=0.0,
+        config={"version": version, "dependencies": list(dependencies)},
+        view_api=view_api,
+    )
+
+
+def test_binder_checks_arity_and_types():
+    binder = EndpointBinder("fn_index=1", VIDEO["parameters"])
+    assert binder.bind("a cat", -1, 16, 25) == ("a cat", -1, 16, 25)
+    assert binder.bind("a cat", -1, frames=16, steps=25.0) == ("a cat", -1, 16, 25.0)
+    assert binder.bind(None, -1, 16, 25)[0] is None
+    with pytest.raises(ValueError, match="takes 4"):
+        binder.bind("a cat", -1, 16, 25, "extra")
+    with pytest.raises(ValueError, match="missing steps"):
+        binder.bind("a cat", -1, 16)
+    with pytest.raises(ValueError, match="expects seed to be int | float"):
+        binder.bind("a cat", "-1", 16, 25)
+    with pytest.raises(ValueError, match="no parameter"):
+        binder.bind("a cat", -1, 16, 25, fps=8)
+
+
+def test_schemas_are_cached_on_disk_per_revision(tmp_path):
+    stub = space(named={"/predict": AUDIO})
+    first = SchemaCache(tmp_path)
+    first.get(stub("abidlabs/whisper"))
+    first.get(stub("abidlabs/whisper"))
+    assert first.fetches == 1
+    second = SchemaCache(tmp_path)
+    assert second.get(stub("abidlabs/whisper"))["named_endpoints"] == {
+        "/predict": AUDIO
+    }
+    assert second.fetches == 0
+    changed = space(named={"/predict": AUDIO}, version="3.36.0")
+    second.get(changed("abidlabs/whisper"))
+    assert second.fetches == 1
+
+
+def test_valid_calls_are_submitted(tmp_path):
+    with patch("gradio_client.Client", space(named={"/predict": AUDIO})):
+        tool = WhisperAudioTranscriptionTool(schemas=SchemaCache(tmp_path))
+        assert tool.run("a.wav") == "a.wav"
+        assert tool.run("b.wav") == "b.wav"
+    assert tool.schemas.fetches == 1
+
+
+def test_malformed_calls_never_reach_the_space(tmp_path):
+    with patch("gradio_client.Client", space(named={"/predict": VIDEO})):
+        tool = WhisperAudioTranscriptionTool(schemas=SchemaCache(tmp_path))
+        with pytest.raises(ToolError, match="missing seed"):
+            tool.run("a.wav")
+    assert tool.client.submitted == []
+
+
+def test_missing_endpoint_lists_the_ones_that_exist(tmp_path):
+    with patch("gradio_client.Client", space(unnamed={"0": VIDEO})):
+        tool = TextToVideoTool(schemas=SchemaCache(tmp_path))
+        with pytest.raises(
+            ToolError, match="no endpoint fn_index=1; it has fn_index=0"
+        ):
+            tool.run("a cat")
+    assert tool.client.submitted == []
+
+
+def test_fn_index_of_a_named_endpoint(tmp_path):
+    stub = space(
+        named={"/generate": VIDEO},
+        dependencies=[{"api_name": False}, {"api_name": "generate"}],
+    )
+    with patch("gradio_client.Client", stub):
+        tool = TextToVideoTool(schemas=SchemaCache(tmp_path))
+        assert tool.run("a cat") == ("a cat", -1, 16, 25)
+
+
+@patch("gradio_client.Client", StubClient)
+def test_calls_are_unchecked_without_api_info(tmp_path):
+    tool = WhisperAudioTranscriptionTool(schemas=SchemaCache(tmp_path))
+    assert tool.run("a.wav") == "a.wav"
+    assert tool._binders == {("/predict", None): None}
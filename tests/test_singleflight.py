@@ -0,0 +1,138 @@
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from stub_space import StubClient
+
+from gradio_tools import ClipInterrogatorTool, StableDiffusionTool
+from gradio_tools.singleflight import SingleFlight, default_flight
+
+
+@patch("gradio_client.Client", StubClient)
+def test_concurrent_threads_share_one_job():
+    tool = ClipInterrogatorTool()
+    outputs = []
+    threads = [
+        threading.Thread(target=lambda: outputs.append(tool.run("img.png")))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(tool.client.submitted) == 1
+    assert len(outputs) == 8 and len(set(outputs)) == 1
+    assert len(default_flight) == 0
+    tool.run("img.png")
+    assert len(tool.client.submitted) == 2
+
+
+@patch("gradio_client.Client", StubClient)
+def test_async_and_sync_callers_coalesce():
+    tool = ClipInterrogatorTool()
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        sync_call = loop.run_in_executor(None, tool.run, "img.png")
+        return await asyncio.gather(
+            *(tool.arun("img.png") for _ in range(8)), sync_call
+        )
+
+    outputs = asyncio.run(main())
+    assert len(outputs) == 9
+    assert len(tool.client.submitted) == 1
+
+
+@patch("gradio_client.Client", StubClient)
+def test_non_deterministic_tools_do_not_coalesce():
+    tool = StableDiffusionTool()
+    threads = [threading.Thread(target=tool.run, args=("a cat",)) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(tool.client.submitted) == 3
+
+
+@patch("gradio_client.Client", StubClient)
+def test_tools_with_different_clients_do_not_coalesce():
+    tools = [
+        ClipInterrogatorTool(hf_token=token, duplicate=False)
+        for token in ("tokA", "tokB")
+    ]
+    threads = [
+        threading.Thread(target=tool.run, args=("img.png",))
+        for tool in tools
+        for _ in range(4)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert tools[0].client is not tools[1].client
+    assert [len(tool.client.submitted) for tool in tools] == [1, 1]
+
+
+def test_leader_failure_is_forgotten():
+    flights = SingleFlight()
+    with pytest.raises(ValueError):
+        flights.join("k", lambda: (_ for _ in ()).throw(ValueError("boom")))
+    assert len(flights) == 0
+    assert flights.join("k", lambda: "job").job == "job"
+
+
+def test_release_reports_last_waiter():
+    flights = SingleFlight()
+    job = StubClient("a").submit(1)
+    first = flights.join("k", lambda: job)
+    second = flights.join("k", lambda: pytest.fail("should coalesce"))
+    assert first is second and flights.coalesced == 1
+    assert flights.release("k", first) is False
+    assert flights.release("k", second) is True
+    assert len(flights) == 0
+
+
+def test_cancelled_leader_hands_over_to_a_follower():
+    flights = SingleFlight()
+    calls = []
+
+    async def create():
+        calls.append(1)
+        if len(calls) == 1:
+            await asyncio.sleep(10)
+        return "job"
+
+    async def main():
+        leader = asyncio.ensure_future(flights.ajoin("k", create))
+        await asyncio.sleep(0.01)
+        follower = asyncio.ensure_future(flights.ajoin("k", create))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(main()).job == "job"
+    assert len(calls) == 2
+    assert flights.coalesced == 1
+
+
+def test_leader_timeout_is_not_shared():
+    flights = SingleFlight()
+    outputs = []
+
+    def slow_leader():
+        follower.start()
+        while not flights.coalesced:
+            time.sleep(0.001)
+        raise TimeoutError("the leader's own deadline")
+
+    follower = threading.Thread(
+        target=lambda: outputs.append(flights.join("k", lambda: "job").job)
+    )
+    with pytest.raises(TimeoutError):
+        flights.join("k", slow_leader)
+    follower.join(5)
+    assert outputs == ["job"]
@@ -0,0 +1,118 @@
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from huggingface_hub import SpaceStage
+from huggingface_hub.utils import HFValidationError
+
+from gradio_tools import SpaceResolver, WhisperAudioTranscriptionTool
+from gradio_tools.spaces import space_runtime
+
+
+def runtime(stage=SpaceStage.RUNNING, hardware="cpu-basic", latency=0.0):
+    calls = []
+    lock = threading.Lock()
+
+    def get_space_runtime(src, token=None):
+        with lock:
+            calls.append((src, token))
+        time.sleep(latency)
+        if src.startswith("http"):
+            raise HFValidationError("not a repo id")
+        return SimpleNamespace(stage=stage, hardware=hardware, requested_hardware=None)
+
+    return calls, patch("huggingface_hub.get_space_runtime", get_space_runtime)
+
+
+def test_lookups_are_memoized():
+    resolver = SpaceResolver()
+    calls, hub = runtime()
+    with hub:
+        record = resolver.resolve("abidlabs/whisper")
+        assert resolver.resolve("abidlabs/whisper") is record
+        assert not resolver.resolve("https://example.com/app").is_space
+        assert not resolver.resolve("https://example.com/app").is_space
+    assert len(calls) == 2
+    assert record.is_space and record.stage == "RUNNING"
+    assert record.hardware == "cpu-basic"
+
+
+def test_records_are_per_token():
+    resolver = SpaceResolver()
+    calls, hub = runtime()
+    with hub:
+        resolver.resolve("me/private", hf_token="a")
+        resolver.resolve("me/private", hf_token="b")
+        resolver.resolve("me/private", hf_token="a")
+    assert calls == [("me/private", "a"), ("me/private", "b")]
+
+
+def test_records_expire_and_can_be_refreshed():
+    resolver = SpaceResolver(ttl=0.05)
+    calls, hub = runtime()
+    with hub:
+        resolver.resolve("abidlabs/whisper")
+        resolver.resolve("abidlabs/whisper", refresh=True)
+        time.sleep(0.1)
+        resolver.resolve("abidlabs/whisper")
+    assert len(calls) == 3
+
+
+def test_disk_cache_is_shared_between_resolvers(tmp_path):
+    calls, hub = runtime()
+    with hub:
+        SpaceResolver(directory=tmp_path).resolve("abidlabs/whisper", "secret")
+        record = SpaceResolver(directory=tmp_path).resolve("abidlabs/whisper", "secret")
+    assert len(calls) == 1
+    assert record.is_space and record.stage == "RUNNING"
+    assert "secret" not in "".join(p.read_text() + p.name for p in tmp_path.iterdir())
+
+
+def test_resolve_many_runs_in_parallel():
+    resolver = SpaceResolver()
+    srcs = [f"user/space-{i}" for i in range(8)]
+    calls, hub = runtime(latency=0.2)
+    with hub:
+        start = time.perf_counter()
+        records = resolver.resolve_many(srcs + srcs)
+        elapsed = time.perf_counter() - start
+    assert list(records) == srcs
+    assert len(calls) == 8
+    assert elapsed < 0.6
+
+
+def test_concurrent_lookups_share_one_request():
+    resolver = SpaceResolver()
+    calls, hub = runtime(latency=0.1)
+    with hub:
+        threads = [
+            threading.Thread(target=resolver.resolve, args=("abidlabs/whisper",))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert len(calls) == 1
+
+
+def test_url_is_not_a_space():
+    with patch("huggingface_hub.get_space_runtime", side_effect=HFValidationError):
+        assert space_runtime("https://example.com/app") is None
+
+
+@patch("gradio_client.Client")
+def test_tools_share_lookups(mock_client):
+    resolver = SpaceResolver()
+    calls, hub = runtime()
+    with hub:
+        for _ in range(3):
+            tool = WhisperAudioTranscriptionTool(
+                hf_token="token", duplicate=True, resolver=resolver
+            )
+            tool.warmup()
+    assert len(calls) == 1
+    # The tools' own resolver, even though it started out empty.
+    assert tool.resolver is resolver and len(resolver) == 1
+    assert mock_client.duplicate.call_count == 3
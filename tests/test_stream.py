@@ -0,0 +1,65 @@
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+from stub_space import StubClient
+
+from gradio_tools import (ImageToMusicTool, StableDiffusionTool, TextToVideoTool,
+                          ToolTimeoutError)
+
+
+class CountingSpace(StubClient):
+    """A generator endpoint yielding a partial result every 50ms."""
+
+    def _predict(self, prompt, *args):
+        for step in range(4):
+            time.sleep(0.05)
+            yield f"{prompt}-{step}"
+
+
+@patch("gradio_client.Client", CountingSpace)
+def test_run_stream_yields_partial_outputs():
+    tool = StableDiffusionTool()
+    start = time.perf_counter()
+    first_output_at = None
+    events = []
+    for event in tool.run_stream("a cat"):
+        if event.kind == "output" and first_output_at is None:
+            first_output_at = time.perf_counter() - start
+        events.append(event)
+    total = time.perf_counter() - start
+    outputs = [e.output for e in events if e.kind == "output"]
+    assert outputs == [f"a cat-{i}" for i in range(4)]
+    assert events[-1].kind == "result" and events[-1].output == "a cat-3"
+    assert any(e.kind == "status" for e in events)
+    print(f"\ntime to first output {first_output_at * 1000:.0f}ms, total {total * 1000:.0f}ms")
+    assert first_output_at < total
+
+
+@patch("gradio_client.Client", CountingSpace)
+def test_arun_stream_postprocesses_outputs():
+    tool = ImageToMusicTool()
+
+    async def main():
+        return [e async for e in tool.arun_stream("img.png")]
+
+    events = asyncio.run(main())
+    # ImageToMusic's postprocess picks the second element of each output.
+    assert [e.output for e in events if e.kind == "output"] == list("mmmm")
+
+
+@patch("gradio_client.Client", CountingSpace)
+def test_closing_stream_cancels_job():
+    tool = TextToVideoTool()
+    stream = tool.run_stream("a cat")
+    next(e for e in stream if e.kind == "output")
+    stream.close()
+    assert tool.client.jobs[0].cancel_requested
+    assert tool.cancellations == 1
+
+
+@patch("gradio_client.Client", CountingSpace)
+def test_stream_timeout():
+    with pytest.raises(ToolTimeoutError):
+        list(TextToVideoTool().run_stream("a cat", timeout=0.08))
@@ -0,0 +1,64 @@
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+from stub_space import StubClient
+
+from gradio_tools import (ClipInterrogatorTool, TextToVideoTool,
+                          ToolTimeoutError)
+
+
+class SlowSpace(StubClient):
+    latency = 0.5
+
+
+@patch("gradio_client.Client", SlowSpace)
+def test_run_timeout_cancels_job():
+    tool = TextToVideoTool()
+    start = time.perf_counter()
+    with pytest.raises(ToolTimeoutError):
+        tool.run("a dancing cat", timeout=0.05)
+    assert time.perf_counter() - start < SlowSpace.latency
+    assert tool.client.jobs[0].cancel_requested
+    assert (tool.timeouts, tool.cancellations) == (1, 1)
+
+
+@patch("gradio_client.Client", SlowSpace)
+def test_arun_task_cancellation_cancels_job():
+    tool = TextToVideoTool()
+
+    async def main():
+        task = asyncio.create_task(tool.arun("a dancing cat"))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert tool.client.jobs[0].cancel_requested
+    assert (tool.timeouts, tool.cancellations) == (0, 1)
+
+
+@patch("gradio_client.Client", SlowSpace)
+def test_coalesced_timeout_leaves_job_for_others():
+    tool = ClipInterrogatorTool()
+
+    async def main():
+        patient = asyncio.create_task(tool.arun("img.png"))
+        await asyncio.sleep(0.01)
+        with pytest.raises(ToolTimeoutError):
+            await tool.arun("img.png", timeout=0.05)
+        return await patient
+
+    assert asyncio.run(main()) is not None
+    assert len(tool.client.jobs) == 1
+    assert not tool.client.jobs[0].cancel_requested
+    assert (tool.timeouts, tool.cancellations) == (1, 0)
+
+
+@patch("gradio_client.Client", SlowSpace)
+def test_run_many_timeout_per_item():
+    tool = TextToVideoTool()
+    results = list(tool.run_many(["a", "b"], timeout=0.05))
+    assert all(isinstance(r.error, ToolTimeoutError) for r in results)
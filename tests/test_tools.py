@@ -14,17 +14,29 @@ except:
 @pytest.mark.parametrize("tool_class", GradioTool.__subclasses__())
 @patch("gradio_client.Client.duplicate")
 def test_duplicate(mock_duplicate, tool_class):
-    tool_class(duplicate=True, hf_token="dafsdf")
+    tool = tool_class(duplicate=True, hf_token="dafsdf")
+    mock_duplicate.assert_not_called()
+    tool.warmup()
     mock_duplicate.assert_called_once()
 
 
 @pytest.mark.parametrize("tool_class", GradioTool.__subclasses__())
 @patch("gradio_client.Client.duplicate")
 def test_dont_duplicate(mock_duplicate, tool_class):
-    tool_class(duplicate=False)
+    tool_class(duplicate=False).warmup()
     mock_duplicate.assert_not_called()
 
 
+@pytest.mark.parametrize("tool_class", GradioTool.__subclasses__())
+@patch("gradio_client.Client")
+@patch("huggingface_hub.get_space_runtime")
+def test_construction_is_lazy(mock_runtime, mock_client, tool_class):
+    tool_class(duplicate=True, hf_token="dafsdf")
+    mock_runtime.assert_not_called()
+    mock_client.assert_not_called()
+    mock_client.duplicate.assert_not_called()
+
+
 @pytest.mark.parametrize("tool_class", GradioTool.__subclasses__())
 def test_all_listed_in_init(tool_class):
     assert tool_class.__name__ in gradio_tools.__all__
@@ -0,0 +1,131 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+from gradio_client.serializing import (FileSerializable, ImgSerializable,
+                                       StringSerializable)
+from stub_space import StubClient
+
+from gradio_tools import ImageCaptioningTool, UploadManager
+
+
+def space(src="https://a.hf.space"):
+    return SimpleNamespace(src=src, upload_url=f"{src}/upload", headers={})
+
+
+def uploaded(status_code=200):
+    counter = iter(range(1000))
+
+    def post(url, headers, files, timeout):
+        assert timeout is not None
+        return MagicMock(
+            status_code=status_code,
+            json=lambda: [f"/tmp/remote-{next(counter)}"],
+        )
+
+    return patch("gradio_tools.uploads.requests.post", side_effect=post)
+
+
+@pytest.fixture
+def blob(tmp_path):
+    path = tmp_path / "cat.png"
+    path.write_bytes(b"x" * 1000)
+    return path
+
+
+def test_each_blob_is_uploaded_once_per_space(blob, tmp_path):
+    copy = tmp_path / "copy.png"
+    copy.write_bytes(blob.read_bytes())
+    manager = UploadManager()
+    with uploaded() as post:
+        first = manager.ref(space(), str(blob))
+        again = manager.ref(space(), str(copy))
+        other = manager.ref(space("https://b.hf.space"), str(blob))
+    assert post.call_count == 2
+    assert first["is_file"] and first["name"] == again["name"]
+    assert again["orig_name"] == "copy.png"
+    assert other["name"] != first["name"]
+    assert manager.stats() == {
+        "uploads": 2,
+        "reused": 1,
+        "bytes_uploaded": 2000,
+        "bytes_saved": 1000,
+        "size": 2,
+    }
+
+
+def test_stalled_upload_times_out_and_frees_the_file(blob):
+    manager = UploadManager(timeout=0.01)
+    with patch(
+        "gradio_tools.uploads.requests.post", side_effect=requests.Timeout
+    ) as post:
+        with pytest.raises(requests.Timeout):
+            manager.ref(space(), str(blob))
+    assert post.call_args.kwargs["timeout"] == 0.01
+    with uploaded():
+        assert manager.ref(space(), str(blob))["is_file"]
+
+
+def test_edited_file_is_uploaded_again(blob):
+    manager = UploadManager()
+    with uploaded() as post:
+        manager.ref(space(), str(blob))
+        blob.write_bytes(b"y" * 1001)
+        manager.ref(space(), str(blob))
+    assert post.call_count == 2
+
+
+def test_expired_reference_is_uploaded_again(blob):
+    manager = UploadManager(ttl=0)
+    with uploaded() as post:
+        manager.ref(space(), str(blob))
+        manager.ref(space(), str(blob))
+    assert post.call_count == 2
+
+
+def test_refused_upload_falls_back_to_client(blob):
+    manager = UploadManager()
+    original = MagicMock(return_value=("inline",))
+    endpoint = SimpleNamespace(
+        client=space(),
+        root_url="https://a.hf.space/",
+        serializers=[FileSerializable()],
+        serialize=original,
+    )
+    manager.install(SimpleNamespace(endpoints=[endpoint]))
+    with uploaded(status_code=500):
+        assert endpoint.serialize(str(blob)) == ("inline",)
+    original.assert_called_once_with(str(blob))
+    assert manager.stats()["uploads"] == 0
+
+
+def test_installed_endpoint_sends_references(blob):
+    manager = UploadManager()
+    original = MagicMock()
+    endpoint = SimpleNamespace(
+        client=space(),
+        root_url="https://a.hf.space/",
+        serializers=[FileSerializable(), StringSerializable(), ImgSerializable()],
+        serialize=original,
+    )
+    manager.install(SimpleNamespace(endpoints=[endpoint]))
+    manager.install(SimpleNamespace(endpoints=[endpoint]))
+    with uploaded() as post:
+        for _ in range(3):
+            audio, text, image = endpoint.serialize(str(blob), "hi", str(blob))
+    assert post.call_count == 1
+    assert audio["is_file"] and audio["name"] == "/tmp/remote-0"
+    assert text == "hi"
+    # Images are always sent inline by gradio_client.
+    assert image.startswith("data:")
+    original.assert_not_called()
+
+
+@patch("gradio_client.Client", StubClient)
+def test_tools_share_the_default_manager():
+    first = ImageCaptioningTool().warmup()
+    second = ImageCaptioningTool().warmup()
+    assert first.uploads is second.uploads
+    manager = UploadManager()
+    assert ImageCaptioningTool(uploads=manager).uploads is manager
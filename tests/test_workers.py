@@ -0,0 +1,101 @@
+import os
+import pickle
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from stub_space import StubClient
+
+from gradio_tools import (MemoryCache, MetricsCollector, Scheduler, ToolError,
+                          WhisperAudioTranscriptionTool, WorkerPool,
+                          WorkerPoolFull)
+
+
+def test_pool_applies_backpressure():
+    release = threading.Event()
+    with WorkerPool(max_workers=2, max_queue=1, block_timeout=0.05) as pool:
+        futures = [pool.submit(release.wait) for _ in range(3)]
+        time.sleep(0.05)
+        stats = pool.stats()
+        assert stats["busy"] == 2 and stats["queued"] == 1
+        assert stats["utilization"] == 1.0 and stats["saturated"]
+        with pytest.raises(WorkerPoolFull):
+            pool.submit(release.wait)
+        release.set()
+        assert all(f.result(timeout=1) for f in futures)
+    stats = pool.stats()
+    assert stats["completed"] == 3 and stats["rejected"] == 1
+    assert stats["busy"] == 0 and stats["utilization"] == 0.0
+
+
+def test_blocked_submit_resumes_when_a_worker_frees_up():
+    with WorkerPool(max_workers=1, max_queue=0) as pool:
+        pool.submit(time.sleep, 0.1)
+        start = time.perf_counter()
+        pool.submit(time.sleep, 0)
+        assert time.perf_counter() - start >= 0.05
+
+
+def test_process_pool_runs_in_other_processes():
+    with WorkerPool(max_workers=2, processes=True) as pool:
+        pids = {pool.submit(os.getpid).result(timeout=30) for _ in range(4)}
+    assert os.getpid() not in pids
+
+
+@patch("gradio_client.Client", StubClient)
+def test_tool_calls_run_on_the_executor():
+    with WorkerPool(max_workers=4) as pool:
+        tool = WhisperAudioTranscriptionTool(executor=pool)
+        assert tool.run("a.wav") == "a.wav"
+        assert tool.submit("b.wav").result() == "b.wav"
+        queries = [f"clip{i}.wav" for i in range(12)]
+        start = time.perf_counter()
+        results = list(tool.run_many(queries))
+        elapsed = time.perf_counter() - start
+    assert [r.output for r in results] == queries
+    assert 3 * StubClient.latency <= elapsed < 12 * StubClient.latency
+    assert pool.stats()["submitted"] == 14
+
+
+@patch("gradio_client.Client", StubClient)
+def test_saturated_executor_is_a_tool_error():
+    metrics = MetricsCollector()
+    with WorkerPool(max_workers=1, max_queue=0, block_timeout=0.01) as pool:
+        tool = WhisperAudioTranscriptionTool(executor=pool, instrumentation=metrics)
+        tool.submit("a.wav")
+        with pytest.raises(ToolError):
+            tool.run("b.wav")
+    assert metrics.counters()["rejected"] == 1
+
+
+@patch("gradio_client.Client", StubClient)
+def test_pickled_tool_reconnects():
+    with WorkerPool(max_workers=1) as pool:
+        tool = WhisperAudioTranscriptionTool(cache=MemoryCache(), executor=pool)
+        tool.warmup()
+        copy = pickle.loads(pickle.dumps(tool))
+    assert copy._client is None and copy.cache is None and copy.executor is None
+    assert copy.src == tool.src and not copy.duplicate
+    assert copy.run("a.wav") == "a.wav"
+
+
+@patch("gradio_client.Client", StubClient)
+def test_tool_calls_run_in_worker_processes():
+    with WorkerPool(max_workers=2, processes=True) as pool:
+        tool = WhisperAudioTranscriptionTool(executor=pool)
+        results = list(tool.run_many(["a.wav", "b.wav", "c.wav"]))
+    assert [r.output for r in results] == ["a.wav", "b.wav", "c.wav"]
+
+
+@patch("gradio_client.Client", StubClient)
+def test_process_pool_rejects_options_workers_would_lose():
+    with WorkerPool(max_workers=1, processes=True) as pool:
+        with pytest.raises(ValueError, match="cache, instrumentation"):
+            WhisperAudioTranscriptionTool(
+                executor=pool, cache=MemoryCache(), instrumentation=MetricsCollector()
+            )
+        tool = WhisperAudioTranscriptionTool(executor=pool)
+        tool.scheduler = Scheduler()
+        with pytest.raises(ValueError, match="scheduler"):
+            tool.run("a.wav")